@@ -0,0 +1,14 @@
+"""
+Start-up hook for parallel ingest worker processes (RECORDS_INGEST_WORKERS).
+
+The pool runs set_environment in every worker before the first task imports
+app.main, which is why it lives here: importing this module has no side effects.
+"""
+
+import os
+from typing import Dict
+
+
+def set_environment(values: Dict[str, str]) -> None:
+    """Pool initializer: set environment variables in a freshly started worker."""
+    os.environ.update(values)
@@ -4,32 +4,72 @@ Syncs with Google Sheets and provides real-time statistics
 """
 
 import os
+import csv
+import io
 import json
 import base64
+import hashlib
+import mmap
+import struct
 import re
+import random
 import unicodedata
 import time
 import asyncio
+import heapq
+import abc
+import multiprocessing
+import sqlite3
+from array import array
+from bisect import bisect_left, bisect_right
 from difflib import get_close_matches
-from typing import Optional, List, Dict, Any
-from datetime import datetime, timedelta
-from collections import Counter
+from functools import lru_cache, partial
+from itertools import accumulate, islice
+from typing import Optional, List, Dict, Any, Callable, Hashable, Iterable, Iterator, Sequence
+from datetime import date, datetime, timedelta
+from email.utils import formatdate, parsedate_to_datetime
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from threading import Lock
+from types import MappingProxyType
 
 import gspread
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from gspread.utils import rowcol_to_a1
 from oauth2client.service_account import ServiceAccountCredentials
 
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, every worker refreshes on its own
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import numpy
+except ImportError:  # Optional: statistics are counted with Counter passes instead
+    numpy = None
+
 # Load environment variables
 load_dotenv()
 
+# Set in parallel ingest worker processes, which import this module only for the
+# normalizers: they skip writing the credentials file and registering the API.
+INGEST_WORKER_ENV = "RECORDS_INGEST_WORKER_PROCESS"
+INGEST_WORKER_PROCESS = os.getenv(INGEST_WORKER_ENV) == "1"
+
 # Handle service account credentials
 SERVICE_ACCOUNT_FILE = "service_account.json"
 
 # Check if service account is provided as base64 in environment (for Render/production)
-if os.getenv('SERVICE_ACCOUNT_JSON'):
+if os.getenv('SERVICE_ACCOUNT_JSON') and not INGEST_WORKER_PROCESS:
     try:
         service_account_json = base64.b64decode(os.getenv('SERVICE_ACCOUNT_JSON')).decode()
         with open(SERVICE_ACCOUNT_FILE, 'w') as f:
@@ -37,21 +77,47 @@ if os.getenv('SERVICE_ACCOUNT_JSON'):
     except Exception as e:
         print(f"Warning: Could not decode SERVICE_ACCOUNT_JSON from environment: {e}")
 
-# Initialize FastAPI app
-app = FastAPI(
-    title="Dynamic Dashboard API",
-    description="Real-time dashboard API synced with Google Sheets",
-    version="1.0.0"
-)
 
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, restrict this to your domain
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+def dump_json(payload: Any) -> bytes:
+    """Encode a response payload as compact UTF-8 JSON, with orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dump_json. Return it directly to skip jsonable_encoder too."""
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+class UnservedApp:
+    """Stand-in for the FastAPI app in ingest worker processes: route and event decorators leave functions as they are."""
+
+    def __getattr__(self, name: str) -> Callable[..., Callable]:
+        return lambda *args, **kwargs: (lambda function: function)
+
+
+if INGEST_WORKER_PROCESS:
+    app = UnservedApp()
+else:
+    # Initialize FastAPI app
+    app = FastAPI(
+        title="Dynamic Dashboard API",
+        description="Real-time dashboard API synced with Google Sheets",
+        version="1.0.0",
+        default_response_class=FastJSONResponse
+    )
+
+    # Configure CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # In production, restrict this to your domain
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
 # Google Sheets Configuration
 SCOPE = [
@@ -87,7 +153,100 @@ EDUCATION_LEVELS = {
 RECORDS_CACHE_TTL_SECONDS = int(os.getenv("RECORDS_CACHE_TTL_SECONDS", "300"))
 # If refresh fails, serve stale cache for this duration to keep dashboard responsive.
 RECORDS_STALE_MAX_SECONDS = int(os.getenv("RECORDS_STALE_MAX_SECONDS", "3600"))
-STATS_CACHE_TTL_SECONDS = int(os.getenv("STATS_CACHE_TTL_SECONDS", "120"))
+# Cache-Control max-age for /stats and the list endpoints. Clients revalidate with
+# If-None-Match after this, which costs a 304 until the data changes.
+HTTP_CACHE_MAX_AGE_SECONDS = int(os.getenv("HTTP_CACHE_MAX_AGE_SECONDS", "0"))
+# Serialized responses kept in the LRU response cache (one per endpoint and filter combination).
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+# /events: comment sent after this much silence so proxies keep the stream open.
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+# Updates buffered per /events subscriber; a subscriber that falls further behind gets full stats.
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "16"))
+# Re-sync in the background ahead of the TTL so requests never pay for a refresh.
+RECORDS_BACKGROUND_REFRESH = os.getenv("RECORDS_BACKGROUND_REFRESH", "true").lower() in {"1", "true", "yes"}
+RECORDS_REFRESH_INTERVAL_SECONDS = float(
+    os.getenv("RECORDS_REFRESH_INTERVAL_SECONDS", str(RECORDS_CACHE_TTL_SECONDS * 0.8))
+)
+# Random +/- fraction applied to every delay so workers don't refresh in lockstep.
+RECORDS_REFRESH_JITTER = float(os.getenv("RECORDS_REFRESH_JITTER", "0.1"))
+# Exponential backoff after failed refreshes, starting at the base delay.
+RECORDS_REFRESH_BACKOFF_SECONDS = float(os.getenv("RECORDS_REFRESH_BACKOFF_SECONDS", "15"))
+RECORDS_REFRESH_MAX_BACKOFF_SECONDS = float(os.getenv("RECORDS_REFRESH_MAX_BACKOFF_SECONDS", "600"))
+# Max distinct raw values remembered per normalizer (shared across refreshes).
+NORMALIZATION_CACHE_SIZE = int(os.getenv("NORMALIZATION_CACHE_SIZE", "65536"))
+# Local snapshot of normalized records, loaded on startup for a fast cold start.
+# Set to an empty value to disable. The default sits next to this module, so every
+# worker finds the same file whatever its working directory.
+RECORDS_SNAPSHOT_PATH = os.getenv(
+    "RECORDS_SNAPSHOT_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "records_snapshot.bin")
+)
+# Share the snapshot file between workers: one worker (holding a lock file) refreshes
+# from Google Sheets, the others map the file it writes instead of calling the API.
+RECORDS_SHARED_SNAPSHOT = os.getenv("RECORDS_SHARED_SNAPSHOT", "true").lower() in {"1", "true", "yes"}
+# How often non-refreshing workers check the shared snapshot for a new version.
+RECORDS_SHARED_POLL_SECONDS = float(os.getenv("RECORDS_SHARED_POLL_SECONDS", "5"))
+# How long a worker with no data waits for the refreshing worker's first snapshot.
+RECORDS_SHARED_WAIT_SECONDS = float(os.getenv("RECORDS_SHARED_WAIT_SECONDS", "30"))
+# Refresh by fetching only rows appended since the last sync (the form only appends).
+RECORDS_INCREMENTAL_SYNC = os.getenv("RECORDS_INCREMENTAL_SYNC", "true").lower() in {"1", "true", "yes"}
+# Rebuild from the full sheet at least this often to pick up edits to existing rows.
+RECORDS_FULL_SYNC_INTERVAL_SECONDS = int(os.getenv("RECORDS_FULL_SYNC_INTERVAL_SECONDS", "3600"))
+
+# Normalize large full syncs in this many worker processes (0 = serially on the refresh thread).
+RECORDS_INGEST_WORKERS = int(os.getenv("RECORDS_INGEST_WORKERS", "0"))
+# Smaller batches of rows are always normalized serially; the pool round trip isn't worth it.
+RECORDS_INGEST_PARALLEL_MIN_ROWS = int(os.getenv("RECORDS_INGEST_PARALLEL_MIN_ROWS", "50000"))
+RECORDS_INGEST_CHUNK_ROWS = int(os.getenv("RECORDS_INGEST_CHUNK_ROWS", "10000"))
+# Count statistics with NumPy when installed: "auto" (default) for row sets of at least
+# RECORDS_STATS_VECTORIZE_MIN_ROWS rows, "numpy" for every row set, "python" never.
+RECORDS_STATS_BACKEND = os.getenv("RECORDS_STATS_BACKEND", "auto").lower()
+# Smaller row sets (most StatsCube cells) are faster to count without NumPy's per-call overhead.
+RECORDS_STATS_VECTORIZE_MIN_ROWS = int(os.getenv("RECORDS_STATS_VECTORIZE_MIN_ROWS", "4096"))
+# Most buckets one /stats/timeseries response may hold (e.g. daily counts over ~5 years).
+TIME_SERIES_MAX_PERIODS = int(os.getenv("TIME_SERIES_MAX_PERIODS", "2000"))
+# Rows serialized per chunk written by /export.
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "1000"))
+
+# Where registration rows are read from: "sheets" (default), "csv", "sqlite" or "synthetic".
+# The local sources need no Google credentials, for development and load testing.
+DATA_SOURCE = os.getenv("DATA_SOURCE", "sheets").lower()
+# CSV file or SQLite database for the local sources; the first CSV row is the header.
+DATA_SOURCE_PATH = os.getenv("DATA_SOURCE_PATH", "")
+DATA_SOURCE_TABLE = os.getenv("DATA_SOURCE_TABLE", "registrations")
+# Size and seed of the generated sheet, plus rows appended before every read
+# (to exercise incremental sync).
+SYNTHETIC_ROWS = int(os.getenv("SYNTHETIC_ROWS", "100000"))
+SYNTHETIC_SEED = int(os.getenv("SYNTHETIC_SEED", "42"))
+SYNTHETIC_GROWTH_ROWS = int(os.getenv("SYNTHETIC_GROWTH_ROWS", "0"))
+
+# Google Sheets column names used by the dashboard
+COUNTY_FIELD = "YOUR COUNTY"
+REGION_FIELD = "REGION/COUNTY"
+LEVEL_FIELD = "Your Level of Training (e.g. Deg, Dip, Cert)"
+GENDER_FIELD = "GENDER"
+SCHOOL_FIELD = "The name of your school"
+COURSE_FIELD = "Your course of study"
+COMPANIES_FIELD = "Three Preferred Companies"
+PLACEMENT_FIELD = "PLACED YES OR NO"
+
+# Derived fields precomputed for every record during refresh
+YEAR_FIELD = "_application_year"
+QUARTER_FIELD = "_application_quarter"
+# Application date as a date ordinal (returned as YYYY-MM-DD)
+DATE_FIELD = "_application_date"
+DERIVED_FIELDS = [YEAR_FIELD, QUARTER_FIELD, DATE_FIELD]
+
+# Columns with many repeated values, stored as interned integer codes in RecordStore
+CATEGORICAL_FIELDS = {
+    COUNTY_FIELD,
+    REGION_FIELD,
+    LEVEL_FIELD,
+    GENDER_FIELD,
+    SCHOOL_FIELD,
+    COURSE_FIELD,
+    PLACEMENT_FIELD,
+    QUARTER_FIELD,
+}
 
 DATE_FIELD_HINTS = [
     "timestamp",
@@ -133,20 +292,40 @@ def get_date_candidate_fields(headers: List[str]) -> List[str]:
     return selected
 
 
-def parse_row_application_date(record: Dict[str, Any], candidate_fields: List[str]) -> Dict[str, Any]:
+def parse_row_application_date(
+    record: Dict[str, Any],
+    candidate_fields: List[str],
+    date_parsers: Optional[Dict[str, "DateColumnParser"]] = None,
+) -> Dict[str, Any]:
     """Extract the first valid year/quarter value from likely date fields in a row."""
     for field in candidate_fields:
         value = str(record.get(field, "")).strip()
         if not value:
             continue
 
-        parsed = parse_application_date(value)
+        parser = date_parsers.get(field) if date_parsers else None
+        parsed = parse_application_date(value, parser)
         if parsed.get("year") is not None and parsed.get("quarter") != "Unknown":
             return parsed
 
     return {"year": None, "quarter": "Unknown"}
 
 
+def quarter_for_month(month: int) -> str:
+    """Map a calendar month to its financial-year quarter label."""
+    # Categorize by quarter
+    if month in [7, 8, 9]:
+        return "Q1 (Jul-Sep)"
+    elif month in [10, 11, 12]:
+        return "Q2 (Oct-Dec)"
+    elif month in [1, 2, 3]:
+        return "Q3 (Jan-Mar)"
+    elif month in [4, 5, 6]:
+        return "Q4 (Apr-Jun)"
+    else:
+        return "Unknown"
+
+
 def get_quarter(date_str: str) -> str:
     """
     Get quarter from date string
@@ -166,41 +345,79 @@ def get_quarter(date_str: str) -> str:
         if parsed_date is None:
             return "Unknown"
 
-        month = parsed_date.month
-        
-        # Categorize by quarter
-        if month in [7, 8, 9]:
-            return "Q1 (Jul-Sep)"
-        elif month in [10, 11, 12]:
-            return "Q2 (Oct-Dec)"
-        elif month in [1, 2, 3]:
-            return "Q3 (Jan-Mar)"
-        elif month in [4, 5, 6]:
-            return "Q4 (Apr-Jun)"
-        else:
-            return "Unknown"
+        return quarter_for_month(parsed_date.month)
     except Exception:
         return "Unknown"
 
 
-def parse_datetime_value(date_input: str) -> Optional[datetime]:
-    """
-    Parse timestamp/date values from Google Sheets rows.
-    Supports datetime strings, ISO formats, and Excel serial dates.
-    """
+# Common datetime/date formats from Google Forms / Sheets, tried in order
+DATETIME_FORMATS = (
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y %H:%M',
+    '%m/%d/%Y %I:%M:%S %p',
+    '%m/%d/%Y %I:%M %p',
+    '%m/%d/%Y',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+    '%d/%m/%Y %I:%M:%S %p',
+    '%d/%m/%Y %I:%M %p',
+    '%d/%m/%Y',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%d %I:%M:%S %p',
+    '%Y-%m-%d %I:%M %p',
+    '%Y-%m-%d',
+    '%m-%d-%Y %H:%M:%S',
+    '%m-%d-%Y %H:%M',
+    '%m-%d-%Y %I:%M:%S %p',
+    '%m-%d-%Y %I:%M %p',
+    '%m-%d-%Y',
+    '%d-%m-%Y %H:%M:%S',
+    '%d-%m-%Y %H:%M',
+    '%d-%m-%Y %I:%M:%S %p',
+    '%d-%m-%Y %I:%M %p',
+    '%d-%m-%Y',
+    '%Y/%m/%d %H:%M:%S',
+    '%Y/%m/%d %H:%M',
+    '%Y/%m/%d %I:%M:%S %p',
+    '%Y/%m/%d %I:%M %p',
+    '%Y/%m/%d',
+    '%d.%m.%Y %H:%M:%S',
+    '%d.%m.%Y %H:%M',
+    '%d.%m.%Y',
+    '%b %d, %Y',
+    '%B %d, %Y',
+)
+
+# Formats tried on the first date-looking token of noisy strings
+DATE_TOKEN_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%m-%d-%Y', '%Y/%m/%d', '%d/%m/%Y', '%m/%d/%Y')
+
+DATE_PLACEHOLDERS = frozenset({"F", "N/A", "NA", "NULL", "NONE", "-"})
+
+WHITESPACE_RE = re.compile(r"\s+")
+TIMEZONE_SUFFIX_RE = re.compile(r"\s+[A-Za-z]{2,5}$")
+SERIAL_DATE_RE = re.compile(r"\d+(\.\d+)?")
+DATE_TOKEN_RE = re.compile(r"(\d{1,4}[/-]\d{1,2}[/-]\d{1,4})")
+
+
+def clean_datetime_text(date_input: str) -> Optional[str]:
+    """Whitespace/placeholder/timezone cleanup shared by all date parsers."""
     if not date_input or not isinstance(date_input, str):
         return None
 
     raw_value = date_input.strip()
-    cleaned_value = re.sub(r"\s+", " ", raw_value).strip()
-    if not cleaned_value or cleaned_value.upper() in {"F", "N/A", "NA", "NULL", "NONE", "-"}:
+    cleaned_value = WHITESPACE_RE.sub(" ", raw_value).strip()
+    if not cleaned_value or cleaned_value.upper() in DATE_PLACEHOLDERS:
         return None
 
     # Remove trailing timezone labels like "EAT" often appended by Sheets exports.
-    cleaned_value = re.sub(r"\s+[A-Za-z]{2,5}$", "", cleaned_value).strip()
+    return TIMEZONE_SUFFIX_RE.sub("", cleaned_value).strip()
 
+
+def parse_cleaned_datetime(cleaned_value: str) -> Optional[datetime]:
+    """Full parsing chain for a value already passed through clean_datetime_text."""
     # Excel/Sheets serial date support (e.g. "45567.52")
-    if re.fullmatch(r"\d+(\.\d+)?", cleaned_value):
+    if SERIAL_DATE_RE.fullmatch(cleaned_value):
         try:
             serial_value = float(cleaned_value)
             if 10000 <= serial_value <= 90000:
@@ -215,57 +432,17 @@ def parse_datetime_value(date_input: str) -> Optional[datetime]:
     except ValueError:
         pass
 
-    # Parse common datetime/date formats from Google Forms / Sheets
-    supported_formats = [
-        '%m/%d/%Y %H:%M:%S',
-        '%m/%d/%Y %H:%M',
-        '%m/%d/%Y %I:%M:%S %p',
-        '%m/%d/%Y %I:%M %p',
-        '%m/%d/%Y',
-        '%d/%m/%Y %H:%M:%S',
-        '%d/%m/%Y %H:%M',
-        '%d/%m/%Y %I:%M:%S %p',
-        '%d/%m/%Y %I:%M %p',
-        '%d/%m/%Y',
-        '%Y-%m-%d %H:%M:%S',
-        '%Y-%m-%d %H:%M',
-        '%Y-%m-%d %I:%M:%S %p',
-        '%Y-%m-%d %I:%M %p',
-        '%Y-%m-%d',
-        '%m-%d-%Y %H:%M:%S',
-        '%m-%d-%Y %H:%M',
-        '%m-%d-%Y %I:%M:%S %p',
-        '%m-%d-%Y %I:%M %p',
-        '%m-%d-%Y',
-        '%d-%m-%Y %H:%M:%S',
-        '%d-%m-%Y %H:%M',
-        '%d-%m-%Y %I:%M:%S %p',
-        '%d-%m-%Y %I:%M %p',
-        '%d-%m-%Y',
-        '%Y/%m/%d %H:%M:%S',
-        '%Y/%m/%d %H:%M',
-        '%Y/%m/%d %I:%M:%S %p',
-        '%Y/%m/%d %I:%M %p',
-        '%Y/%m/%d',
-        '%d.%m.%Y %H:%M:%S',
-        '%d.%m.%Y %H:%M',
-        '%d.%m.%Y',
-        '%b %d, %Y',
-        '%B %d, %Y',
-    ]
-
-    for fmt in supported_formats:
+    for fmt in DATETIME_FORMATS:
         try:
             return datetime.strptime(cleaned_value, fmt)
         except ValueError:
             continue
 
     # Extract first date-looking token from noisy strings
-    token_match = re.search(r"(\d{1,4}[/-]\d{1,2}[/-]\d{1,4})", cleaned_value)
+    token_match = DATE_TOKEN_RE.search(cleaned_value)
     if token_match:
         token = token_match.group(1)
-        token_formats = ['%Y-%m-%d', '%d-%m-%Y', '%m-%d-%Y', '%Y/%m/%d', '%d/%m/%Y', '%m/%d/%Y']
-        for fmt in token_formats:
+        for fmt in DATE_TOKEN_FORMATS:
             try:
                 return datetime.strptime(token, fmt)
             except ValueError:
@@ -274,27 +451,336 @@ def parse_datetime_value(date_input: str) -> Optional[datetime]:
     return None
 
 
-def parse_application_date(date_str: str) -> Dict[str, Any]:
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def parse_datetime_value(date_input: str) -> Optional[datetime]:
+    """
+    Parse timestamp/date values from Google Sheets rows.
+    Supports datetime strings, ISO formats, and Excel serial dates.
+    """
+    cleaned_value = clean_datetime_text(date_input)
+    if not cleaned_value:
+        return None
+    return parse_cleaned_datetime(cleaned_value)
+
+
+class DateLayout:
+    """
+    Regex fast path for one family of DATETIME_FORMATS.
+
+    `orders` lists the day/month/year interpretations in the order the full
+    chain would try them, so a value parses exactly as parse_datetime_value
+    would. Values the layout cannot settle return None and go through the chain.
+    """
+
+    TIME_PATTERN = r"(?: (?P<hour>\d{1,2}):(?P<minute>\d{1,2})(?::(?P<second>\d{1,2}))?)?"
+
+    def __init__(self, name: str, date_pattern: str, orders: Sequence[str]):
+        self.name = name
+        self.pattern = re.compile(date_pattern + self.TIME_PATTERN)
+        self.orders = tuple(orders)
+
+    def matches(self, cleaned_value: str) -> bool:
+        return self.pattern.fullmatch(cleaned_value) is not None
+
+    def parse(self, cleaned_value: str) -> Optional[datetime]:
+        match = self.pattern.fullmatch(cleaned_value)
+        if match is None:
+            return None
+
+        first, middle, last = int(match["first"]), int(match["middle"]), int(match["last"])
+        hour = int(match["hour"]) if match["hour"] else 0
+        minute = int(match["minute"]) if match["minute"] else 0
+        seconds = int(match["second"]) if match["second"] else 0
+
+        for order in self.orders:
+            if order == "mdy":
+                year, month, day = last, first, middle
+            elif order == "dmy":
+                year, month, day = last, middle, first
+            else:
+                year, month, day = first, middle, last
+            try:
+                return datetime(year, month, day, hour, minute, seconds)
+            except ValueError:
+                continue
+        return None
+
+
+DATE_LAYOUTS = (
+    DateLayout("month/day/year", r"(?P<first>\d{1,2})/(?P<middle>\d{1,2})/(?P<last>\d{4})", ("mdy", "dmy")),
+    DateLayout("month-day-year", r"(?P<first>\d{1,2})-(?P<middle>\d{1,2})-(?P<last>\d{4})", ("mdy", "dmy")),
+    DateLayout("day.month.year", r"(?P<first>\d{1,2})\.(?P<middle>\d{1,2})\.(?P<last>\d{4})", ("dmy",)),
+    DateLayout("year-month-day", r"(?P<first>\d{4})(?P<sep>[-/])(?P<middle>\d{1,2})(?P=sep)(?P<last>\d{1,2})", ("ymd",)),
+)
+
+# Number of non-empty values sampled per column to detect its dominant layout
+DATE_LAYOUT_SAMPLE_SIZE = 200
+
+
+class DateColumnParser:
+    """
+    Date parser for a single sheet column.
+
+    The dominant DateLayout is detected from a sample of the column; the rest
+    of the column is parsed with that layout's regex, and only outliers fall
+    back to the full parse_datetime_value chain.
+    """
+
+    def __init__(self, samples: Iterable[str]):
+        layout_counts = Counter()
+        sampled = 0
+        for sample in samples:
+            cleaned_value = clean_datetime_text(str(sample))
+            if not cleaned_value:
+                continue
+            sampled += 1
+            for layout in DATE_LAYOUTS:
+                if layout.matches(cleaned_value):
+                    layout_counts[layout] += 1
+                    break
+            if sampled >= DATE_LAYOUT_SAMPLE_SIZE:
+                break
+
+        self.layout: Optional[DateLayout] = None
+        if layout_counts:
+            layout, count = layout_counts.most_common(1)[0]
+            if count * 2 >= sampled:
+                self.layout = layout
+
+    @classmethod
+    def for_layout(cls, layout_name: Optional[str]) -> "DateColumnParser":
+        """Parser with a previously detected layout (by name), e.g. from a snapshot."""
+        parser = cls([])
+        parser.layout = next((layout for layout in DATE_LAYOUTS if layout.name == layout_name), None)
+        return parser
+
+    def parse(self, date_input: str) -> Optional[datetime]:
+        if self.layout is not None:
+            cleaned_value = clean_datetime_text(date_input)
+            if not cleaned_value:
+                return None
+            parsed = self.layout.parse(cleaned_value)
+            if parsed is not None:
+                return parsed
+        return parse_datetime_value(date_input)
+
+
+def build_date_parsers(headers: List[str], candidate_fields: List[str], rows: Sequence[List[str]]) -> Dict[str, DateColumnParser]:
+    """Detect the dominant date layout of each candidate date column from raw rows."""
+    parsers = {}
+    for field in candidate_fields:
+        column_index = headers.index(field)
+        samples = (row[column_index] for row in rows if column_index < len(row) and row[column_index])
+        parsers[field] = DateColumnParser(samples)
+    return parsers
+
+
+def parse_application_date(date_str: str, parser: Optional[DateColumnParser] = None) -> Dict[str, Any]:
     """
-    Parse application date and return both year and quarter.
-    Returns: {"year": int | None, "quarter": str}
+    Parse application date and return its year, quarter and day.
+    Returns: {"year": int | None, "quarter": str, "day": int (date ordinal), when parsed}
     """
     if not date_str or not isinstance(date_str, str):
         return {"year": None, "quarter": "Unknown"}
 
     try:
-        parsed_date = parse_datetime_value(date_str)
-        if parsed_date is None:
+        parsed_date = parser.parse(date_str) if parser else parse_datetime_value(date_str)
+        # Years before 1000 can't round-trip through YYYY-MM-DD, treat them as unparsable
+        if parsed_date is None or parsed_date.year < 1000:
             return {"year": None, "quarter": "Unknown"}
 
         return {
             "year": parsed_date.year,
-            "quarter": get_quarter(parsed_date.strftime('%Y-%m-%d')),
+            "quarter": quarter_for_month(parsed_date.month),
+            "day": parsed_date.toordinal(),
         }
     except Exception:
         return {"year": None, "quarter": "Unknown"}
 
 
+def date_ordinal(value: Any) -> int:
+    """Stored form of an application date: its ordinal, or 0 for none. Accepts ordinals or ISO dates."""
+    if not value:
+        return 0
+    if isinstance(value, str):
+        return date.fromisoformat(value).toordinal()
+    return value
+
+
+class SubstringMatcher:
+    """
+    Aho-Corasick automaton over a fixed list of patterns.
+
+    first_match() scans a text once and returns the lowest index of any pattern
+    occurring in it, i.e. the same answer as looping over the patterns in order
+    with `pattern in text`.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self._transitions: List[Dict[str, int]] = [{}]
+        self._best: List[Optional[int]] = [None]
+
+        for pattern_index, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._transitions[state].get(char)
+                if next_state is None:
+                    next_state = len(self._transitions)
+                    self._transitions[state][char] = next_state
+                    self._transitions.append({})
+                    self._best.append(None)
+                state = next_state
+            if self._best[state] is None:
+                self._best[state] = pattern_index
+
+        # Breadth-first pass to add failure links and inherit their matches
+        self._fail = [0] * len(self._transitions)
+        queue = list(self._transitions[0].values())
+        for state in queue:
+            for char, next_state in self._transitions[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._transitions[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._transitions[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                inherited = self._best[self._fail[next_state]]
+                if inherited is not None and (self._best[next_state] is None or inherited < self._best[next_state]):
+                    self._best[next_state] = inherited
+                queue.append(next_state)
+
+    def first_match(self, text: str) -> Optional[int]:
+        transitions = self._transitions
+        fail = self._fail
+        best = self._best
+        state = 0
+        found = None
+        for char in text:
+            while state and char not in transitions[state]:
+                state = fail[state]
+            state = transitions[state].get(char, 0)
+            match = best[state]
+            if match is not None and (found is None or match < found):
+                found = match
+                if found == 0:
+                    break
+        return found
+
+
+def build_fragment_table(patterns: Sequence[str], min_ratio: float = 0.0) -> Dict[str, int]:
+    """
+    Map every substring of the patterns to the lowest index of a pattern that
+    contains it, skipping substrings shorter than min_ratio of that pattern.
+    """
+    fragments: Dict[str, int] = {}
+    for pattern_index, pattern in enumerate(patterns):
+        for start in range(len(pattern) + 1):
+            for end in range(start, len(pattern) + 1):
+                fragment = pattern[start:end]
+                if len(fragment) >= len(pattern) * min_ratio and fragment not in fragments:
+                    fragments[fragment] = pattern_index
+    return fragments
+
+
+# Lookup tables for the normalizers, compiled once at import
+OFFICIAL_COUNTY_SET = frozenset(OFFICIAL_COUNTIES)
+
+COUNTY_INVALID_ENTRIES = frozenset(["KENYA", "N/A", "NA", "NONE", "NULL", "-", ".", "NIL", "NOT APPLICABLE", ""])
+
+COUNTY_ALIASES = MappingProxyType({
+    "NRBI": "NAIROBI",
+    "NRB": "NAIROBI",
+    "NAIROBY": "NAIROBI",
+    "NAIIROBI": "NAIROBI",
+    "MURANGA": "MURANGA",
+    "MURANG'A": "MURANGA",
+    "MURANG": "MURANGA",
+    "TAITA": "TAITA TAVETA",
+    "TAVETA": "TAITA TAVETA",
+    "ELGEIYO MARAKWET": "ELGEYO MARAKWET",
+    "ELGEYO-MARAKWET": "ELGEYO MARAKWET",
+    "ELGEYO": "ELGEYO MARAKWET",
+    "MARAKWET": "ELGEYO MARAKWET",
+    "HOMABAY": "HOMA BAY",
+    "HOMA-BAY": "HOMA BAY",
+    "TRANSNZOIA": "TRANS NZOIA",
+    "TRANS-NZOIA": "TRANS NZOIA",
+    "THARAKA-NITHI": "THARAKA NITHI",
+    "UASIN-GISHU": "UASIN GISHU",
+    "UASINGISHU": "UASIN GISHU",
+    "WEST-POKOT": "WEST POKOT",
+    "WESTPOKOT": "WEST POKOT",
+    "TANA-RIVER": "TANA RIVER",
+    "TANARIVER": "TANA RIVER",
+})
+
+OFFICIAL_COUNTY_MATCHER = SubstringMatcher(OFFICIAL_COUNTIES)
+OFFICIAL_COUNTY_FRAGMENTS = MappingProxyType(build_fragment_table(OFFICIAL_COUNTIES, min_ratio=0.6))
+
+COMPANY_ALIASES = MappingProxyType({
+    "KEBS": "KENYA BUREAU OF STANDARDS",
+    "KBS": "KENYA BUREAU OF STANDARDS",
+    "KENYA BUREAU OF STANDARD": "KENYA BUREAU OF STANDARDS",
+    "KRA": "KENYA REVENUE AUTHORITY",
+    "KPLC": "KENYA POWER AND LIGHTING COMPANY",
+    "KPLC": "KENYA POWER",
+    "KENYA POWER & LIGHTING": "KENYA POWER",
+    "SAFARICOM PLC": "SAFARICOM",
+    "SAFARICOM LIMITED": "SAFARICOM",
+    "CO-OPERATIVE BANK": "COOPERATIVE BANK",
+    "COOP BANK": "COOPERATIVE BANK",
+    "KCB": "KENYA COMMERCIAL BANK",
+    "EQUITY BANK": "EQUITY BANK",
+    "NHIF": "NATIONAL HOSPITAL INSURANCE FUND",
+    "NSSF": "NATIONAL SOCIAL SECURITY FUND",
+    "KWS": "KENYA WILDLIFE SERVICE",
+    "KFS": "KENYA FOREST SERVICE",
+    "KEMRI": "KENYA MEDICAL RESEARCH INSTITUTE",
+    "KALRO": "KENYA AGRICULTURAL AND LIVESTOCK RESEARCH ORGANIZATION",
+    "KENYATTA NATIONAL HOSPITAL": "KENYATTA NATIONAL HOSPITAL",
+    "KNH": "KENYATTA NATIONAL HOSPITAL",
+    "MOH": "MINISTRY OF HEALTH",
+})
+
+COMPANY_ALIAS_ITEMS = tuple(COMPANY_ALIASES.items())
+COMPANY_ALIAS_MATCHER = SubstringMatcher([alias for alias, _ in COMPANY_ALIAS_ITEMS])
+COMPANY_ALIAS_FRAGMENTS = MappingProxyType(build_fragment_table([alias for alias, _ in COMPANY_ALIAS_ITEMS]))
+
+SCHOOL_ALIASES = MappingProxyType({
+    "UON": "UNIVERSITY OF NAIROBI",
+    "U.O.N": "UNIVERSITY OF NAIROBI",
+    "NAIROBI UNIVERSITY": "UNIVERSITY OF NAIROBI",
+    "KU": "KENYATTA UNIVERSITY",
+    "K.U": "KENYATTA UNIVERSITY",
+    "MOI UNIVERSITY": "MOI UNIVERSITY",
+    "JKUAT": "JOMO KENYATTA UNIVERSITY OF AGRICULTURE AND TECHNOLOGY",
+    "J.K.U.A.T": "JOMO KENYATTA UNIVERSITY OF AGRICULTURE AND TECHNOLOGY",
+    "JKUAT": "JOMO KENYATTA UNIVERSITY OF AGRICULTURE AND TECHNOLOGY",
+    "EGERTON": "EGERTON UNIVERSITY",
+    "EGERTON UNIVERSITY": "EGERTON UNIVERSITY",
+    "STRATHMORE": "STRATHMORE UNIVERSITY",
+    "STRATHMORE UNIVERSITY": "STRATHMORE UNIVERSITY",
+    "USIU": "UNITED STATES INTERNATIONAL UNIVERSITY",
+    "USIU-AFRICA": "UNITED STATES INTERNATIONAL UNIVERSITY",
+    "KCA": "KCA UNIVERSITY",
+    "KCA UNIVERSITY": "KCA UNIVERSITY",
+    "MULTIMEDIA UNIVERSITY": "MULTIMEDIA UNIVERSITY OF KENYA",
+    "MMU": "MULTIMEDIA UNIVERSITY OF KENYA",
+    "MOUNT KENYA UNIVERSITY": "MOUNT KENYA UNIVERSITY",
+    "MKU": "MOUNT KENYA UNIVERSITY",
+    "TECHNICAL UNIVERSITY OF KENYA": "TECHNICAL UNIVERSITY OF KENYA",
+    "TUK": "TECHNICAL UNIVERSITY OF KENYA",
+    "KENYA POLYTECHNIC": "TECHNICAL UNIVERSITY OF KENYA",
+    "KABETE NATIONAL POLYTECHNIC": "KABETE NATIONAL POLYTECHNIC",
+    "KABETE POLY": "KABETE NATIONAL POLYTECHNIC",
+    "MOMBASA POLYTECHNIC": "MOMBASA POLYTECHNIC UNIVERSITY COLLEGE",
+    "MPC": "MOMBASA POLYTECHNIC UNIVERSITY COLLEGE",
+})
+
+SCHOOL_ALIAS_ITEMS = tuple(SCHOOL_ALIASES.items())
+SCHOOL_ALIAS_MATCHER = SubstringMatcher([alias for alias, _ in SCHOOL_ALIAS_ITEMS])
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
 def normalize_county(county_input: str) -> str:
     """
     Normalize county name to match official 47 counties of Kenya
@@ -308,8 +794,7 @@ def normalize_county(county_input: str) -> str:
     cleaned = county_input.strip().upper()
     
     # Filter out invalid entries and default to NAIROBI
-    invalid_entries = ["KENYA", "N/A", "NA", "NONE", "NULL", "-", ".", "NIL", "NOT APPLICABLE", ""]
-    if cleaned in invalid_entries or cleaned.isdigit():
+    if cleaned in COUNTY_INVALID_ENTRIES or cleaned.isdigit():
         return "NAIROBI"
     
     # Remove common prefixes/suffixes
@@ -317,52 +802,27 @@ def normalize_county(county_input: str) -> str:
     cleaned = cleaned.strip()
     
     # Direct match
-    if cleaned in OFFICIAL_COUNTIES:
+    if cleaned in OFFICIAL_COUNTY_SET:
         return cleaned
     
     # Handle common variations and typos
-    county_mapping = {
-        "NRBI": "NAIROBI",
-        "NRB": "NAIROBI",
-        "NAIROBY": "NAIROBI",
-        "NAIIROBI": "NAIROBI",
-        "MURANGA": "MURANGA",
-        "MURANG'A": "MURANGA",
-        "MURANG": "MURANGA",
-        "TAITA": "TAITA TAVETA",
-        "TAVETA": "TAITA TAVETA",
-        "ELGEIYO MARAKWET": "ELGEYO MARAKWET",
-        "ELGEYO-MARAKWET": "ELGEYO MARAKWET",
-        "ELGEYO": "ELGEYO MARAKWET",
-        "MARAKWET": "ELGEYO MARAKWET",
-        "HOMABAY": "HOMA BAY",
-        "HOMA-BAY": "HOMA BAY",
-        "TRANSNZOIA": "TRANS NZOIA",
-        "TRANS-NZOIA": "TRANS NZOIA",
-        "THARAKA-NITHI": "THARAKA NITHI",
-        "UASIN-GISHU": "UASIN GISHU",
-        "UASINGISHU": "UASIN GISHU",
-        "WEST-POKOT": "WEST POKOT",
-        "WESTPOKOT": "WEST POKOT",
-        "TANA-RIVER": "TANA RIVER",
-        "TANARIVER": "TANA RIVER",
-    }
-    
-    if cleaned in county_mapping:
-        return county_mapping[cleaned]
+    if cleaned in COUNTY_ALIASES:
+        return COUNTY_ALIASES[cleaned]
     
-    # Fuzzy matching for partial matches
-    for official_county in OFFICIAL_COUNTIES:
-        # Check if cleaned input is contained in or contains the official name
-        if cleaned in official_county or official_county in cleaned:
-            # Additional check: should be at least 60% of the length
-            if len(cleaned) >= len(official_county) * 0.6:
-                return official_county
+    # Fuzzy matching for partial matches: the first official county (in list
+    # order) that is contained in the input, or that contains the input when
+    # the input is at least 60% of its length
+    contained = OFFICIAL_COUNTY_MATCHER.first_match(cleaned)
+    containing = OFFICIAL_COUNTY_FRAGMENTS.get(cleaned)
+    candidates = [index for index in (contained, containing) if index is not None]
+    if candidates:
+        return OFFICIAL_COUNTIES[min(candidates)]
     
     # If no match found, default to NAIROBI (capital city)
     return "NAIROBI"
 
 
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
 def normalize_education_level(level_input: str) -> str:
     """
     Normalize education level to standard categories
@@ -459,6 +919,7 @@ def normalize_education_level(level_input: str) -> str:
     return ""
 
 
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
 def normalize_company_name(company_input: str) -> str:
     """
     Normalize company names for consistency
@@ -469,61 +930,35 @@ def normalize_company_name(company_input: str) -> str:
     # Clean the input
     cleaned = company_input.strip()
     
-    # Remove common suffixes (but preserve them in a standardized way)
-    company_suffixes = [
-        ("LIMITED", "LTD"),
-        ("LTD.", "LTD"),
-        ("LTD", "LTD"),
-        ("INC.", "INC"),
-        ("INCORPORATED", "INC"),
-        ("CORPORATION", "CORP"),
-        ("CORP.", "CORP"),
-        ("CO.", "CO"),
-        ("COMPANY", "CO"),
-    ]
-    
     # Convert to uppercase for consistency
     cleaned_upper = cleaned.upper()
     
-    # Common abbreviations and full names mapping
-    company_mappings = {
-        "KEBS": "KENYA BUREAU OF STANDARDS",
-        "KBS": "KENYA BUREAU OF STANDARDS",
-        "KENYA BUREAU OF STANDARD": "KENYA BUREAU OF STANDARDS",
-        "KRA": "KENYA REVENUE AUTHORITY",
-        "KPLC": "KENYA POWER AND LIGHTING COMPANY",
-        "KPLC": "KENYA POWER",
-        "KENYA POWER & LIGHTING": "KENYA POWER",
-        "SAFARICOM PLC": "SAFARICOM",
-        "SAFARICOM LIMITED": "SAFARICOM",
-        "CO-OPERATIVE BANK": "COOPERATIVE BANK",
-        "COOP BANK": "COOPERATIVE BANK",
-        "KCB": "KENYA COMMERCIAL BANK",
-        "EQUITY BANK": "EQUITY BANK",
-        "NHIF": "NATIONAL HOSPITAL INSURANCE FUND",
-        "NSSF": "NATIONAL SOCIAL SECURITY FUND",
-        "KWS": "KENYA WILDLIFE SERVICE",
-        "KFS": "KENYA FOREST SERVICE",
-        "KEMRI": "KENYA MEDICAL RESEARCH INSTITUTE",
-        "KALRO": "KENYA AGRICULTURAL AND LIVESTOCK RESEARCH ORGANIZATION",
-        "KENYATTA NATIONAL HOSPITAL": "KENYATTA NATIONAL HOSPITAL",
-        "KNH": "KENYATTA NATIONAL HOSPITAL",
-        "MOH": "MINISTRY OF HEALTH",
-    }
-    
     # Check for exact mapping
-    if cleaned_upper in company_mappings:
-        return company_mappings[cleaned_upper]
+    if cleaned_upper in COMPANY_ALIASES:
+        return COMPANY_ALIASES[cleaned_upper]
     
-    # Check for partial matches
-    for abbr, full_name in company_mappings.items():
-        if abbr in cleaned_upper or cleaned_upper in abbr:
-            return full_name
+    # Check for partial matches: first alias (in table order) contained in
+    # the input or containing it
+    contained = COMPANY_ALIAS_MATCHER.first_match(cleaned_upper)
+    containing = COMPANY_ALIAS_FRAGMENTS.get(cleaned_upper)
+    candidates = [index for index in (contained, containing) if index is not None]
+    if candidates:
+        return COMPANY_ALIAS_ITEMS[min(candidates)][1]
     
     # Title case for professional appearance
     return cleaned.title() if cleaned else ""
 
 
+def split_company_preferences(preferences: str) -> List[str]:
+    """Normalized company names in a "Three Preferred Companies" answer, in order."""
+    preferences = preferences.strip()
+    if not preferences:
+        return []
+    # Handle multiple companies separated by comma, filtering out empty names
+    return [company for company in (normalize_company_name(c) for c in preferences.split(",")) if company]
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
 def normalize_school_name(school_input: str) -> str:
     """
     Normalize school names for consistency
@@ -537,571 +972,3059 @@ def normalize_school_name(school_input: str) -> str:
     # Convert to uppercase for consistency
     cleaned_upper = cleaned.upper()
     
-    # Common school abbreviations and variations
-    school_mappings = {
-        "UON": "UNIVERSITY OF NAIROBI",
-        "U.O.N": "UNIVERSITY OF NAIROBI",
-        "NAIROBI UNIVERSITY": "UNIVERSITY OF NAIROBI",
-        "KU": "KENYATTA UNIVERSITY",
-        "K.U": "KENYATTA UNIVERSITY",
-        "MOI UNIVERSITY": "MOI UNIVERSITY",
-        "JKUAT": "JOMO KENYATTA UNIVERSITY OF AGRICULTURE AND TECHNOLOGY",
-        "J.K.U.A.T": "JOMO KENYATTA UNIVERSITY OF AGRICULTURE AND TECHNOLOGY",
-        "JKUAT": "JOMO KENYATTA UNIVERSITY OF AGRICULTURE AND TECHNOLOGY",
-        "EGERTON": "EGERTON UNIVERSITY",
-        "EGERTON UNIVERSITY": "EGERTON UNIVERSITY",
-        "STRATHMORE": "STRATHMORE UNIVERSITY",
-        "STRATHMORE UNIVERSITY": "STRATHMORE UNIVERSITY",
-        "USIU": "UNITED STATES INTERNATIONAL UNIVERSITY",
-        "USIU-AFRICA": "UNITED STATES INTERNATIONAL UNIVERSITY",
-        "KCA": "KCA UNIVERSITY",
-        "KCA UNIVERSITY": "KCA UNIVERSITY",
-        "MULTIMEDIA UNIVERSITY": "MULTIMEDIA UNIVERSITY OF KENYA",
-        "MMU": "MULTIMEDIA UNIVERSITY OF KENYA",
-        "MOUNT KENYA UNIVERSITY": "MOUNT KENYA UNIVERSITY",
-        "MKU": "MOUNT KENYA UNIVERSITY",
-        "TECHNICAL UNIVERSITY OF KENYA": "TECHNICAL UNIVERSITY OF KENYA",
-        "TUK": "TECHNICAL UNIVERSITY OF KENYA",
-        "KENYA POLYTECHNIC": "TECHNICAL UNIVERSITY OF KENYA",
-        "KABETE NATIONAL POLYTECHNIC": "KABETE NATIONAL POLYTECHNIC",
-        "KABETE POLY": "KABETE NATIONAL POLYTECHNIC",
-        "MOMBASA POLYTECHNIC": "MOMBASA POLYTECHNIC UNIVERSITY COLLEGE",
-        "MPC": "MOMBASA POLYTECHNIC UNIVERSITY COLLEGE",
-    }
-    
     # Check for exact mapping
-    if cleaned_upper in school_mappings:
-        return school_mappings[cleaned_upper]
+    if cleaned_upper in SCHOOL_ALIASES:
+        return SCHOOL_ALIASES[cleaned_upper]
     
-    # Check for partial matches for universities
-    for abbr, full_name in school_mappings.items():
-        if abbr in cleaned_upper:
-            return full_name
+    # Check for partial matches for universities (first alias in table order)
+    match = SCHOOL_ALIAS_MATCHER.first_match(cleaned_upper)
+    if match is not None:
+        return SCHOOL_ALIAS_ITEMS[match][1]
     
     # Title case for professional appearance
     return cleaned.title() if cleaned else ""
 
 
-class GoogleSheetsClient:
-    """Manages Google Sheets connection and data fetching"""
-    
-    _instance = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialize()
-        return cls._instance
-    
-    def _initialize(self):
-        """Initialize Google Sheets client"""
-        if not os.path.exists(SERVICE_ACCOUNT_FILE):
-            raise FileNotFoundError(
-                f"{SERVICE_ACCOUNT_FILE} not found. "
-                "Please create it via Google Cloud Console."
-            )
-        
-        try:
-            creds = ServiceAccountCredentials.from_json_keyfile_name(
-                SERVICE_ACCOUNT_FILE, SCOPE
-            )
-            self.client = gspread.authorize(creds)
-            self.spreadsheet = self.client.open_by_key(SPREADSHEET_ID)
-            self.worksheet = self.spreadsheet.sheet1
-            self._records_cache: List[Dict[str, Any]] = []
-            self._records_cache_at = 0.0
-            self._records_cache_lock = Lock()
-            self._global_stats_cache: Optional[Dict[str, Any]] = None
-            self._global_stats_cache_at = 0.0
-        except Exception as e:
-            raise RuntimeError(f"Failed to initialize Google Sheets client: {str(e)}")
-    
-    def fetch_all_records(self, force_refresh: bool = False, allow_stale: bool = True) -> List[Dict[str, Any]]:
-        """Fetch all records from the worksheet"""
-        now = time.time()
-        cache_age = now - self._records_cache_at
-        if (
-            not force_refresh
-            and self._records_cache
-            and cache_age < RECORDS_CACHE_TTL_SECONDS
-        ):
-            return self._records_cache
+def normalize_gender(gender_input: str) -> str:
+    """
+    Normalize gender to Male, Female or Other (blank values are left as they are)
+    """
+    gender = gender_input.strip().lower()
+    if gender in ["m", "male", "man", "boy"]:
+        return "Male"
+    if gender in ["f", "female", "woman", "girl", "lady"]:
+        return "Female"
+    if gender:
+        return "Other"
+    return gender_input
 
-        with self._records_cache_lock:
-            now = time.time()
-            cache_age = now - self._records_cache_at
-            if (
-                not force_refresh
-                and self._records_cache
-                and cache_age < RECORDS_CACHE_TTL_SECONDS
-            ):
-                return self._records_cache
 
-            try:
-                # Get all values including headers
-                all_values = self.worksheet.get_all_values()
-
-                if not all_values or len(all_values) < 2:
-                    self._records_cache = []
-                    self._records_cache_at = now
-                    return []
-
-                # Get headers and handle duplicates by adding suffix
-                headers = all_values[0]
-                header_counts = {}
-                unique_headers = []
-
-                for header in headers:
-                    if header in header_counts:
-                        header_counts[header] += 1
-                        unique_headers.append(f"{header}_{header_counts[header]}")
-                    else:
-                        header_counts[header] = 0
-                        unique_headers.append(header)
-
-                date_candidate_fields = get_date_candidate_fields(unique_headers)
-
-                # Convert rows to dictionaries and apply normalization
-                records = []
-                for row in all_values[1:]:
-                    # Pad row if it's shorter than headers
-                    padded_row = row + [''] * (len(unique_headers) - len(row))
-                    record = dict(zip(unique_headers, padded_row))
-
-                    # Apply data normalization
-                    if "YOUR COUNTY" in record:
-                        record["YOUR COUNTY"] = normalize_county(record["YOUR COUNTY"])
-                    if "REGION/COUNTY" in record:
-                        record["REGION/COUNTY"] = normalize_county(record["REGION/COUNTY"])
-                    if "Your Level of Training (e.g. Deg, Dip, Cert)" in record:
-                        record["Your Level of Training (e.g. Deg, Dip, Cert)"] = normalize_education_level(record["Your Level of Training (e.g. Deg, Dip, Cert)"])
-
-                    # Normalize gender to standard values
-                    if "GENDER" in record and record["GENDER"]:
-                        gender = record["GENDER"].strip().lower()
-                        if gender in ["m", "male", "man", "boy"]:
-                            record["GENDER"] = "Male"
-                        elif gender in ["f", "female", "woman", "girl", "lady"]:
-                            record["GENDER"] = "Female"
-                        elif gender:
-                            record["GENDER"] = "Other"
-
-                    # Normalize school name
-                    if "The name of your school" in record:
-                        record["The name of your school"] = normalize_school_name(record["The name of your school"])
-
-                    # Precompute application year/quarter once to keep /stats fast.
-                    parsed_date = parse_row_application_date(record, date_candidate_fields)
-                    record["_application_year"] = parsed_date.get("year")
-                    record["_application_quarter"] = parsed_date.get("quarter", "Unknown")
-
-                    records.append(record)
-
-                self._records_cache = records
-                self._records_cache_at = now
-                self._global_stats_cache = None
-                self._global_stats_cache_at = 0.0
-                return records
-            except Exception as e:
-                stale_age = time.time() - self._records_cache_at
-                if allow_stale and self._records_cache and stale_age < RECORDS_STALE_MAX_SECONDS:
-                    return self._records_cache
-                raise RuntimeError(f"Failed to fetch records from Google Sheets: {str(e)}")
+def normalize_quarter(quarter_input: str) -> str:
+    """
+    Map "Q1", "q1", "1" or a full label such as "Q1 (Jul-Sep)" to the financial-year quarter label
+    """
+    cleaned = quarter_input.strip().upper()
+    for label in QUARTER_ORDER:
+        if cleaned in (label.upper(), label[:2], label[1]):
+            return label
+    return quarter_input.strip()
 
-    def get_cached_global_stats(self) -> Optional[Dict[str, Any]]:
-        """Return cached unfiltered stats if still valid."""
-        if not self._global_stats_cache:
-            return None
-        cache_age = time.time() - self._global_stats_cache_at
-        if cache_age >= STATS_CACHE_TTL_SECONDS:
-            return None
-        return self._global_stats_cache
 
-    def set_cached_global_stats(self, stats: Dict[str, Any]) -> None:
-        """Store unfiltered stats cache."""
-        self._global_stats_cache = stats
-        self._global_stats_cache_at = time.time()
+# Record filters accepted as query parameters: name -> (column, normalizer applied to
+# the query value). Each column gets posting lists in PostingIndex, so a new filter
+# only needs an entry here and a query parameter on RecordFilterParams.
+FILTER_DIMENSIONS = {
+    "county": (COUNTY_FIELD, normalize_county),
+    "level": (LEVEL_FIELD, normalize_education_level),
+    "school": (SCHOOL_FIELD, normalize_school_name),
+    "gender": (GENDER_FIELD, normalize_gender),
+    # Calendar year of the application date, as in _application_year
+    "year": (YEAR_FIELD, int),
+    "quarter": (QUARTER_FIELD, normalize_quarter),
+}
 
-    def cache_snapshot(self) -> Dict[str, Any]:
-        """Expose cache state for observability endpoints."""
-        cache_age = time.time() - self._records_cache_at if self._records_cache_at else None
-        return {
-            "cached": bool(self._records_cache),
-            "cache_age_seconds": round(cache_age, 2) if cache_age is not None else None,
-            "record_count": len(self._records_cache),
+
+def normalization_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Hit/miss counters of the memoized normalizers and date parser."""
+    stats = {}
+    for normalizer in (
+        normalize_county,
+        normalize_education_level,
+        normalize_company_name,
+        normalize_school_name,
+        parse_datetime_value,
+    ):
+        info = normalizer.cache_info()
+        stats[normalizer.__name__] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "max_size": info.maxsize,
         }
+    return stats
 
 
-def get_sheets_client() -> GoogleSheetsClient:
-    """Get or initialize Google Sheets client"""
-    return GoogleSheetsClient()
+def deduplicate_headers(headers: List[str]) -> List[str]:
+    """Make header names unique by adding a numeric suffix to repeats."""
+    header_counts = {}
+    unique_headers = []
 
+    for header in headers:
+        if header in header_counts:
+            header_counts[header] += 1
+            unique_headers.append(f"{header}_{header_counts[header]}")
+        else:
+            header_counts[header] = 0
+            unique_headers.append(header)
 
-@app.get("/")
-async def root():
-    """Root endpoint"""
-    return {
-        "message": "Dynamic Dashboard API",
-        "endpoints": {
-            "data": "/data",
-            "stats": "/stats",
-            "health": "/health",
-            "metadata": "/metadata",
-            "counties": "/counties",
-            "levels": "/levels",
-            "schools": "/schools",
-            "search": "/search"
-        }
-    }
+    return unique_headers
 
 
-@app.get("/metadata")
-async def get_metadata():
-    """Get metadata about data normalization and standards"""
-    return {
-        "official_counties": {
-            "count": len(OFFICIAL_COUNTIES),
-            "list": sorted(OFFICIAL_COUNTIES),
-            "description": "Kenya's 47 official counties - all data is normalized to these"
-        },
-        "education_levels": {
-            "count": len(EDUCATION_LEVELS),
-            "list": sorted(EDUCATION_LEVELS.keys()),
-            "description": "Standardized education levels - all variations are normalized"
-        },
-        "data_normalization": {
-            "counties": "All county name variations are normalized to official names",
-            "education": "All education level variations are standardized",
-            "companies": "Company names are cleaned and standardized",
-            "gender": "Gender values are normalized to Male/Female/Other",
-            "courses": "Course names are converted to title case",
-            "schools": "School names are normalized for consistency"
-        }
-    }
+def fingerprint_row(row: List[str]) -> str:
+    """Stable hash of a raw sheet row, ignoring trailing empty cells."""
+    cells = list(row)
+    while cells and cells[-1] == "":
+        cells.pop()
+    return hashlib.sha1("\x1f".join(cells).encode("utf-8")).hexdigest()
 
 
-@app.get("/health")
-async def health_check(deep: bool = Query(False)):
-    """Health check endpoint. Use deep=true to verify Google Sheets fetch path."""
-    try:
-        client = get_sheets_client()
-        if deep:
-            client.fetch_all_records(force_refresh=False, allow_stale=False)
-        return {
-            "status": "healthy",
-            "timestamp": datetime.now().isoformat(),
-            "deep_check": deep,
-            "cache": client.cache_snapshot(),
-        }
-    except Exception as e:
-        raise HTTPException(status_code=503, detail=str(e))
+def digest_rows(rows: Iterable[List[str]], previous: str = "") -> str:
+    """
+    Version hash of raw sheet rows, chained row by row: each row is hashed
+    together with the digest of the rows before it. Passing the previous
+    version extends it with appended rows (incremental syncs), giving the
+    same version as a full sync of all the rows.
+    """
+    sha1 = hashlib.sha1
+    chain = bytes.fromhex(previous) if previous else sha1().digest()
+    for row in rows:
+        cells = list(row)
+        while cells and cells[-1] == "":
+            cells.pop()
+        chain = sha1(chain + "\x1f".join(cells).encode("utf-8")).digest()
+    return chain.hex()
 
 
-@app.on_event("startup")
-async def warm_records_cache_on_startup():
-    """Warm records cache in the background so first dashboard render is faster."""
-    async def _warm():
-        try:
-            await asyncio.to_thread(get_sheets_client().fetch_all_records, False, True)
-        except Exception as exc:
-            print(f"Warning: cache warmup failed: {exc}")
+def normalize_record(
+    row: List[str],
+    headers: List[str],
+    date_candidate_fields: List[str],
+    date_parsers: Optional[Dict[str, DateColumnParser]] = None,
+) -> Dict[str, Any]:
+    """Convert a raw sheet row into a normalized record dict."""
+    # Pad row if it's shorter than headers
+    padded_row = row + [''] * (len(headers) - len(row))
+    record = dict(zip(headers, padded_row))
 
-    asyncio.create_task(_warm())
+    # Apply data normalization
+    if COUNTY_FIELD in record:
+        record[COUNTY_FIELD] = normalize_county(record[COUNTY_FIELD])
+    if REGION_FIELD in record:
+        record[REGION_FIELD] = normalize_county(record[REGION_FIELD])
+    if LEVEL_FIELD in record:
+        record[LEVEL_FIELD] = normalize_education_level(record[LEVEL_FIELD])
 
+    # Normalize gender to standard values
+    if GENDER_FIELD in record and record[GENDER_FIELD]:
+        record[GENDER_FIELD] = normalize_gender(record[GENDER_FIELD])
 
-@app.get("/data")
-async def get_data(
-    limit: Optional[int] = Query(None, gt=0),
-    offset: Optional[int] = Query(0, ge=0)
-):
+    # Normalize school name
+    if SCHOOL_FIELD in record:
+        record[SCHOOL_FIELD] = normalize_school_name(record[SCHOOL_FIELD])
+
+    # Precompute application year/quarter once to keep /stats fast.
+    parsed_date = parse_row_application_date(record, date_candidate_fields, date_parsers)
+    record[YEAR_FIELD] = parsed_date.get("year")
+    record[QUARTER_FIELD] = parsed_date.get("quarter", "Unknown")
+    record[DATE_FIELD] = parsed_date.get("day")
+
+    return record
+
+
+def normalize_rows_chunk(
+    rows: List[List[str]],
+    headers: List[str],
+    date_candidate_fields: List[str],
+    date_layouts: Dict[str, Optional[str]],
+) -> List[tuple]:
     """
-    Fetch all records from Google Sheet
-    
-    - **limit**: Maximum number of records to return
-    - **offset**: Number of records to skip
+    Process-pool task: normalize raw rows into value tuples in RecordStore field order.
+    Date parsers are rebuilt from their layout names, which pickle smaller than the parsers.
     """
-    try:
-        client = get_sheets_client()
-        records = client.fetch_all_records()
-        
-        # Apply offset and limit
-        if offset:
-            records = records[offset:]
-        if limit:
-            records = records[:limit]
+    date_parsers = {field: DateColumnParser.for_layout(name) for field, name in date_layouts.items()}
+    fields = headers + DERIVED_FIELDS
+    return [
+        tuple(record[field] for field in fields)
+        for record in (normalize_record(row, headers, date_candidate_fields, date_parsers) for row in rows)
+    ]
+
+
+class MappedStrings:
+    """
+    Read-only text column inside a mapped snapshot: UTF-8 values, each followed
+    by SNAPSHOT_STRING_SEPARATOR, and the byte offset where each one starts
+    (plus the end). Values are decoded when read, so workers attached to the
+    same snapshot share the text instead of each holding its own strings.
+    """
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[position] for position in range(start, stop, step)]
+            if start >= stop:
+                return []
+            # One decode for the whole run of values
+            text = str(self._data[self._offsets[start]:self._offsets[stop] - 1], "utf-8")
+            return text.split(SNAPSHOT_STRING_SEPARATOR)
+        if index < 0:
+            index += len(self)
+        return str(self._data[self._offsets[index]:self._offsets[index + 1] - 1], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self[:])
+
+
+def copy_column(column: Any) -> Any:
+    """Writable copy of a column (views into a mapped snapshot become arrays and lists)."""
+    if isinstance(column, memoryview):
+        return array(column.format, column.tobytes())
+    return column[:]
+
+
+class RecordStore:
+    """
+    Columnar in-memory store for normalized sheet records.
+
+    Every column is kept as a single array instead of repeating header strings
+    in per-row dicts. Categorical columns (see CATEGORICAL_FIELDS) are interned
+    as small integer codes; row dicts are only built for rows that are returned.
+    Indexes from RECORD_INDEX_FACTORIES are updated whenever rows are added.
+    """
+
+    def __init__(self, headers: List[str]):
+        self.headers = list(headers)
+        self.fields = self.headers + DERIVED_FIELDS
+        self._size = 0
+        self._columns: Dict[str, Any] = {}
+        self._vocabularies: Dict[str, List[str]] = {}
+        self._codes: Dict[str, Dict[str, int]] = {}
+
+        for field in self.fields:
+            if field in CATEGORICAL_FIELDS:
+                self._columns[field] = array("I")
+                self._vocabularies[field] = []
+                self._codes[field] = {}
+            elif field == YEAR_FIELD:
+                # Year 0 stands for "no parsable application date".
+                self._columns[field] = array("H")
+            elif field == DATE_FIELD:
+                # Date ordinals, 0 again standing for "no parsable application date".
+                self._columns[field] = array("I")
+            else:
+                self._columns[field] = []
+
+        self._indexes = {name: factory() for name, factory in RECORD_INDEX_FACTORIES.items()}
+        # Memory map backing read-only columns loaded from a shared snapshot
+        self._buffer = None
+        # Content hash of the sheet rows behind this snapshot, and when that content last changed
+        self.version = ""
+        self.modified_at = 0.0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self._size):
+            yield self.row(index)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self.row(index) for index in range(*key.indices(self._size))]
+        if key < 0:
+            key += self._size
+        if not 0 <= key < self._size:
+            raise IndexError("record index out of range")
+        return self.row(key)
+
+    def __contains__(self, field: str) -> bool:
+        return field in self._columns
+
+    def _intern(self, field: str, value: str) -> int:
+        code = self._codes[field].get(value)
+        if code is None:
+            code = len(self._vocabularies[field])
+            self._vocabularies[field].append(value)
+            self._codes[field][value] = code
+        return code
+
+    def _append_columns(self, record: Dict[str, Any]) -> None:
+        for field, column in self._columns.items():
+            value = record.get(field, "")
+            if field in self._codes:
+                column.append(self._intern(field, value))
+            elif field == YEAR_FIELD:
+                column.append(value or 0)
+            elif field == DATE_FIELD:
+                column.append(date_ordinal(value))
+            else:
+                column.append(value)
+        self._size += 1
+
+    def _append_values(self, values: Sequence[Any]) -> None:
+        for (field, column), value in zip(self._columns.items(), values):
+            if field in self._codes:
+                column.append(self._intern(field, value))
+            elif field == YEAR_FIELD:
+                column.append(value or 0)
+            elif field == DATE_FIELD:
+                column.append(date_ordinal(value))
+            else:
+                column.append(value)
+        self._size += 1
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Append one normalized record."""
+        self.extend([record])
+
+    def extend(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Append normalized records and fold them into the indexes."""
+        start = self._size
+        for record in records:
+            self._append_columns(record)
+        self._index_rows_from(start)
+
+    def extend_values(self, rows: Iterable[Sequence[Any]]) -> None:
+        """Append normalized rows given as complete value sequences in `fields` order."""
+        start = self._size
+        for values in rows:
+            self._append_values(values)
+        self._index_rows_from(start)
+
+    def _index_rows_from(self, start: int) -> None:
+        if self._size > start:
+            new_rows = range(start, self._size)
+            for index in self._indexes.values():
+                index.add_rows(self, new_rows)
+
+    def copy(self) -> "RecordStore":
+        """Independent copy that can be extended without affecting readers of this one."""
+        clone = RecordStore.__new__(RecordStore)
+        clone.headers = list(self.headers)
+        clone.fields = list(self.fields)
+        clone._size = self._size
+        clone._columns = {field: copy_column(column) for field, column in self._columns.items()}
+        clone._vocabularies = {field: list(values) for field, values in self._vocabularies.items()}
+        clone._codes = {field: dict(codes) for field, codes in self._codes.items()}
+        clone._indexes = {name: index.copy() for name, index in self._indexes.items()}
+        clone._buffer = None
+        clone.version = self.version
+        clone.modified_at = self.modified_at
+        return clone
+
+    def export_columns(self) -> Iterator[tuple]:
+        """Yield (field, kind, data, vocabulary) for every column, for snapshots."""
+        for field, column in self._columns.items():
+            if field in self._vocabularies:
+                yield field, "codes", column, self._vocabularies[field]
+            elif field == YEAR_FIELD:
+                yield field, "years", column, None
+            elif field == DATE_FIELD:
+                yield field, "dates", column, None
+            else:
+                yield field, "strings", column, None
+
+    def export_indexes(self) -> Dict[str, Any]:
+        return self._indexes
+
+    @classmethod
+    def from_columns(cls, headers: List[str], size: int, columns: List[tuple],
+                     indexes: Optional[Dict[str, Any]] = None, buffer: Any = None) -> "RecordStore":
+        """
+        Rebuild a store from export_columns() output.
+        Indexes are rebuilt from the columns when not provided (or when only
+        SNAPSHOT_REBUILT_INDEXES are missing, just those). Columns may be
+        read-only memoryviews into `buffer`; copy() turns them into arrays.
+        """
+        store = cls(headers)
+        store._buffer = buffer
+        for field, _, data, vocabulary in columns:
+            store._columns[field] = data
+            if vocabulary is not None:
+                store._vocabularies[field] = list(vocabulary)
+                store._codes[field] = {value: code for code, value in enumerate(vocabulary)}
+        store._size = size
+
+        rebuilt = list(store._indexes.values())
+        if indexes is not None and set(indexes) | SNAPSHOT_REBUILT_INDEXES == set(store._indexes):
+            rebuilt = [index for name, index in store._indexes.items() if name not in indexes]
+            store._indexes = {name: indexes.get(name, index) for name, index in store._indexes.items()}
+        if size:
+            for index in rebuilt:
+                index.add_rows(store, range(size))
+        return store
+
+    def index(self, name: str) -> Any:
+        """Return one of the indexes maintained alongside the columns."""
+        return self._indexes[name]
+
+    def value(self, field: str, index: int) -> Any:
+        """Return the decoded value of one cell."""
+        column = self._columns[field]
+        if field in self._vocabularies:
+            return self._vocabularies[field][column[index]]
+        if field == YEAR_FIELD:
+            return column[index] or None
+        if field == DATE_FIELD:
+            return date.fromordinal(column[index]).isoformat() if column[index] else None
+        return column[index]
+
+    def row(self, index: int, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Build the record dict for a single row, optionally with only some fields."""
+        return {field: self.value(field, index) for field in (fields or self.fields)}
+
+    def rows(self, row_ids: Sequence[int], fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Build record dicts for the given row ids."""
+        return [self.row(index, fields) for index in row_ids]
+
+    def is_categorical(self, field: str) -> bool:
+        """Whether a column is stored as integer codes into a vocabulary."""
+        return field in self._vocabularies
+
+    def codes(self, field: str) -> Sequence[int]:
+        """Raw integer codes of a categorical column."""
+        return self._columns[field]
+
+    def vocabulary(self, field: str) -> List[str]:
+        """Distinct values of a categorical column, indexed by code."""
+        return self._vocabularies[field]
+
+    def column(self, field: str) -> Sequence[Any]:
+        """Raw storage of a column (codes for categorical columns)."""
+        return self._columns[field]
+
+    def distinct(self, field: str) -> List[Any]:
+        """Distinct values present in a column, in order of first appearance."""
+        if field not in self._columns:
+            return []
+        if field in self._vocabularies:
+            return list(self._vocabularies[field])
+        return list(dict.fromkeys(self._columns[field]))
+
+    def value_counts(self, field: str, row_ids: Optional[Sequence[int]] = None) -> Counter:
+        """
+        Count decoded values of a column, optionally restricted to row_ids.
+        Keys keep first-appearance order, matching Counter over row dicts.
+        """
+        if field not in self._columns:
+            return Counter()
+
+        column = self._columns[field]
+        values = column if row_ids is None else map(column.__getitem__, row_ids)
+        counts = Counter(values)
+
+        if field in self._vocabularies:
+            vocabulary = self._vocabularies[field]
+            return Counter({vocabulary[code]: count for code, count in counts.items()})
+        return counts
+
+    def group_rows(self, field: str, row_ids: Sequence[int]) -> Dict[Any, List[int]]:
+        """Group row ids by the decoded value of a column."""
+        if field not in self._columns:
+            return {"": list(row_ids)} if len(row_ids) else {}
+
+        column = self._columns[field]
+        groups: Dict[Any, List[int]] = {}
+        for index in row_ids:
+            rows = groups.get(column[index])
+            if rows is None:
+                groups[column[index]] = [index]
+            else:
+                rows.append(index)
+
+        if field in self._vocabularies:
+            vocabulary = self._vocabularies[field]
+            return {vocabulary[code]: rows for code, rows in groups.items()}
+        return groups
+
+
+QUARTER_ORDER = ["Q1 (Jul-Sep)", "Q2 (Oct-Dec)", "Q3 (Jan-Mar)", "Q4 (Apr-Jun)"]
+PLACED_VALUES = {"yes", "y", "true", "1", "placed"}
+
+
+def use_vectorized_stats(row_count: int) -> bool:
+    """Whether StatsAggregate should count this many rows with NumPy."""
+    if numpy is None or RECORDS_STATS_BACKEND == "python":
+        return False
+    return RECORDS_STATS_BACKEND == "numpy" or row_count >= RECORDS_STATS_VECTORIZE_MIN_ROWS
+
+
+def numpy_column(column: Any) -> Any:
+    """Zero-copy NumPy view of an array or memoryview column."""
+    return numpy.frombuffer(column, dtype=column.typecode if isinstance(column, array) else column.format)
+
+
+def numpy_row_selection(row_ids: Optional[Sequence[int]]) -> Any:
+    """Index selecting row_ids from a NumPy column: None (all rows), a slice or an index array."""
+    if row_ids is None:
+        return None
+    if isinstance(row_ids, range) and row_ids.step == 1:
+        return slice(row_ids.start, row_ids.stop)
+    if isinstance(row_ids, array):
+        return numpy_column(row_ids).astype(numpy.intp)
+    return numpy.fromiter(row_ids, dtype=numpy.intp, count=len(row_ids))
+
+
+class VectorizedValueCounts:
+    """
+    RecordStore.value_counts for one row selection, counting categorical codes with bincount.
+
+    Keys keep first-appearance order within the selection, so Counter.most_common
+    breaks ties exactly as it does over RecordStore.value_counts. Other columns
+    fall back to RecordStore.value_counts.
+    """
+
+    def __init__(self, records: "RecordStore", row_ids: Optional[Sequence[int]]):
+        self.records = records
+        self.row_ids = row_ids
+        self.selection = numpy_row_selection(row_ids)
+
+    def select(self, column: Any) -> Any:
+        values = numpy_column(column)
+        return values if self.selection is None else values[self.selection]
+
+    def __call__(self, field: str, row_ids: Optional[Sequence[int]] = None) -> Counter:
+        # Same signature as RecordStore.value_counts; the rows were fixed at construction
+        records = self.records
+        if field not in records or not records.is_categorical(field):
+            return records.value_counts(field, self.row_ids)
+
+        vocabulary = records.vocabulary(field)
+        counts = self.code_counts(records.codes(field), len(vocabulary))
+        return Counter({vocabulary[code]: count for code, count in counts.items()})
+
+    def code_counts(self, column: Any, code_count: int) -> Dict[int, int]:
+        """Rows per code of an integer-coded column, in order of first appearance."""
+        codes = self.select(column)
+        counts = numpy.bincount(codes, minlength=code_count)
+        present = numpy.flatnonzero(counts)
+        if self.selection is not None and len(present) > 1:
+            # Codes are assigned in order of first appearance over all rows, not within a subset
+            first_seen = numpy.full(len(counts), len(codes), dtype=numpy.intp)
+            numpy.minimum.at(first_seen, codes, numpy.arange(len(codes), dtype=numpy.intp))
+            present = present[numpy.argsort(first_seen[present], kind="stable")]
+        return dict(zip(present.tolist(), counts[present].tolist()))
+
+    def year_quarter_counts(self) -> Dict[tuple, int]:
+        """Row counts per (year, quarter code) pair."""
+        quarters = len(self.records.vocabulary(QUARTER_FIELD)) or 1
+        years = self.select(self.records.column(YEAR_FIELD)).astype(numpy.intp)
+        pairs = numpy.bincount(years * quarters + self.select(self.records.codes(QUARTER_FIELD)))
+        present = numpy.flatnonzero(pairs)
+        return {divmod(key, quarters): count for key, count in zip(present.tolist(), pairs[present].tolist())}
+
+
+class StatsAggregate:
+    """
+    Per-dimension counters behind /stats.
+
+    Rows are folded in as they are added to a RecordStore, so statistics can be
+    produced from the counters alone without another pass over the records.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.placements = 0
+        self.genders = Counter()
+        self.levels = Counter()
+        self.courses = Counter()
+        self.counties = Counter()
+        self.companies = Counter()
+        self.schools = Counter()
+        self.year_quarters = Counter()
+
+    COUNTERS = ("genders", "levels", "courses", "counties", "companies", "schools", "year_quarters")
+
+    def copy(self) -> "StatsAggregate":
+        clone = StatsAggregate()
+        clone.total = self.total
+        clone.placements = self.placements
+        for name in self.COUNTERS:
+            setattr(clone, name, Counter(getattr(self, name)))
+        return clone
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.total = state["total"]
+        self.placements = state["placements"]
+        for name in self.COUNTERS:
+            setattr(self, name, Counter(state[name]))
+
+    def add_rows(self, records: "RecordStore", row_ids: Optional[Sequence[int]] = None) -> "StatsAggregate":
+        """Fold rows of records (all rows when row_ids is None) into the counters."""
+        row_count = len(records) if row_ids is None else len(row_ids)
+        self.total += row_count
+        if not row_count:
+            return self
+
+        vectorized = VectorizedValueCounts(records, row_ids) if use_vectorized_stats(row_count) else None
+        value_counts = vectorized or records.value_counts
+
+        # Gender ratio - using actual Google Sheets column name
+        for gender, count in value_counts(GENDER_FIELD, row_ids).items():
+            if gender:
+                self.genders[gender.strip()] += count
+
+        # Education level breakdown - only standard levels are reported
+        for level, count in value_counts(LEVEL_FIELD, row_ids).items():
+            if level and level.strip() in EDUCATION_LEVELS.keys():
+                self.levels[level.strip()] += count
+
+        # Normalize course names to title case for consistency
+        for course, count in value_counts(COURSE_FIELD, row_ids).items():
+            course = course.strip()
+            if course:
+                self.courses[course.title()] += count
+
+        for county, count in value_counts(COUNTY_FIELD, row_ids).items():
+            if county:
+                self.counties[county.strip()] += count
+
+        # Companies were split and normalized once at ingest (see CompanyIndex)
+        company_index = records.index("companies")
+        if vectorized is not None:
+            list_counts = vectorized.code_counts(company_index.row_lists, len(company_index.lists))
+        else:
+            list_counts = company_index.list_counts(row_ids)
+        for list_code, count in list_counts.items():
+            for company_code in company_index.lists[list_code]:
+                self.companies[company_index.names[company_code]] += count
+
+        # Handle various forms of "yes" - YES, Yes, yes, TRUE, True, true, Y, y, 1
+        for placement_value, count in value_counts(PLACEMENT_FIELD, row_ids).items():
+            if str(placement_value).strip().lower() in PLACED_VALUES:
+                self.placements += count
+
+        for school, count in value_counts(SCHOOL_FIELD, row_ids).items():
+            if school.strip():
+                self.schools[school.strip()] += count
+
+        # Quarter breakdown - use precomputed year/quarter
+        quarter_names = records.vocabulary(QUARTER_FIELD)
+        if vectorized is not None:
+            pair_counts = vectorized.year_quarter_counts()
+        else:
+            years_column = records.column(YEAR_FIELD)
+            quarter_codes = records.codes(QUARTER_FIELD)
+            all_rows = range(len(records)) if row_ids is None else row_ids
+            pair_counts = Counter((years_column[i], quarter_codes[i]) for i in all_rows)
+        for (year, quarter_code), count in pair_counts.items():
+            quarter = quarter_names[quarter_code]
+            if quarter != "Unknown" and year:
+                self.year_quarters[(year, quarter)] += count
+
+        return self
+
+    def to_stats(self) -> Dict[str, Any]:
+        """Build the /stats payload from the counters."""
+        total_registrations = self.total
+
+        gender_ratio = {
+            "Male": round(self.genders.get("Male", 0) / total_registrations * 100, 2) if total_registrations else 0,
+            "Female": round(self.genders.get("Female", 0) / total_registrations * 100, 2) if total_registrations else 0,
+            "Other": round(self.genders.get("Other", 0) / total_registrations * 100, 2) if total_registrations else 0,
+        }
+
+        education_breakdown = {level: count for level, count in self.levels.most_common()}
+
+        # Top 5 courses
+        top_courses = [
+            {"name": course, "count": count}
+            for course, count in self.courses.most_common(5)
+        ]
+
+        # Geographic distribution (Top 5 counties)
+        geographic_distribution = [
+            {"county": county, "count": count}
+            for county, count in self.counties.most_common(5)
+        ]
+
+        # Top 10 preferred companies
+        preferred_companies = [
+            {"name": company, "count": count}
+            for company, count in self.companies.most_common(10)
+        ]
+
+        placement_rate = round(self.placements / total_registrations * 100, 2) if total_registrations else 0
+
+        # Top 10 schools
+        top_schools = [
+            {"name": school, "count": count}
+            for school, count in self.schools.most_common(10)
+        ]
+
+        quarter_counter = Counter()
+        for (_, quarter), count in self.year_quarters.items():
+            quarter_counter[quarter] += count
+
+        quarter_total = sum(quarter_counter.values())
+        quarter_breakdown = [
+            {
+                "quarter": quarter,
+                "count": quarter_counter.get(quarter, 0),
+                "percentage": round((quarter_counter.get(quarter, 0) / quarter_total) * 100, 2) if quarter_total else 0
+            }
+            for quarter in QUARTER_ORDER
+        ]
+
+        years = sorted({year for year, _ in self.year_quarters.keys()})
+        quarter_breakdown_by_year = [
+            {
+                "year": year,
+                "quarters": [
+                    {
+                        "quarter": quarter,
+                        "count": self.year_quarters.get((year, quarter), 0)
+                    }
+                    for quarter in QUARTER_ORDER
+                ]
+            }
+            for year in years
+        ]
+
+        return {
+            "total_registrations": total_registrations,
+            "placement_rate": placement_rate,
+            "gender_ratio": gender_ratio,
+            "education_breakdown": education_breakdown,
+            "top_courses": top_courses,
+            "geographic_distribution": geographic_distribution,
+            "preferred_companies": preferred_companies,
+            "top_schools": top_schools,
+            "quarter_breakdown": quarter_breakdown,
+            "quarter_breakdown_by_year": quarter_breakdown_by_year
+        }
+
+
+class StatsCube:
+    """
+    Precomputed StatsAggregate cells for every county x level combination.
+
+    Each dimension also has a wildcard cell (None), so /stats filtered on county
+    and/or level is answered from a single cell. Only low-cardinality columns are
+    dimensions: every cell is a full StatsAggregate, and a free-text column such
+    as the school name would add cells for every distinct spelling. Other filters
+    select rows through PostingIndex. Copies share cells until a refresh folds
+    new rows into them.
+    """
+
+    DIMENSIONS = (COUNTY_FIELD, LEVEL_FIELD)
+
+    def __init__(self):
+        self._cells: Dict[tuple, StatsAggregate] = {}
+        self._owned: set = set()
+
+    def copy(self) -> "StatsCube":
+        clone = StatsCube()
+        clone._cells = dict(self._cells)
+        return clone
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"cells": {key: cell.__getstate__() for key, cell in self._cells.items()}}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._cells = {}
+        for key, cell_state in state["cells"].items():
+            cell = StatsAggregate.__new__(StatsAggregate)
+            cell.__setstate__(cell_state)
+            self._cells[key] = cell
+        self._owned = set()
+
+    def cell(self, county: Optional[str] = None, level: Optional[str] = None) -> Optional[StatsAggregate]:
+        """Aggregate for the given filter values; None means "all"."""
+        return self._cells.get((county, level))
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def add_rows(self, records: "RecordStore", row_ids: Sequence[int]) -> None:
+        # Decode the dimensions per row; absent columns read as ""
+        dimension_values = []
+        for field in self.DIMENSIONS:
+            if field in records:
+                vocabulary = records.vocabulary(field)
+                codes = records.codes(field)
+                dimension_values.append([vocabulary[codes[i]] for i in row_ids])
+            else:
+                dimension_values.append([""] * len(row_ids))
+
+        cell_rows: Dict[tuple, List[int]] = {}
+        for index, county, level in zip(row_ids, *dimension_values):
+            for key in ((county, level), (county, None), (None, level), (None, None)):
+                rows = cell_rows.get(key)
+                if rows is None:
+                    cell_rows[key] = [index]
+                else:
+                    rows.append(index)
+
+        for key, rows in cell_rows.items():
+            cell = self._cells.get(key)
+            if cell is None:
+                cell = StatsAggregate()
+            elif key not in self._owned:
+                # Cell is shared with the snapshot this cube was copied from
+                cell = cell.copy()
+            self._cells[key] = cell
+            self._owned.add(key)
+            cell.add_rows(records, rows)
+
+
+def flatten_arrays(arrays: Iterable[array]) -> tuple:
+    """Concatenate same-typed arrays into (offsets, values) for compact snapshots."""
+    offsets = array("Q", [0])
+    values = array("I")
+    for item in arrays:
+        values.extend(item)
+        offsets.append(len(values))
+    return offsets, values
+
+
+def unflatten_arrays(offsets: array, values: array) -> List[array]:
+    return [values[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+class CompanyIndex:
+    """
+    Preferred companies of every row, split and normalized once at ingest.
+
+    Each distinct list of company codes (into `names`) is interned in `lists`
+    and every row stores the code of its list in `row_lists`, so statistics
+    count rows per list instead of re-splitting the raw answers. Every company
+    also has a posting list of the rows that name it. Rows must be added in
+    order, as RecordStore appends them.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._name_codes: Dict[str, int] = {}
+        self.lists: List[tuple] = []
+        self._list_codes: Dict[tuple, int] = {}
+        self.row_lists = array("I")
+        self._postings: List[array] = []
+        self._owned_postings: set = set()
+
+    def copy(self) -> "CompanyIndex":
+        clone = CompanyIndex()
+        clone.names = list(self.names)
+        clone._name_codes = dict(self._name_codes)
+        clone.lists = list(self.lists)
+        clone._list_codes = dict(self._list_codes)
+        clone.row_lists = array("I", self.row_lists)
+        clone._postings = list(self._postings)
+        return clone
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {
+            "names": self.names,
+            "lists": flatten_arrays(array("I", codes) for codes in self.lists),
+            "row_lists": self.row_lists,
+            "postings": flatten_arrays(self._postings),
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.names = state["names"]
+        self._name_codes = {name: code for code, name in enumerate(self.names)}
+        self.lists = [tuple(codes) for codes in unflatten_arrays(*state["lists"])]
+        self._list_codes = {codes: list_code for list_code, codes in enumerate(self.lists)}
+        self.row_lists = state["row_lists"]
+        self._postings = unflatten_arrays(*state["postings"])
+        self._owned_postings = set()
+
+    def _name_code(self, name: str) -> int:
+        code = self._name_codes.get(name)
+        if code is None:
+            code = len(self.names)
+            self.names.append(name)
+            self._name_codes[name] = code
+            self._postings.append(array("I"))
+            self._owned_postings.add(code)
+        return code
+
+    def _list_code(self, preferences: str) -> int:
+        codes = tuple(self._name_code(name) for name in split_company_preferences(preferences))
+        list_code = self._list_codes.get(codes)
+        if list_code is None:
+            list_code = len(self.lists)
+            self.lists.append(codes)
+            self._list_codes[codes] = list_code
+        return list_code
+
+    def add_rows(self, records: "RecordStore", row_ids: Sequence[int]) -> None:
+        if COMPANIES_FIELD not in records:
+            self.row_lists.extend([self._list_code("")] * len(row_ids))
+            return
+
+        column = records.column(COMPANIES_FIELD)
+        # Each distinct answer is split once per batch
+        answer_lists: Dict[str, int] = {}
+        for index in row_ids:
+            preferences = column[index]
+            list_code = answer_lists.get(preferences)
+            if list_code is None:
+                list_code = answer_lists[preferences] = self._list_code(preferences)
+            self.row_lists.append(list_code)
+
+            for code in dict.fromkeys(self.lists[list_code]):
+                if code not in self._owned_postings:
+                    self._postings[code] = array("I", self._postings[code])
+                    self._owned_postings.add(code)
+                self._postings[code].append(index)
+
+    def list_counts(self, row_ids: Optional[Sequence[int]] = None) -> Counter:
+        """Rows per list code, in order of first appearance."""
+        return Counter(self.row_lists if row_ids is None else map(self.row_lists.__getitem__, row_ids))
+
+    def rows(self, name: str) -> Optional[array]:
+        """Row ids (ascending) that name a normalized company, or None if no row does."""
+        code = self._name_codes.get(name)
+        return None if code is None else self._postings[code]
+
+
+def intersect_row_ids(smaller: Sequence[int], larger: Sequence[int]) -> array:
+    """
+    Intersect two ascending row-id lists.
+    Each row of `smaller` is binary searched in `larger`, so the cost follows the smaller list.
+    """
+    if numpy is not None:
+        needles = numpy_column(smaller) if isinstance(smaller, array) else numpy.asarray(smaller, dtype=numpy.uint32)
+        haystack = numpy_column(larger) if isinstance(larger, array) else numpy.asarray(larger, dtype=numpy.uint32)
+        positions = numpy.searchsorted(haystack, needles)
+        found = positions < len(haystack)
+        found[found] = haystack[positions[found]] == needles[found]
+        rows = array("I")
+        rows.frombytes(needles[found].astype(numpy.uint32).tobytes())
+        return rows
+
+    rows = array("I")
+    start = 0
+    for index in smaller:
+        start = bisect_left(larger, index, start)
+        if start == len(larger):
+            break
+        if larger[start] == index:
+            rows.append(index)
+    return rows
+
+
+class PostingIndex:
+    """
+    Ascending row-id posting lists for every value of the FILTER_DIMENSIONS columns.
+
+    A multi-filter query intersects the posting lists of its values, shortest
+    first, so it costs about as much as its most selective filter rather than a
+    scan of the table, and its rows feed straight into StatsAggregate.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, array]] = {}
+        self._owned: set = set()
+
+    def copy(self) -> "PostingIndex":
+        clone = PostingIndex()
+        clone._postings = {field: dict(postings) for field, postings in self._postings.items()}
+        return clone
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {
+            field: (list(postings.keys()), flatten_arrays(postings.values()))
+            for field, postings in self._postings.items()
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._postings = {
+            field: dict(zip(values, unflatten_arrays(*flattened)))
+            for field, (values, flattened) in state.items()
+        }
+        self._owned = set()
+
+    def add_rows(self, records: "RecordStore", row_ids: Sequence[int]) -> None:
+        for field, _ in FILTER_DIMENSIONS.values():
+            if field not in records:
+                continue
+            postings = self._postings.setdefault(field, {})
+            for value, rows in records.group_rows(field, row_ids).items():
+                existing = postings.get(value)
+                if existing is None:
+                    existing = array("I")
+                elif (field, value) not in self._owned:
+                    # Shared with the snapshot this index was copied from
+                    existing = array("I", existing)
+                postings[value] = existing
+                self._owned.add((field, value))
+                existing.extend(rows)
+
+    def select(self, filters: Sequence[tuple], row_count: int) -> Sequence[int]:
+        """Ascending ids of the rows matching every (field, value) filter, out of row_count rows."""
+        candidates = []
+        for field, value in filters:
+            postings = self._postings.get(field)
+            if postings is None:
+                # Missing columns read as "", just like r.get(field, "")
+                if value != "":
+                    return array("I")
+                continue
+            rows = postings.get(value)
+            if rows is None:
+                return array("I")
+            candidates.append(rows)
+
+        if not candidates:
+            return range(row_count)
+        candidates.sort(key=len)
+        rows = candidates[0]
+        for other in candidates[1:]:
+            if not rows:
+                break
+            rows = intersect_row_ids(rows, other)
+        return rows
+
+
+# Shortest bucket of each /stats/timeseries interval in days, for bounding the number of periods
+TIME_SERIES_PERIOD_DAYS = {"day": 1, "week": 7, "month": 28}
+
+
+def next_period(day: date, interval: str) -> date:
+    """Start of the day/week/month bucket after the one starting on `day`."""
+    if interval == "day":
+        return day + timedelta(days=1)
+    if interval == "week":
+        return day + timedelta(days=7)
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def period_start(day: date, interval: str) -> date:
+    """Start of the day/week (Monday)/month bucket containing `day`."""
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    return day
+
+
+class DateIndex:
+    """
+    Row ids ordered by application date (DATE_FIELD), for date ranges and time series.
+
+    `rows` holds every dated row sorted by (date, row id) and `days` their date
+    ordinals. The sorted days double as prefix sums: bisect_left(days, d) is the
+    number of rows dated before d, so a date range is selected and any bucket
+    is counted with two binary searches. Undated rows are left out.
+    """
+
+    def __init__(self):
+        self.rows = array("I")
+        self.days = array("I")
+        self._owned = True
+
+    def copy(self) -> "DateIndex":
+        clone = DateIndex()
+        clone.rows = self.rows
+        clone.days = self.days
+        clone._owned = False
+        return clone
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"rows": self.rows, "days": self.days}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.rows = state["rows"]
+        self.days = state["days"]
+        self._owned = False
+
+    def add_rows(self, records: "RecordStore", row_ids: Sequence[int]) -> None:
+        if DATE_FIELD not in records:
+            return
+        column = records.column(DATE_FIELD)
+        # Stable sort, so rows with the same date stay in sheet order
+        new_rows = sorted((index for index in row_ids if column[index]), key=column.__getitem__)
+        if not new_rows:
+            return
+        if not self._owned:
+            # Shared with the snapshot this index was copied from
+            self.rows = array("I", self.rows)
+            self.days = array("I", self.days)
+            self._owned = True
+
+        days, rows = self.days, self.rows
+        for index in new_rows:
+            day = column[index]
+            if not days or day >= days[-1]:
+                # Registrations mostly arrive in date order
+                days.append(day)
+                rows.append(index)
+            else:
+                # New rows come after every stored row, so they go last among their date
+                position = bisect_right(days, day)
+                days.insert(position, day)
+                rows.insert(position, index)
+
+    def bounds(self) -> Optional[tuple]:
+        """First and last application date, or None when no row is dated."""
+        if not self.days:
+            return None
+        return date.fromordinal(self.days[0]), date.fromordinal(self.days[-1])
+
+    def select(self, first_day: Optional[date] = None, last_day: Optional[date] = None) -> array:
+        """Ascending ids of the rows dated from first_day to last_day (inclusive)."""
+        start = bisect_left(self.days, first_day.toordinal()) if first_day else 0
+        end = bisect_right(self.days, last_day.toordinal()) if last_day else len(self.days)
+        return array("I", sorted(self.rows[start:end])) if end > start else array("I")
+
+
+def count_by_period(days: Sequence[int], interval: str, first_day: date, last_day: date) -> List[Dict[str, Any]]:
+    """
+    Rows per day/week/month bucket from first_day to last_day, given ascending date
+    ordinals. Each bucket costs one binary search into the ordinals (a prefix sum).
+    Buckets cut short by the range are labelled with the first day they count
+    and marked partial.
+    """
+    series = []
+    period = period_start(first_day, interval)
+    before = bisect_left(days, first_day.toordinal())
+    while period <= last_day:
+        following = next_period(period, interval)
+        start = max(period, first_day)
+        end = min(following - timedelta(days=1), last_day)
+        upto = bisect_right(days, end.toordinal())
+        series.append({
+            "period": start.isoformat(),
+            "count": upto - before,
+            "partial": start != period or end < following - timedelta(days=1),
+        })
+        before = upto
+        period = following
+    return series
+
+
+class SearchIndex:
+    """
+    Substring search over every sheet column.
+
+    Categorical columns have few distinct values: each distinct lowercased
+    (field, value) pair gets a posting list of row ids, and every trigram of
+    the value points back to it, so a query only verifies the values sharing
+    all of its trigrams. Free-text columns (names, phone numbers, emails,
+    timestamps) are nearly unique per row, where a posting list per value
+    would cost far more than the column itself. Their lowercased values are
+    kept as one string per column instead, each value followed by
+    TEXT_SEPARATOR, with the offset where every row starts; a query is found
+    with str.find and mapped back to rows by binary search on the offsets.
+    Rows must be added in order, as RecordStore appends them. Derived fields
+    such as _application_year are not indexed.
+    """
+
+    GRAM_SIZE = 3
+    TEXT_SEPARATOR = "\x00"
+
+    def __init__(self):
+        self._value_ids: Dict[tuple, int] = {}
+        self._values: List[str] = []
+        self._value_fields: List[str] = []
+        self._postings: List[array] = []
+        self._grams: Dict[str, array] = {}
+        self._short_values = array("I")
+        self._owned_postings: set = set()
+        self._owned_grams: set = set()
+        # Free-text columns: field -> joined lowercased values, and where each row starts
+        self._texts: Dict[str, str] = {}
+        self._text_offsets: Dict[str, array] = {}
+        self._owned_text_offsets: set = set()
+
+    def copy(self) -> "SearchIndex":
+        clone = SearchIndex()
+        clone._value_ids = dict(self._value_ids)
+        clone._values = list(self._values)
+        clone._value_fields = list(self._value_fields)
+        clone._postings = list(self._postings)
+        clone._grams = dict(self._grams)
+        clone._short_values = array("I", self._short_values)
+        clone._texts = dict(self._texts)
+        clone._text_offsets = dict(self._text_offsets)
+        return clone
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Flatten the many small posting arrays so the index pickles and loads quickly
+        return {
+            "values": self._values,
+            "value_fields": self._value_fields,
+            "postings": flatten_arrays(self._postings),
+            "gram_keys": list(self._grams.keys()),
+            "grams": flatten_arrays(self._grams.values()),
+            "short_values": self._short_values,
+            "texts": self._texts,
+            "text_offsets": self._text_offsets,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._values = state["values"]
+        self._value_fields = state["value_fields"]
+        self._value_ids = {
+            key: value_id for value_id, key in enumerate(zip(self._value_fields, self._values))
+        }
+        self._postings = unflatten_arrays(*state["postings"])
+        self._grams = dict(zip(state["gram_keys"], unflatten_arrays(*state["grams"])))
+        self._short_values = state["short_values"]
+        self._owned_postings = set()
+        self._owned_grams = set()
+        self._texts = state["texts"]
+        self._text_offsets = state["text_offsets"]
+        self._owned_text_offsets = set()
+
+    def _add_value(self, field: str, lowered: str) -> int:
+        value_id = len(self._values)
+        self._value_ids[(field, lowered)] = value_id
+        self._values.append(lowered)
+        self._value_fields.append(field)
+        self._postings.append(array("I"))
+        self._owned_postings.add(value_id)
+
+        if len(lowered) < self.GRAM_SIZE:
+            self._short_values.append(value_id)
+            return value_id
+
+        for gram in {lowered[i:i + self.GRAM_SIZE] for i in range(len(lowered) - self.GRAM_SIZE + 1)}:
+            value_ids = self._grams.get(gram)
+            if value_ids is None:
+                value_ids = array("I")
+            elif gram not in self._owned_grams:
+                value_ids = array("I", value_ids)
+            self._grams[gram] = value_ids
+            self._owned_grams.add(gram)
+            value_ids.append(value_id)
+        return value_id
+
+    def add_rows(self, records: "RecordStore", row_ids: Sequence[int]) -> None:
+        for field in records.headers:
+            if records.is_categorical(field):
+                self._add_value_rows(records, field, row_ids)
+            else:
+                self._add_text_rows(records, field, row_ids)
+
+    def _add_value_rows(self, records: "RecordStore", field: str, row_ids: Sequence[int]) -> None:
+        # Group by lowercased value so each distinct value is indexed once
+        lowered_groups: Dict[str, List[int]] = {}
+        for value, rows in records.group_rows(field, row_ids).items():
+            lowered = str(value).lower()
+            existing = lowered_groups.get(lowered)
+            if existing is None:
+                lowered_groups[lowered] = rows
+            else:
+                lowered_groups[lowered] = sorted(existing + rows)
+
+        for lowered, rows in lowered_groups.items():
+            value_id = self._value_ids.get((field, lowered))
+            if value_id is None:
+                value_id = self._add_value(field, lowered)
+            elif value_id not in self._owned_postings:
+                self._postings[value_id] = array("I", self._postings[value_id])
+                self._owned_postings.add(value_id)
+            self._postings[value_id].extend(rows)
+
+    def _add_text_rows(self, records: "RecordStore", field: str, row_ids: Sequence[int]) -> None:
+        text = self._texts.get(field, "")
+        offsets = self._text_offsets.get(field)
+        if offsets is None:
+            offsets = array("I")
+        elif field not in self._owned_text_offsets:
+            offsets = array("I", offsets)
+        self._text_offsets[field] = offsets
+        self._owned_text_offsets.add(field)
+
+        column = records.column(field)
+        if isinstance(row_ids, range) and row_ids.step == 1:
+            # Appended rows are one contiguous run (a mapped column decodes it in one go)
+            values = [str(value).lower() + self.TEXT_SEPARATOR for value in column[row_ids.start:row_ids.stop]]
+        else:
+            values = [str(column[index]).lower() + self.TEXT_SEPARATOR for index in row_ids]
+        position = len(text)
+        for value in values:
+            offsets.append(position)
+            position += len(value)
+        self._texts[field] = text + "".join(values)
+
+    def _candidate_values(self, query: str) -> Iterable[int]:
+        if len(query) < self.GRAM_SIZE:
+            candidates = set(self._short_values)
+            for gram, value_ids in self._grams.items():
+                if query in gram:
+                    candidates.update(value_ids)
+            return candidates
+
+        grams = sorted(
+            (self._grams.get(query[i:i + self.GRAM_SIZE]) for i in range(len(query) - self.GRAM_SIZE + 1)),
+            key=lambda value_ids: len(value_ids) if value_ids is not None else -1,
+        )
+        if grams[0] is None:
+            return []
+
+        candidates = grams[0]
+        for value_ids in grams[1:]:
+            candidates = [
+                value_id for value_id in candidates
+                if bisect_left(value_ids, value_id) < len(value_ids)
+                and value_ids[bisect_left(value_ids, value_id)] == value_id
+            ]
+            if not candidates:
+                break
+        return candidates
+
+    def _text_rows(self, field: str, query: str) -> List[int]:
+        """Ascending ids of the rows whose value in a free-text column contains query."""
+        text = self._texts[field]
+        offsets = self._text_offsets[field]
+        occurrences = text.count(query)
+        if occurrences > len(offsets) // 8:
+            # Matches in most rows: testing every value beats locating each match
+            return [row for row, value in enumerate(text.split(self.TEXT_SEPARATOR)) if query in value]
+
+        rows = []
+        position = text.find(query) if occurrences else -1
+        while position >= 0:
+            row = bisect_right(offsets, position)
+            rows.append(row - 1)
+            if row >= len(offsets):
+                break
+            # One match per row: continue from the start of the next row
+            position = text.find(query, offsets[row])
+        return rows
+
+    def search(self, query: str, field: Optional[str] = None, limit: int = 50) -> tuple:
+        """
+        Case-insensitive substring search.
+        Returns (total matching rows, first `limit` matching row ids in sheet order).
+        """
+        query = query.lower()
+        postings = [
+            self._postings[value_id]
+            for value_id in self._candidate_values(query)
+            if (field is None or self._value_fields[value_id] == field)
+            and query in self._values[value_id]
+        ]
+        if self.TEXT_SEPARATOR not in query:
+            for text_field in self._texts if field is None else [field] if field in self._texts else []:
+                rows = self._text_rows(text_field, query)
+                if rows:
+                    postings.append(rows)
+
+        if not postings:
+            return 0, []
+        if len(postings) == 1:
+            return len(postings[0]), list(postings[0][:limit])
+
+        matched_rows = set()
+        for rows in postings:
+            matched_rows.update(rows)
+        return len(matched_rows), heapq.nsmallest(limit, matched_rows)
+
+
+# Indexes kept in sync with every RecordStore as rows are appended, in this order
+# ("stats" reads the company lists)
+RECORD_INDEX_FACTORIES = {
+    "companies": CompanyIndex,
+    "postings": PostingIndex,
+    "dates": DateIndex,
+    "stats": StatsCube,
+    "search": SearchIndex,
+}
+
+
+SNAPSHOT_MAGIC = b"NITASNAP"
+SNAPSHOT_FORMAT_VERSION = 5
+# Separator for string columns; values containing it are not snapshotted
+SNAPSHOT_STRING_SEPARATOR = "\x00"
+# Indexes left out of snapshots and rebuilt from the columns on load. The search
+# index is mostly a lowercased copy of the text columns: storing it made every
+# snapshot write ~75% larger, and rebuilding it happens off the request path.
+SNAPSHOT_REBUILT_INDEXES = {"search"}
+
+
+def record_index_schema() -> Dict[str, List[str]]:
+    """Attribute layout of every snapshotted record index, used to reject index states from older code."""
+    return {
+        name: [factory.__qualname__] + sorted(vars(factory()).keys())
+        for name, factory in RECORD_INDEX_FACTORIES.items()
+        if name not in SNAPSHOT_REBUILT_INDEXES
+    }
+
+
+def encode_index_state(value: Any, arrays: List[array]) -> Any:
+    """
+    JSON form of an index's __getstate__(), with arrays moved to `arrays`.
+    Only plain data (str, int, float, None, list, tuple, dict, array) is
+    accepted, so loading a snapshot never runs code from the file, unlike pickle.
+    """
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    if isinstance(value, array):
+        arrays.append(value)
+        return {"array": len(arrays) - 1}
+    if isinstance(value, list):
+        return [encode_index_state(item, arrays) for item in value]
+    if isinstance(value, tuple):
+        return {"tuple": [encode_index_state(item, arrays) for item in value]}
+    if isinstance(value, dict):
+        # Keys may be tuples or ints, and their order matters (Counter ties)
+        return {
+            "items": [[encode_index_state(key, arrays), encode_index_state(item, arrays)] for key, item in value.items()]
+        }
+    raise TypeError(f"Cannot snapshot index state of type {type(value).__name__}")
+
+
+def decode_index_state(value: Any, arrays: List[array]) -> Any:
+    """Inverse of encode_index_state."""
+    if isinstance(value, list):
+        return [decode_index_state(item, arrays) for item in value]
+    if isinstance(value, dict):
+        if "array" in value:
+            return arrays[value["array"]]
+        if "tuple" in value:
+            return tuple(decode_index_state(item, arrays) for item in value["tuple"])
+        return {decode_index_state(key, arrays): decode_index_state(item, arrays) for key, item in value["items"]}
+    return value
+
+
+def write_records_snapshot(path: str, records: "RecordStore", sync_state: Dict[str, Any]) -> bool:
+    """
+    Persist a records snapshot as a compact binary columnar file.
+
+    Layout: magic, format version, JSON header length, JSON header, then one
+    blob per column (raw array bytes for coded/numeric columns; for text
+    columns, the byte offset of every value followed by the separator-terminated
+    UTF-8 values) and finally the arrays of the indexes, whose other state is in
+    the JSON header (see encode_index_state). Indexes in SNAPSHOT_REBUILT_INDEXES
+    are left out. The file is written to a temporary name and renamed so
+    readers never see a partial snapshot.
+    """
+    blobs: List[bytes] = []
+    columns_meta = []
+    offset = 0
+
+    for field, kind, data, vocabulary in records.export_columns():
+        if kind == "strings":
+            if any(SNAPSHOT_STRING_SEPARATOR in value for value in data):
+                print(f"Warning: not writing records snapshot, column {field!r} contains NUL characters")
+                return False
+            text = "".join(value + SNAPSHOT_STRING_SEPARATOR for value in data)
+            encoded = text.encode("utf-8")
+            # Byte lengths only differ from string lengths when there is non-ASCII text
+            lengths = map(len, data) if len(encoded) == len(text) else (len(value.encode("utf-8")) for value in data)
+            offsets = array("Q", accumulate((length + 1 for length in lengths), initial=0))
+            blob = offsets.tobytes() + encoded
+            typecode = None
+        else:
+            blob = data.tobytes()
+            typecode = data.typecode if isinstance(data, array) else data.format
+        columns_meta.append({
+            "field": field,
+            "kind": kind,
+            "typecode": typecode,
+            "offset": offset,
+            "length": len(blob),
+            "vocabulary": vocabulary,
+        })
+        blobs.append(blob)
+        offset += len(blob)
+
+    index_arrays: List[array] = []
+    index_states = {
+        name: encode_index_state(index.__getstate__(), index_arrays)
+        for name, index in records.export_indexes().items()
+        if name not in SNAPSHOT_REBUILT_INDEXES
+    }
+    arrays_meta = []
+    for values in index_arrays:
+        blob = values.tobytes()
+        arrays_meta.append([values.typecode, offset, len(blob)])
+        blobs.append(blob)
+        offset += len(blob)
+
+    header = json.dumps({
+        "headers": records.headers,
+        "row_count": len(records),
+        "columns": columns_meta,
+        "indexes": {"states": index_states, "arrays": arrays_meta, "schema": record_index_schema()},
+        "sync": sync_state,
+    }).encode("utf-8")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as snapshot_file:
+        snapshot_file.write(SNAPSHOT_MAGIC)
+        snapshot_file.write(struct.pack("<II", SNAPSHOT_FORMAT_VERSION, len(header)))
+        snapshot_file.write(header)
+        for blob in blobs:
+            snapshot_file.write(blob)
+    os.replace(temp_path, path)
+    return True
+
+
+def snapshot_signature(path: str) -> Optional[tuple]:
+    """Cheap version stamp of a snapshot file (changes whenever it is replaced)."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def read_records_snapshot(path: str) -> Optional[tuple]:
+    """
+    Load a snapshot written by write_records_snapshot.
+    Returns (records, sync_state), or None when the file is missing or unusable.
+
+    The file is memory-mapped: coded, year and date columns are zero-copy
+    views into the mapping and text columns are decoded on access
+    (MappedStrings), so workers attaching to the same snapshot share those
+    pages. Indexes are restored into process memory from plain data (never
+    unpickled), and SNAPSHOT_REBUILT_INDEXES are rebuilt from the columns.
+    """
+    if not path or not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "rb") as snapshot_file:
+            mapping = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        content = memoryview(mapping)
+
+        prefix_size = len(SNAPSHOT_MAGIC) + 8
+        if bytes(content[:len(SNAPSHOT_MAGIC)]) != SNAPSHOT_MAGIC:
+            return None
+        version, header_length = struct.unpack("<II", content[len(SNAPSHOT_MAGIC):prefix_size])
+        if version != SNAPSHOT_FORMAT_VERSION:
+            return None
+
+        header = json.loads(bytes(content[prefix_size:prefix_size + header_length]))
+        data_start = prefix_size + header_length
+        row_count = header["row_count"]
+
+        columns = []
+        for meta in header["columns"]:
+            blob = content[data_start + meta["offset"]:data_start + meta["offset"] + meta["length"]]
+            if meta["kind"] == "strings":
+                offsets_size = (row_count + 1) * array("Q").itemsize
+                data = MappedStrings(blob[:offsets_size].cast("Q"), blob[offsets_size:])
+            else:
+                data = blob.cast(meta["typecode"])
+            if len(data) != row_count:
+                return None
+            columns.append((meta["field"], meta["kind"], data, meta["vocabulary"]))
+
+        indexes = None
+        index_meta = header["indexes"]
+        if index_meta["schema"] == record_index_schema():
+            arrays = []
+            for typecode, offset, length in index_meta["arrays"]:
+                values = array(typecode)
+                values.frombytes(content[data_start + offset:data_start + offset + length])
+                arrays.append(values)
+            indexes = {}
+            for name, state in index_meta["states"].items():
+                factory = RECORD_INDEX_FACTORIES[name]
+                index = factory.__new__(factory)
+                index.__setstate__(decode_index_state(state, arrays))
+                indexes[name] = index
+
+        records = RecordStore.from_columns(header["headers"], row_count, columns, indexes, buffer=mapping)
+        return records, header["sync"]
+    except Exception as exc:
+        print(f"Warning: could not load records snapshot {path}: {exc}")
+        return None
+
+
+class RecordSource(abc.ABC):
+    """
+    Where raw registration rows come from.
+    Rows are lists of cell strings with the header as the first row, like a
+    worksheet's get_all_values(). Sheet rows are numbered from 1 (the header).
+    """
+
+    name = "source"
+
+    @abc.abstractmethod
+    def get_all_values(self) -> List[List[str]]:
+        """Every row, header first."""
+
+    def get_rows_since(self, first_row: int, width: int) -> tuple:
+        """
+        Header row and rows from `first_row` onwards, cut to `width` columns.
+        Used by incremental sync; sources that can seek should override it.
+        """
+        values = self.get_all_values()
+        header = values[0] if values else []
+        return header, [row[:width] for row in values[first_row - 1:]]
+
+
+class SheetsRecordSource(RecordSource):
+    """The first worksheet of the registration spreadsheet."""
+
+    name = "sheets"
+
+    def __init__(self, spreadsheet_id: str = SPREADSHEET_ID):
+        creds = ServiceAccountCredentials.from_json_keyfile_name(SERVICE_ACCOUNT_FILE, SCOPE)
+        self.client = gspread.authorize(creds)
+        self.spreadsheet = self.client.open_by_key(spreadsheet_id)
+        self.worksheet = self.spreadsheet.sheet1
+
+    def get_all_values(self) -> List[List[str]]:
+        return self.worksheet.get_all_values()
+
+    def get_rows_since(self, first_row: int, width: int) -> tuple:
+        # One round trip for both ranges
+        last_column = re.sub(r"\d", "", rowcol_to_a1(1, width))
+        header_values, tail_values = self.worksheet.batch_get(["1:1", f"A{first_row}:{last_column}"])
+        return (header_values[0] if header_values else []), tail_values
+
+
+class CsvRecordSource(RecordSource):
+    """A CSV export of the sheet; the first row is the header."""
+
+    name = "csv"
+
+    def __init__(self, path: str):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"CSV data source {path!r} not found")
+        self.path = path
+
+    def get_all_values(self) -> List[List[str]]:
+        with open(self.path, newline="", encoding="utf-8-sig") as csv_file:
+            return list(csv.reader(csv_file))
+
+    def get_rows_since(self, first_row: int, width: int) -> tuple:
+        with open(self.path, newline="", encoding="utf-8-sig") as csv_file:
+            reader = csv.reader(csv_file)
+            header = next(reader, [])
+            rows = [row[:width] for row in islice(reader, max(first_row - 2, 0), None)]
+        return header, rows
+
+
+class SqliteRecordSource(RecordSource):
+    """A SQLite table with one column per sheet column, read in rowid order."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, table: str = DATA_SOURCE_TABLE):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"SQLite data source {path!r} not found")
+        self.path = path
+        self.table = '"' + table.replace('"', '""') + '"'
+
+    def _select(self, offset: int) -> tuple:
+        connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            cursor = connection.execute(
+                f"SELECT * FROM {self.table} ORDER BY rowid LIMIT -1 OFFSET ?", (offset,)
+            )
+            header = [column[0] for column in cursor.description]
+            rows = [["" if cell is None else str(cell) for cell in row] for row in cursor]
+        finally:
+            connection.close()
+        return header, rows
+
+    def get_all_values(self) -> List[List[str]]:
+        header, rows = self._select(0)
+        return [header] + rows
+
+    def get_rows_since(self, first_row: int, width: int) -> tuple:
+        # Sheet row 2 is the first table row
+        if first_row < 2:
+            header, rows = self._select(0)
+            return header, [header[:width]] + [row[:width] for row in rows]
+        header, rows = self._select(first_row - 2)
+        return header, [row[:width] for row in rows]
+
+
+class SyntheticRecordSource(RecordSource):
+    """
+    Generated registrations with the spellings, blanks and date formats
+    seen in the live form, for load testing without the sheet.
+    Same seed, same rows; `growth_rows` new rows are appended before every read.
+    """
+
+    name = "synthetic"
+
+    HEADERS = [
+        "Timestamp", "FULL NAME", GENDER_FIELD, COUNTY_FIELD, LEVEL_FIELD, SCHOOL_FIELD,
+        COURSE_FIELD, COMPANIES_FIELD, PLACEMENT_FIELD, "PHONE NUMBER", "EMAIL ADDRESS",
+    ]
+    # (value, weight) pools; weights roughly follow the live registrations
+    GENDERS = [("Male", 30), ("male", 10), ("M", 8), ("Female", 30), ("female", 10), ("F", 6),
+               ("Other", 2), ("", 4)]
+    COUNTIES = [("Nairobi", 25), ("nairobi", 10), ("NAIROBI CITY", 3), ("Nrb", 2), ("Kiambu", 8),
+                ("kiambu county", 3), ("Mombasa", 6), ("mombasa ", 2), ("Kisumu", 6), ("Nakuru", 6),
+                ("Muranga", 3), ("Murang'a", 3), ("Uasin Gishu", 3), ("Eldoret", 2), ("Machakos", 4),
+                ("Kakamega", 3), ("Homa Bay", 2), ("homabay", 1), ("Taita Taveta", 1), ("Kisii", 3),
+                ("Meru", 3), ("Nyeri", 3), ("Kajiado", 2), ("Kilifi", 2), ("Bungoma", 2), ("Kenya", 1),
+                ("", 3)]
+    LEVELS = [("Diploma", 25), ("diploma", 8), ("Dip", 6), ("Level 6", 3), ("Degree", 20), ("deg", 4),
+              ("Bachelors", 3), ("Certificate", 12), ("cert", 4), ("Craft", 2), ("Masters", 3),
+              ("PhD", 1), ("", 3), ("N/A", 1)]
+    SCHOOLS = [("University of Nairobi", 8), ("UON", 4), ("Kenyatta University", 8), ("KU", 3),
+               ("JKUAT", 6), ("Technical University of Kenya", 4), ("Kabete National Polytechnic", 4),
+               ("kabete poly", 2), ("Moi University", 5), ("Strathmore University", 3),
+               ("Mount Kenya University", 4), ("MKU", 2), ("Rift Valley TTI", 3),
+               ("Nairobi Technical Training Institute", 3), ("Egerton University", 3), ("", 3)]
+    COURSES = [("ICT", 12), ("Information Technology", 8), ("Computer Science", 8),
+               ("Electrical Engineering", 6), ("Civil Engineering", 5), ("Accounting", 6),
+               ("Business Management", 6), ("Hospitality Management", 4), ("Journalism", 3),
+               ("Mechanical Engineering", 4), ("Procurement", 3), ("Agriculture", 3), ("", 2)]
+    COMPANIES = ["Safaricom", "safaricom plc", "KPLC", "Kenya Power", "KCB", "Equity Bank", "Co-op Bank",
+                 "KRA", "KEBS", "KWS", "Google", "Microsoft", "KenGen", "Kenya Airways", "Deloitte"]
+    PLACED = [("Yes", 40), ("No", 40), ("yes", 5), ("NO", 5), ("Y", 3), ("", 7)]
+
+    def __init__(self, row_count: int = SYNTHETIC_ROWS, seed: int = SYNTHETIC_SEED,
+                 growth_rows: int = SYNTHETIC_GROWTH_ROWS):
+        self._random = random.Random(seed)
+        self.growth_rows = growth_rows
+        self._values: List[List[str]] = [list(self.HEADERS)]
+        self._lock = Lock()
+        # Three academic years of application dates
+        self._days = [date(2023, 7, 1) + timedelta(days=offset) for offset in range(3 * 365)]
+        # Company lists are drawn from a fixed pool of combinations; sampling per row is slow
+        self._company_lists = [self._companies() for _ in range(2000)]
+        self._append(row_count)
+
+    def _column(self, pool: List[tuple], count: int) -> List[str]:
+        values, weights = zip(*pool)
+        return self._random.choices(values, weights=weights, k=count)
+
+    def _timestamp(self) -> str:
+        draw = self._random.random()
+        day = self._days[int(self._random.random() * len(self._days))]
+        if draw < 0.9:
+            hour, seconds = divmod(int(self._random.random() * 86400), 3600)
+            return f"{day.month}/{day.day}/{day.year} {hour}:{seconds // 60:02d}:{seconds % 60:02d}"
+        if draw < 0.95:
+            return day.isoformat()
+        if draw < 0.98:
+            return ""
+        return self._random.choice(["N/A", "pending", f"{day.day}/{day.month}/{day.year}"])
+
+    def _companies(self) -> str:
+        picks = self._random.sample(self.COMPANIES, self._random.randint(0, 3))
+        return self._random.choice([", ", ",", " , "]).join(picks)
+
+    def _append(self, count: int) -> None:
+        start = len(self._values) - 1
+        columns = zip(
+            (self._timestamp() for _ in range(count)),
+            self._column(self.GENDERS, count),
+            self._column(self.COUNTIES, count),
+            self._column(self.LEVELS, count),
+            self._column(self.SCHOOLS, count),
+            self._column(self.COURSES, count),
+            self._random.choices(self._company_lists, k=count),
+            self._column(self.PLACED, count),
+        )
+        for offset, (timestamp, gender, county, level, school, course, companies, placed) in enumerate(columns):
+            number = start + offset + 1
+            self._values.append([
+                timestamp, f"Applicant {number}", gender, county, level, school, course,
+                companies, placed, f"07{int(self._random.random() * 10 ** 8):08d}",
+                f"applicant{number}@example.com",
+            ])
+
+    def _grow(self) -> None:
+        if self.growth_rows:
+            self._append(self.growth_rows)
+
+    def get_all_values(self) -> List[List[str]]:
+        with self._lock:
+            self._grow()
+            return [list(row) for row in self._values]
+
+    def get_rows_since(self, first_row: int, width: int) -> tuple:
+        with self._lock:
+            self._grow()
+            return list(self._values[0]), [row[:width] for row in self._values[first_row - 1:]]
+
+
+RECORD_SOURCES = {
+    "sheets": lambda: SheetsRecordSource(),
+    "csv": lambda: CsvRecordSource(DATA_SOURCE_PATH),
+    "sqlite": lambda: SqliteRecordSource(DATA_SOURCE_PATH),
+    "synthetic": lambda: SyntheticRecordSource(),
+}
+
+
+def create_record_source(name: str = DATA_SOURCE) -> RecordSource:
+    """Build the record source selected by DATA_SOURCE."""
+    try:
+        factory = RECORD_SOURCES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown DATA_SOURCE {name!r}; expected one of {', '.join(sorted(RECORD_SOURCES))}"
+        ) from None
+    return factory()
+
+
+class GoogleSheetsClient:
+    """Manages the record source (Google Sheets unless DATA_SOURCE says otherwise) and data fetching"""
+    
+    _instance = None
+    _instance_lock = Lock()
+    
+    def __new__(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                instance = super().__new__(cls)
+                instance._initialize()
+                cls._instance = instance
+        return cls._instance
+    
+    def _initialize(self):
+        """Initialize the record source and cached state"""
+        if DATA_SOURCE == "sheets" and not os.path.exists(SERVICE_ACCOUNT_FILE):
+            raise FileNotFoundError(
+                f"{SERVICE_ACCOUNT_FILE} not found. "
+                "Please create it via Google Cloud Console."
+            )
         
+        try:
+            self.source = create_record_source(DATA_SOURCE)
+            self._records_cache = RecordStore([])
+            self._records_cache_at = 0.0
+            self._records_cache_lock = Lock()
+            # Incremental sync state (rows are counted without the header row)
+            self._synced_row_count = 0
+            self._sheet_width = 0
+            self._header_fingerprint: Optional[str] = None
+            self._last_row_fingerprint: Optional[str] = None
+            self._last_full_sync_at = 0.0
+            self._date_parsers: Dict[str, DateColumnParser] = {}
+            # Refreshes run on a dedicated thread; concurrent callers share one in flight
+            self._refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="records-refresh")
+            self._refresh_future: Optional[Future] = None
+            self._refresh_state_lock = Lock()
+            # Worker processes for parallel normalization, started on first use
+            self._ingest_pool: Optional[ProcessPoolExecutor] = None
+            self.refresh_failures = 0
+            self.last_refresh_error: Optional[str] = None
+            # After a failed refresh, requests don't start another before this time (backoff)
+            self._refresh_retry_at = 0.0
+            # Shared snapshot state: lock file held by the refreshing worker
+            self._leader_lock_file = None
+            self._leader_lock_failed = False
+            self._snapshot_signature: Optional[tuple] = None
+            # Version of the records in the snapshot file, as far as this worker knows
+            self._published_version: Optional[str] = None
+            # Called (on the refresh thread) with every snapshot that replaces the current one
+            self._snapshot_listeners: List[Callable[[RecordStore], None]] = []
+            self._load_snapshot()
+        except Exception as e:
+            raise RuntimeError(f"Failed to initialize the {DATA_SOURCE} record source: {str(e)}")
+
+    def _load_snapshot(self) -> bool:
+        """Serve the last persisted snapshot until the first sync reconciles it with the sheet."""
+        signature = snapshot_signature(RECORDS_SNAPSHOT_PATH) if RECORDS_SNAPSHOT_PATH else None
+        loaded = read_records_snapshot(RECORDS_SNAPSHOT_PATH)
+        if loaded is None:
+            return False
+
+        records, sync_state = loaded
+        self._snapshot_signature = signature
+        # Snapshots written before versioning get a version from their sync state
+        records.version = sync_state.get("version") or hashlib.sha1(
+            f"{sync_state['header_fingerprint']}:{sync_state['synced_row_count']}:"
+            f"{sync_state['last_row_fingerprint']}".encode("utf-8")
+        ).hexdigest()
+        records.modified_at = sync_state.get("modified_at", sync_state["synced_at"])
+        self._records_cache = records
+        self._records_cache_at = sync_state["synced_at"]
+        self._published_version = records.version
+        self._synced_row_count = sync_state["synced_row_count"]
+        self._sheet_width = sync_state["sheet_width"]
+        self._header_fingerprint = sync_state["header_fingerprint"]
+        self._last_row_fingerprint = sync_state["last_row_fingerprint"]
+        self._last_full_sync_at = sync_state["last_full_sync_at"]
+        self._date_parsers = {
+            field: DateColumnParser.for_layout(layout_name)
+            for field, layout_name in sync_state["date_layouts"].items()
+        }
+        self._notify_snapshot(records)
+        return True
+
+    def _save_snapshot(self, records: RecordStore, synced_at: float) -> None:
+        # With a shared snapshot, only the refreshing worker writes the file
+        if not RECORDS_SNAPSHOT_PATH or not self.is_refresh_leader:
+            return
+        sync_state = {
+            "synced_at": synced_at,
+            "version": records.version,
+            "modified_at": records.modified_at,
+            "synced_row_count": self._synced_row_count,
+            "sheet_width": self._sheet_width,
+            "header_fingerprint": self._header_fingerprint,
+            "last_row_fingerprint": self._last_row_fingerprint,
+            "last_full_sync_at": self._last_full_sync_at,
+            "date_layouts": {
+                field: parser.layout.name if parser.layout else None
+                for field, parser in self._date_parsers.items()
+            },
+        }
+        try:
+            if write_records_snapshot(RECORDS_SNAPSHOT_PATH, records, sync_state):
+                self._snapshot_signature = snapshot_signature(RECORDS_SNAPSHOT_PATH)
+                self._published_version = records.version
+        except Exception as exc:
+            print(f"Warning: could not write records snapshot: {exc}")
+
+    def _mark_snapshot_synced(self, synced_at: float) -> None:
+        """
+        Tell attached workers the shared snapshot is still current as of `synced_at`.
+        The marker is the mtime of a file next to the snapshot, touched by the
+        refreshing worker after each successful sync, but only while the file
+        holds its current records (not after a failed or skipped write).
+        """
+        if self._leader_lock_file is None or self._published_version != self._records_cache.version:
+            return
+        marker_path = f"{RECORDS_SNAPSHOT_PATH}.synced"
+        try:
+            with open(marker_path, "a"):
+                pass
+            os.utime(marker_path, (synced_at, synced_at))
+        except OSError as exc:
+            print(f"Warning: could not mark records snapshot as synced: {exc}")
+    
+    def fetch_all_records(self, force_refresh: bool = False, allow_stale: bool = True) -> RecordStore:
+        """Fetch all records from the worksheet"""
+        now = time.time()
+        cache_age = now - self._records_cache_at
+        if (
+            not force_refresh
+            and self._records_cache
+            and cache_age < RECORDS_CACHE_TTL_SECONDS
+        ):
+            return self._records_cache
+
+        with self._records_cache_lock:
+            now = time.time()
+            cache_age = now - self._records_cache_at
+            if (
+                not force_refresh
+                and self._records_cache
+                and cache_age < RECORDS_CACHE_TTL_SECONDS
+            ):
+                return self._records_cache
+
+            if not self.is_refresh_leader:
+                shared_records = self._attach_shared_snapshot()
+                if shared_records is not None:
+                    return shared_records
+
+            try:
+                records = None
+                if self._can_sync_incrementally(now):
+                    records = self._sync_new_rows()
+                if records is None:
+                    records = self._sync_all_rows(now)
+
+                if records is not self._records_cache and records.version == self._records_cache.version:
+                    # A full sync of unchanged rows: keep the current snapshot (and its cached responses)
+                    records = self._records_cache
+                if records is not self._records_cache:
+                    records.modified_at = now
+                    self._records_cache = records
+                    self._save_snapshot(records, now)
+                    self._notify_snapshot(records)
+                self._records_cache_at = now
+                self._mark_snapshot_synced(now)
+                self.refresh_failures = 0
+                self.last_refresh_error = None
+                self._refresh_retry_at = 0.0
+                return records
+            except Exception as e:
+                self.refresh_failures += 1
+                self.last_refresh_error = str(e)
+                self._refresh_retry_at = time.time() + next_refresh_delay(self.refresh_failures)
+                stale_age = time.time() - self._records_cache_at
+                if allow_stale and self._records_cache and stale_age < RECORDS_STALE_MAX_SECONDS:
+                    return self._records_cache
+                raise RuntimeError(f"Failed to fetch records from the {self.source.name} source: {str(e)}")
+
+    def add_snapshot_listener(self, listener: Callable[[RecordStore], None]) -> None:
+        """Call `listener(records)` whenever a new snapshot is swapped in."""
+        self._snapshot_listeners.append(listener)
+
+    def _notify_snapshot(self, records: RecordStore) -> None:
+        for listener in self._snapshot_listeners:
+            try:
+                listener(records)
+            except Exception as exc:
+                print(f"Warning: snapshot listener failed: {exc}")
+
+    @property
+    def is_refresh_leader(self) -> bool:
+        """
+        Whether this worker refreshes from the record source.
+        With a shared snapshot only the worker holding the lock file does; the
+        lock is released when it exits, so another worker takes over. A worker
+        that can't open the lock file refreshes on its own, as without sharing.
+        """
+        if self._leader_lock_file is not None or self._leader_lock_failed:
+            return True
+        if not (RECORDS_SHARED_SNAPSHOT and RECORDS_SNAPSHOT_PATH and fcntl):
+            return True
+
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(RECORDS_SNAPSHOT_PATH)), exist_ok=True)
+            lock_file = open(f"{RECORDS_SNAPSHOT_PATH}.lock", "a+")
+        except OSError as exc:
+            print(f"Warning: could not open the records snapshot lock file, refreshing independently: {exc}")
+            self._leader_lock_failed = True
+            return True
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._leader_lock_file = lock_file
+        return True
+
+    def _attach_shared_snapshot(self) -> Optional[RecordStore]:
+        """
+        Pick up the snapshot published by the refreshing worker.
+        Waits up to RECORDS_SHARED_WAIT_SECONDS when there is nothing to serve
+        yet; returns None if nothing was published in that time, or if the
+        refreshing worker hasn't confirmed the file for longer than the TTL plus
+        RECORDS_STALE_MAX_SECONDS (the caller then refreshes on its own).
+        """
+        deadline = time.time() + (0 if self._records_cache else RECORDS_SHARED_WAIT_SECONDS)
+        while True:
+            signature = snapshot_signature(RECORDS_SNAPSHOT_PATH)
+            if signature is not None and signature != self._snapshot_signature:
+                self._load_snapshot()
+            if self._records_cache:
+                # The snapshot is as fresh as the refreshing worker's last sync, not this check
+                try:
+                    synced_at = os.stat(f"{RECORDS_SNAPSHOT_PATH}.synced").st_mtime
+                except OSError:
+                    synced_at = 0.0
+                self._records_cache_at = max(self._records_cache_at, synced_at)
+                if time.time() - self._records_cache_at < RECORDS_CACHE_TTL_SECONDS + RECORDS_STALE_MAX_SECONDS:
+                    return self._records_cache
+                return None
+            if time.time() >= deadline:
+                return None
+            time.sleep(0.25)
+
+    def request_refresh(self, force_refresh: bool = False) -> Future:
+        """Start a refresh on the refresh thread, or join the one already in flight."""
+        with self._refresh_state_lock:
+            if self._refresh_future is None or self._refresh_future.done():
+                self._refresh_future = self._refresh_executor.submit(self.fetch_all_records, force_refresh, True)
+            return self._refresh_future
+
+    async def get_records(self) -> RecordStore:
+        """
+        Return the current records snapshot without blocking the event loop.
+        An expired snapshot is still served while a shared refresh runs in the
+        background; callers only wait when there is nothing usable to serve.
+        After a failed refresh, requests start no new one until the backoff
+        (as for the background refresher) has passed, so an outage of the
+        source doesn't turn every request into an upstream call.
+        """
+        records = self._records_cache
+        now = time.time()
+        cache_age = now - self._records_cache_at
+        if records and cache_age < RECORDS_CACHE_TTL_SECONDS:
+            return records
+
+        if now < self._refresh_retry_at:
+            if records and cache_age < RECORDS_STALE_MAX_SECONDS:
+                return records
+            raise RuntimeError(
+                f"Failed to fetch records from the {self.source.name} source (retrying in "
+                f"{self._refresh_retry_at - now:.0f}s): {self.last_refresh_error}"
+            )
+
+        refresh = self.request_refresh()
+        if records and cache_age < RECORDS_STALE_MAX_SECONDS:
+            return records
+        return await asyncio.wrap_future(refresh)
+
+    def _can_sync_incrementally(self, now: float) -> bool:
+        """Only append new rows when a previous full sync is recent and non-empty."""
+        return (
+            RECORDS_INCREMENTAL_SYNC
+            and self._synced_row_count > 0
+            and self._header_fingerprint is not None
+            and now - self._last_full_sync_at < RECORDS_FULL_SYNC_INTERVAL_SECONDS
+        )
+
+    def _sync_all_rows(self, now: float) -> RecordStore:
+        """Fetch and normalize the whole worksheet."""
+        # Get all values including headers
+        all_values = self.source.get_all_values()
+
+        if not all_values or len(all_values) < 2:
+            self._synced_row_count = 0
+            self._header_fingerprint = None
+            self._last_row_fingerprint = None
+            records = RecordStore([])
+            records.version = digest_rows(all_values)
+            return records
+
+        headers = all_values[0]
+        unique_headers = deduplicate_headers(headers)
+        date_candidate_fields = get_date_candidate_fields(unique_headers)
+        date_parsers = build_date_parsers(unique_headers, date_candidate_fields, all_values[1:])
+
+        # Convert rows to normalized records in columnar form
+        records = RecordStore(unique_headers)
+        records.version = digest_rows(all_values)
+        self._extend_normalized(records, all_values[1:], date_candidate_fields, date_parsers)
+
+        self._synced_row_count = len(all_values) - 1
+        self._sheet_width = len(headers)
+        self._header_fingerprint = fingerprint_row(headers)
+        self._last_row_fingerprint = fingerprint_row(all_values[-1][:len(headers)])
+        self._last_full_sync_at = now
+        self._date_parsers = date_parsers
+        return records
+
+    def _sync_new_rows(self) -> Optional[RecordStore]:
+        """
+        Fetch and normalize only rows appended since the last sync.
+        Returns None when the header or the last synced row changed and a full rebuild is needed.
+        """
+        # Re-read the last synced row with the new ones to verify nothing shifted
+        last_synced_sheet_row = self._synced_row_count + 1
+        header_row, tail_values = self.source.get_rows_since(last_synced_sheet_row, self._sheet_width)
+
+        if fingerprint_row(header_row) != self._header_fingerprint:
+            return None
+        if not tail_values or fingerprint_row(tail_values[0]) != self._last_row_fingerprint:
+            return None
+
+        new_rows = tail_values[1:]
+        if not new_rows:
+            return self._records_cache
+
+        headers = self._records_cache.headers
+        date_candidate_fields = get_date_candidate_fields(headers)
+
+        # Copy-on-write so requests reading the current snapshot are unaffected
+        records = self._records_cache.copy()
+        records.version = digest_rows(new_rows, previous=records.version)
+        self._extend_normalized(records, [list(row) for row in new_rows], date_candidate_fields, self._date_parsers)
+
+        self._synced_row_count += len(new_rows)
+        self._last_row_fingerprint = fingerprint_row(new_rows[-1])
+        return records
+
+    def _extend_normalized(
+        self,
+        records: RecordStore,
+        rows: List[List[str]],
+        date_candidate_fields: List[str],
+        date_parsers: Dict[str, DateColumnParser],
+    ) -> None:
+        """
+        Normalize raw rows into `records`, in order.
+        Large batches are split across the ingest process pool; each chunk is
+        indexed here while the workers normalize the next ones.
+        """
+        headers = records.headers
+        if RECORDS_INGEST_WORKERS <= 0 or len(rows) < RECORDS_INGEST_PARALLEL_MIN_ROWS:
+            records.extend(normalize_record(row, headers, date_candidate_fields, date_parsers) for row in rows)
+            return
+
+        if self._ingest_pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            # Forking the threaded server process is unsafe; start workers cleanly instead
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            from app.ingest_worker import set_environment
+            self._ingest_pool = ProcessPoolExecutor(
+                max_workers=RECORDS_INGEST_WORKERS,
+                mp_context=context,
+                # Flag the workers before their first task imports this module
+                initializer=set_environment,
+                initargs=({INGEST_WORKER_ENV: "1"},),
+            )
+
+        task = partial(
+            normalize_rows_chunk,
+            headers=headers,
+            date_candidate_fields=date_candidate_fields,
+            date_layouts={
+                field: parser.layout.name if parser.layout else None
+                for field, parser in date_parsers.items()
+            },
+        )
+        chunks = (rows[start:start + RECORDS_INGEST_CHUNK_ROWS] for start in range(0, len(rows), RECORDS_INGEST_CHUNK_ROWS))
+        try:
+            for values in self._ingest_pool.map(task, chunks):
+                records.extend_values(values)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool on the next refresh
+            self.shutdown_ingest_pool()
+            raise
+
+    def shutdown_ingest_pool(self) -> None:
+        """Stop the ingest worker processes, if any were started."""
+        if self._ingest_pool is not None:
+            self._ingest_pool.shutdown(wait=False, cancel_futures=True)
+            self._ingest_pool = None
+
+    def cache_snapshot(self) -> Dict[str, Any]:
+        """Expose cache state for observability endpoints."""
+        cache_age = time.time() - self._records_cache_at if self._records_cache_at else None
+        return {
+            "cached": bool(self._records_cache),
+            "cache_age_seconds": round(cache_age, 2) if cache_age is not None else None,
+            "record_count": len(self._records_cache),
+            "data_source": self.source.name,
+            "refresh_leader": self._leader_lock_file is not None,
+            "refresh_failures": self.refresh_failures,
+            "last_refresh_error": self.last_refresh_error,
+            "refresh_retry_in_seconds": round(max(self._refresh_retry_at - time.time(), 0), 2),
+            "normalization_cache": normalization_cache_stats(),
+        }
+
+
+def get_sheets_client() -> GoogleSheetsClient:
+    """Get or initialize the records client"""
+    return GoogleSheetsClient()
+
+
+async def get_sheets_client_async() -> GoogleSheetsClient:
+    """Get the client, initializing it (network auth) off the event loop on first use."""
+    if GoogleSheetsClient._instance is not None:
+        return GoogleSheetsClient._instance
+    return await asyncio.to_thread(get_sheets_client)
+
+
+APP_STARTED_AT = time.time()
+
+
+class ResponseCache:
+    """
+    LRU cache of serialized JSON responses for cached_json_response().
+
+    Keys start with the snapshot version the response was built from, so an
+    entry can never outlive its data. Once attached to the client, entries for
+    other versions are dropped as soon as a new snapshot is swapped in.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = Lock()
+        self._client: Optional["GoogleSheetsClient"] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def attach(self, client: "GoogleSheetsClient") -> None:
+        """Drop stale entries whenever the client swaps in a new snapshot."""
+        if self._client is client:
+            return
+        self._client = client
+        client.add_snapshot_listener(lambda records: self.invalidate(records.version))
+
+    def get(self, key: Hashable) -> Optional[tuple]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, entry: tuple) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, version: str) -> None:
+        """Drop every entry built from a snapshot version other than `version`."""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] != version]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# Responses built from records snapshots, keyed by (version, endpoint key)
+response_cache = ResponseCache()
+# Responses that don't depend on the records (e.g. /metadata), cached for the process lifetime
+STATIC_RESPONSES = ResponseCache(max_entries=16)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for GET)."""
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+
+def cached_json_response(
+    request: Request,
+    cache: ResponseCache,
+    key: tuple,
+    last_modified: float,
+    build: Callable[[], Any],
+) -> Response:
+    """
+    Serve a JSON payload with validators, serializing it once per cache key.
+    Keys for snapshot data start with the snapshot version, e.g.
+    (records.version, "counties"); a matching If-None-Match/If-Modified-Since
+    gets an empty 304.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        body = dump_json(build())
+        entry = (body, f'"{hashlib.sha1(body).hexdigest()[:24]}"')
+        cache.put(key, entry)
+    body, etag = entry
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={HTTP_CACHE_MAX_AGE_SECONDS}, must-revalidate",
+    }
+    if last_modified:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = etag_matches(if_none_match, etag)
+    else:
+        not_modified = False
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and last_modified:
+            try:
+                not_modified = int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                pass
+
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def sse_message(event: str, event_id: str, payload: Any) -> bytes:
+    """One server-sent event, encoded."""
+    return f"id: {event_id}\nevent: {event}\ndata: ".encode("utf-8") + dump_json(payload) + b"\n\n"
+
+
+class StatsBroadcaster:
+    """
+    Pushes unfiltered /stats changes to /events subscribers.
+    Stats are computed and encoded once per new snapshot and the same bytes are
+    queued for every subscriber, however many dashboards are connected.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional["GoogleSheetsClient"] = None
+        self._stats: Optional[Dict[str, Any]] = None
+        self.version: Optional[str] = None
+        # Full stats of the current snapshot, sent to new and lagging subscribers
+        self.snapshot_message: Optional[bytes] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def attach(self, client: "GoogleSheetsClient") -> None:
+        """Start following the client's snapshots (call from the event loop)."""
+        if self._client is client:
+            return
+        self._client = client
+        self._loop = asyncio.get_running_loop()
+        client.add_snapshot_listener(self._on_snapshot)
+        if client._records_cache:
+            self.publish(client._records_cache)
+
+    def _on_snapshot(self, records: RecordStore) -> None:
+        # Runs on the refresh thread; publish on the event loop that owns the queues
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self.publish, records)
+
+    def publish(self, records: RecordStore) -> None:
+        if records.version == self.version:
+            return
+        stats = build_stats_payload(records, normalize_filters(), False)
+        self.snapshot_message = sse_message("snapshot", records.version, {"version": records.version, "stats": stats})
+        message = self.snapshot_message
+        if self._stats is not None:
+            # Changed top-level fields carry their full new value, so applying one twice is harmless
+            changes = {key: value for key, value in stats.items() if self._stats.get(key) != value}
+            message = sse_message("stats", records.version, {
+                "version": records.version,
+                "previous_version": self.version,
+                "changes": changes,
+            })
+        self._stats = stats
+        self.version = records.version
+
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Too far behind for diffs to add up; resync it with the full stats
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self.snapshot_message)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+
+stats_broadcaster = StatsBroadcaster()
+
+
+def snapshot_timestamp(records: RecordStore) -> str:
+    """When the snapshot's data last changed, as reported in payload timestamps."""
+    return datetime.fromtimestamp(records.modified_at or time.time()).isoformat()
+
+
+@app.get("/")
+async def root():
+    """Root endpoint"""
+    return {
+        "message": "Dynamic Dashboard API",
+        "endpoints": {
+            "data": "/data",
+            "stats": "/stats",
+            "timeseries": "/stats/timeseries",
+            "health": "/health",
+            "metadata": "/metadata",
+            "counties": "/counties",
+            "levels": "/levels",
+            "schools": "/schools",
+            "companies": "/companies",
+            "search": "/search",
+            "export": "/export",
+            "events": "/events"
+        }
+    }
+
+
+@app.get("/metadata")
+async def get_metadata(request: Request):
+    """Get metadata about data normalization and standards"""
+    return cached_json_response(request, STATIC_RESPONSES, ("static", "metadata"), APP_STARTED_AT, build_metadata)
+
+
+def build_metadata() -> Dict[str, Any]:
+    """/metadata body (static, so built once per process)."""
+    return {
+        "official_counties": {
+            "count": len(OFFICIAL_COUNTIES),
+            "list": sorted(OFFICIAL_COUNTIES),
+            "description": "Kenya's 47 official counties - all data is normalized to these"
+        },
+        "education_levels": {
+            "count": len(EDUCATION_LEVELS),
+            "list": sorted(EDUCATION_LEVELS.keys()),
+            "description": "Standardized education levels - all variations are normalized"
+        },
+        "data_normalization": {
+            "counties": "All county name variations are normalized to official names",
+            "education": "All education level variations are standardized",
+            "companies": "Company names are cleaned and standardized",
+            "gender": "Gender values are normalized to Male/Female/Other",
+            "courses": "Course names are converted to title case",
+            "schools": "School names are normalized for consistency"
+        }
+    }
+
+
+@app.get("/health")
+async def health_check(deep: bool = Query(False)):
+    """Health check endpoint. Use deep=true to verify the record source fetch path."""
+    try:
+        client = await get_sheets_client_async()
+        if deep:
+            await asyncio.to_thread(client.fetch_all_records, False, False)
         return {
-            "total": len(records),
-            "count": len(records),
-            "data": records,
-            "timestamp": datetime.now().isoformat()
+            "status": "healthy",
+            "timestamp": datetime.now().isoformat(),
+            "deep_check": deep,
+            "cache": client.cache_snapshot(),
+            "response_cache": response_cache.stats(),
+            "event_subscribers": stats_broadcaster.subscriber_count,
         }
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@app.on_event("startup")
+async def warm_records_cache_on_startup():
+    """Warm records cache in the background so first dashboard render is faster."""
+    async def _warm():
+        try:
+            client = await get_sheets_client_async()
+            response_cache.attach(client)
+            await client.get_records()
+            stats_broadcaster.attach(client)
+        except Exception as exc:
+            print(f"Warning: cache warmup failed: {exc}")
+
+    asyncio.create_task(_warm())
+
+
+def next_refresh_delay(failures: int, interval: float = RECORDS_REFRESH_INTERVAL_SECONDS) -> float:
+    """Seconds until the next background refresh: jittered interval, or backoff after failures."""
+    if failures:
+        delay = min(
+            RECORDS_REFRESH_BACKOFF_SECONDS * 2 ** (failures - 1),
+            RECORDS_REFRESH_MAX_BACKOFF_SECONDS,
+        )
+    else:
+        delay = interval
+    return delay * random.uniform(1 - RECORDS_REFRESH_JITTER, 1 + RECORDS_REFRESH_JITTER)
+
+
+async def refresh_records_periodically():
+    """
+    Stale-while-revalidate refresher: re-sync ahead of the TTL and swap the new
+    snapshot in. Requests keep serving the previous snapshot (up to
+    RECORDS_STALE_MAX_SECONDS) while refreshes fail and back off.
+    """
+    failures = 0
+    interval = RECORDS_REFRESH_INTERVAL_SECONDS
+    while True:
+        await asyncio.sleep(next_refresh_delay(failures, interval))
+        try:
+            client = await get_sheets_client_async()
+            await asyncio.wrap_future(client.request_refresh(force_refresh=True))
+            failures = client.refresh_failures
+            # Workers attached to a shared snapshot only poll the file
+            interval = RECORDS_REFRESH_INTERVAL_SECONDS if client.is_refresh_leader else RECORDS_SHARED_POLL_SECONDS
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            failures += 1
+            print(f"Warning: background refresh failed: {exc}")
+
+
+@app.on_event("startup")
+async def start_background_refresher():
+    """Start the periodic records refresher."""
+    if RECORDS_BACKGROUND_REFRESH:
+        app.state.records_refresher = asyncio.create_task(refresh_records_periodically())
+
+
+@app.on_event("shutdown")
+async def stop_background_refresher():
+    """Cancel the periodic records refresher."""
+    refresher = getattr(app.state, "records_refresher", None)
+    if refresher is not None:
+        refresher.cancel()
+    if GoogleSheetsClient._instance is not None:
+        GoogleSheetsClient._instance.shutdown_ingest_pool()
+
+
+class RecordFilterParams:
+    """
+    Query parameters that filter records, shared by /stats, /data, /companies,
+    /export and /stats/timeseries (use as `filters: RecordFilterParams = Depends()`).
+    Values are normalized like the sheet; see FILTER_DIMENSIONS.
+    """
+
+    def __init__(
+        self,
+        county: Optional[str] = Query(None),
+        level: Optional[str] = Query(None),
+        school: Optional[str] = Query(None),
+        gender: Optional[str] = Query(None),
+        year: Optional[int] = Query(None, ge=1000, le=9999),
+        quarter: Optional[str] = Query(None),
+        from_date: Optional[date] = Query(None, alias="from"),
+        to_date: Optional[date] = Query(None, alias="to"),
+    ):
+        self.values = normalize_filters(
+            county=county, level=level, school=school, gender=gender, year=year, quarter=quarter
+        )
+        # Inclusive application date range, either end open
+        self.date_range = (from_date, to_date) if from_date or to_date else None
+        self.active = bool(county or level or school or gender or year or quarter or self.date_range)
+
+    @property
+    def key(self) -> tuple:
+        """Identifies the normalized filters in response cache keys."""
+        return (self.active,) + self.values + (self.date_range,)
+
+
+@app.get("/data")
+async def get_data(
+    limit: Optional[int] = Query(None, gt=0),
+    offset: Optional[int] = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    filters: RecordFilterParams = Depends()
+):
+    """
+    Fetch all (or filtered) records from Google Sheet
+    
+    - **limit**: Maximum number of records to return
+    - **offset**: Number of records to skip
+    - **cursor**: `next_cursor` from the previous page (takes precedence over offset; send the same filters)
+    - **fields**: Comma-separated fields to include in each record (optional)
+    - **county**, **level**, **school**, **gender**, **year**, **quarter**, **from**, **to**: Same filters as /stats (optional)
+    """
+    try:
+        client = await get_sheets_client_async()
+        records = await client.get_records()
+        row_ids = filter_row_ids(records, filters.values, filters.date_range)
+        if row_ids is None:
+            row_ids = range(len(records))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    try:
+        start = decode_data_cursor(records, row_ids, cursor) if cursor else offset
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    selected_fields = None
+    if fields:
+        selected_fields = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown_fields = [field for field in selected_fields if field not in records]
+        if unknown_fields:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown_fields)}")
+
+    # Dicts are only built for the returned rows
+    total = len(row_ids)
+    start = min(start, total)
+    end = min(start + limit, total) if limit else total
+
+    # Rows are plain str/int/None values, so skip jsonable_encoder's per-value walk
+    return FastJSONResponse({
+        "total": total,
+        "count": end - start,
+        "offset": start,
+        "next_cursor": encode_data_cursor(records, row_ids, end) if end < total else None,
+        "data": records.rows(row_ids[start:end], selected_fields),
+        "timestamp": datetime.now().isoformat()
+    })
+
 
 @app.get("/stats")
 async def get_stats(
-    county: Optional[str] = Query(None),
-    level: Optional[str] = Query(None),
-    school: Optional[str] = Query(None)
+    request: Request,
+    filters: RecordFilterParams = Depends()
 ):
     """
     Get aggregated statistics from the sheet
     
-    Query Parameters:
-    - **county**: Filter by county (optional)
-    - **level**: Filter by level of training (optional)
-    - **school**: Filter by institution/school (optional)
+    Query Parameters (all optional, combined with AND):
+    - **county**: Filter by county
+    - **level**: Filter by level of training
+    - **school**: Filter by institution/school
+    - **gender**: Filter by gender: Male, Female or Other
+    - **year**: Filter by calendar year of the application date
+    - **quarter**: Filter by financial-year quarter (Q1 = Jul-Sep ... Q4 = Apr-Jun)
+    - **from**, **to**: Application date range, inclusive (YYYY-MM-DD)
     """
     try:
-        client = get_sheets_client()
-        records = client.fetch_all_records()
-        has_filters = bool(county or level or school)
-
-        if not has_filters:
-            cached_stats = client.get_cached_global_stats()
-            if cached_stats:
-                response = dict(cached_stats)
-                response["filtered"] = False
-                response["timestamp"] = datetime.now().isoformat()
-                return response
-        
-        # Apply filters with normalized values
-        if county:
-            normalized_county = normalize_county(county)
-            records = [r for r in records if r.get("YOUR COUNTY", "") == normalized_county]
-        if level:
-            normalized_level = normalize_education_level(level)
-            records = [r for r in records if r.get("Your Level of Training (e.g. Deg, Dip, Cert)", "") == normalized_level]
-        if school:
-            normalized_school = normalize_school_name(school)
-            records = [
-                r for r in records
-                if r.get("The name of your school", "") == normalized_school
-            ]
-        
-        if not records:
-            return {
-                "total_registrations": 0,
-                "placement_rate": 0,
-                "gender_ratio": {},
-                "education_breakdown": {},
-                "top_courses": [],
-                "geographic_distribution": [],
-                "preferred_companies": [],
-                "top_schools": [],
-                "filtered": bool(county or level or school),
-                "timestamp": datetime.now().isoformat()
-            }
-        
-        # Calculate statistics
-        stats = calculate_statistics(records)
-        if not has_filters:
-            client.set_cached_global_stats(dict(stats))
+        client = await get_sheets_client_async()
+        records = await client.get_records()
+        return cached_json_response(
+            request, response_cache, (records.version, "stats") + filters.key, records.modified_at,
+            lambda: build_stats_payload(records, filters.values, filters.active, filters.date_range),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        stats["filtered"] = has_filters
-        stats["timestamp"] = datetime.now().isoformat()
-        
-        return stats
+
+def build_stats_payload(
+    records: RecordStore, filters: tuple, has_filters: bool, date_range: Optional[tuple] = None
+) -> Dict[str, Any]:
+    """/stats body for filters from normalize_filters() and an optional (from, to) date range."""
+    cell = filtered_aggregate(records, filters, date_range)
+
+    if not records or cell is None:
+        return {
+            "total_registrations": 0,
+            "placement_rate": 0,
+            "gender_ratio": {},
+            "education_breakdown": {},
+            "top_courses": [],
+            "geographic_distribution": [],
+            "preferred_companies": [],
+            "top_schools": [],
+            "filtered": has_filters,
+            "timestamp": snapshot_timestamp(records)
+        }
+
+    stats = cell.to_stats()
+    stats["filtered"] = has_filters
+    stats["timestamp"] = snapshot_timestamp(records)
+    return stats
+
+
+@app.get("/stats/timeseries")
+async def get_time_series(
+    request: Request,
+    interval: str = Query("month", pattern="^(day|week|month)$"),
+    filters: RecordFilterParams = Depends()
+):
+    """
+    Get registrations per day, week (starting Monday) or month of application date
+    
+    - **interval**: day, week or month (default)
+    - **from**, **to**: Date range to cover (defaults to the periods holding the first and last application date);
+      buckets cut short by the range are marked `partial`
+    - **county**, **level**, **school**, **gender**, **year**, **quarter**: Same filters as /stats (optional)
+    """
+    try:
+        client = await get_sheets_client_async()
+        records = await client.get_records()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        return cached_json_response(
+            request, response_cache, (records.version, "timeseries", interval) + filters.key, records.modified_at,
+            lambda: build_time_series_payload(records, interval, filters),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def build_time_series_payload(records: RecordStore, interval: str, filters: RecordFilterParams) -> Dict[str, Any]:
+    """/stats/timeseries body; ValueError when the range holds too many buckets."""
+    date_index = records.index("dates")
+    first_day, last_day = filters.date_range or (None, None)
+    bounds = date_index.bounds()
+    if bounds is not None:
+        # Without from/to, cover the whole periods holding the first and last application date
+        first_day = first_day or period_start(bounds[0], interval)
+        last_day = last_day or next_period(period_start(bounds[1], interval), interval) - timedelta(days=1)
+
+    series = []
+    if first_day is not None and last_day is not None and first_day <= last_day:
+        periods = (last_day - first_day).days // TIME_SERIES_PERIOD_DAYS[interval] + 1
+        if periods > TIME_SERIES_MAX_PERIODS:
+            raise ValueError(
+                f"{interval} series from {first_day} to {last_day} exceeds {TIME_SERIES_MAX_PERIODS} periods; "
+                "narrow from/to or use a longer interval"
+            )
+        row_ids = filter_row_ids(records, filters.values)
+        if row_ids is None:
+            days = date_index.days
+        else:
+            # Dates of the filtered rows, sorted so they serve as prefix sums too
+            date_column = records.column(DATE_FIELD)
+            days = sorted(day for day in map(date_column.__getitem__, row_ids) if day)
+        series = count_by_period(days, interval, first_day, last_day)
+
+    return {
+        "interval": interval,
+        "from": first_day.isoformat() if first_day else None,
+        "to": last_day.isoformat() if last_day else None,
+        "total": sum(period["count"] for period in series),
+        "series": series,
+        "filtered": filters.active,
+        "timestamp": snapshot_timestamp(records)
+    }
+
+
 @app.get("/counties")
-async def get_counties():
+async def get_counties(request: Request):
     """Get list of all unique counties (official 47 counties of Kenya)"""
     try:
-        client = get_sheets_client()
-        records = client.fetch_all_records()
-        
-        # Get only counties that appear in the data (from official list)
-        counties_in_data = set(r.get("YOUR COUNTY", "") for r in records if r.get("YOUR COUNTY") and r.get("YOUR COUNTY") in OFFICIAL_COUNTIES)
-        counties = sorted(counties_in_data)
-        
-        return {
-            "counties": counties,
-            "total": len(counties),
-            "all_official_counties": sorted(OFFICIAL_COUNTIES)
-        }
+        client = await get_sheets_client_async()
+        records = await client.get_records()
+        return cached_json_response(
+            request, response_cache, (records.version, "counties"), records.modified_at,
+            lambda: build_counties_payload(records),
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def build_counties_payload(records: RecordStore) -> Dict[str, Any]:
+    """/counties body for a snapshot."""
+    # Get only counties that appear in the data (from official list)
+    counties_in_data = set(c for c in records.distinct(COUNTY_FIELD) if c and c in OFFICIAL_COUNTIES)
+    counties = sorted(counties_in_data)
+    
+    return {
+        "counties": counties,
+        "total": len(counties),
+        "all_official_counties": sorted(OFFICIAL_COUNTIES)
+    }
+
+
 @app.get("/levels")
-async def get_levels():
+async def get_levels(request: Request):
     """Get list of all unique training levels (standardized)"""
     try:
-        client = get_sheets_client()
-        records = client.fetch_all_records()
-        
-        # Get only standard education levels that appear in the data
-        levels_in_data = set(r.get("Your Level of Training (e.g. Deg, Dip, Cert)", "") for r in records if r.get("Your Level of Training (e.g. Deg, Dip, Cert)"))
-        # Filter to only include our standard levels
-        standard_levels = [level for level in levels_in_data if level in EDUCATION_LEVELS.keys()]
-        levels = sorted(standard_levels)
-        
-        return {
-            "levels": levels,
-            "total": len(levels),
-            "all_standard_levels": sorted(EDUCATION_LEVELS.keys())
-        }
+        client = await get_sheets_client_async()
+        records = await client.get_records()
+        return cached_json_response(
+            request, response_cache, (records.version, "levels"), records.modified_at,
+            lambda: build_levels_payload(records),
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def build_levels_payload(records: RecordStore) -> Dict[str, Any]:
+    """/levels body for a snapshot."""
+    # Get only standard education levels that appear in the data
+    levels_in_data = set(level for level in records.distinct(LEVEL_FIELD) if level)
+    # Filter to only include our standard levels
+    standard_levels = [level for level in levels_in_data if level in EDUCATION_LEVELS.keys()]
+    levels = sorted(standard_levels)
+    
+    return {
+        "levels": levels,
+        "total": len(levels),
+        "all_standard_levels": sorted(EDUCATION_LEVELS.keys())
+    }
+
+
 @app.get("/schools")
-async def get_schools():
+async def get_schools(request: Request):
     """Get list of all unique schools"""
     try:
-        client = get_sheets_client()
-        records = client.fetch_all_records()
-        
-        # Get all schools from the data
-        schools_in_data = set(r.get("The name of your school", "").strip() for r in records if r.get("The name of your school", "").strip())
-        schools = sorted(schools_in_data)
-        
-        return {
-            "schools": schools,
-            "total": len(schools)
-        }
+        client = await get_sheets_client_async()
+        records = await client.get_records()
+        return cached_json_response(
+            request, response_cache, (records.version, "schools"), records.modified_at,
+            lambda: build_schools_payload(records),
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def calculate_statistics(records: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Calculate all statistics from records"""
-    
-    # Total registrations
-    total_registrations = len(records)
+def build_schools_payload(records: RecordStore) -> Dict[str, Any]:
+    """/schools body for a snapshot."""
+    # Get all schools from the data
+    schools_in_data = set(s.strip() for s in records.distinct(SCHOOL_FIELD) if s.strip())
+    schools = sorted(schools_in_data)
     
-    # Gender ratio - using actual Google Sheets column name
-    genders = [r.get("GENDER", "").strip() for r in records if r.get("GENDER")]
-    gender_counter = Counter(genders)
-    gender_ratio = {
-        "Male": round(gender_counter.get("Male", 0) / total_registrations * 100, 2) if total_registrations else 0,
-        "Female": round(gender_counter.get("Female", 0) / total_registrations * 100, 2) if total_registrations else 0,
-        "Other": round(gender_counter.get("Other", 0) / total_registrations * 100, 2) if total_registrations else 0,
+    return {
+        "schools": schools,
+        "total": len(schools)
     }
-    
-    # Education level breakdown - using actual Google Sheets column name
-    education_levels = [
-        r.get("Your Level of Training (e.g. Deg, Dip, Cert)", "").strip()
-        for r in records
-        if r.get("Your Level of Training (e.g. Deg, Dip, Cert)")
-        and r.get("Your Level of Training (e.g. Deg, Dip, Cert)", "").strip() in EDUCATION_LEVELS.keys()
-    ]
-    education_counter = Counter(education_levels)
-    education_breakdown = {level: count for level, count in education_counter.most_common()}
-    
-    # Top 5 courses - using actual Google Sheets column name
-    courses = []
-    for r in records:
-        course = r.get("Your course of study", "").strip()
-        if course:
-            # Normalize course names to title case for consistency
-            normalized_course = course.title()
-            courses.append(normalized_course)
-    
-    course_counter = Counter(courses)
-    top_courses = [
-        {"name": course, "count": count}
-        for course, count in course_counter.most_common(5)
-    ]
-    
-    # Geographic distribution (Top 5 counties) - using actual Google Sheets column name
-    counties = [r.get("YOUR COUNTY", "").strip() for r in records if r.get("YOUR COUNTY")]
-    county_counter = Counter(counties)
-    geographic_distribution = [
-        {"county": county, "count": count}
-        for county, count in county_counter.most_common(5)
-    ]
-    
-    # Top 10 preferred companies - using actual Google Sheets column name
-    companies = []
-    for r in records:
-        # Handle multiple companies separated by comma
-        company_str = r.get("Three Preferred Companies", "").strip()
-        if company_str:
-            company_list = [normalize_company_name(c) for c in company_str.split(",")]
-            # Filter out empty strings
-            companies.extend([c for c in company_list if c])
-    
-    company_counter = Counter(companies)
-    preferred_companies = [
-        {"name": company, "count": count}
-        for company, count in company_counter.most_common(10)
-    ]
-    
-    # Calculate placement rate - using actual Google Sheets column name
-    # Handle various forms of "yes" - YES, Yes, yes, TRUE, True, true, Y, y, 1
-    placements = []
-    for r in records:
-        placement_value = str(r.get("PLACED YES OR NO", "")).strip().lower()
-        if placement_value in ["yes", "y", "true", "1", "placed"]:
-            placements.append(r)
-    
-    placement_rate = round(len(placements) / total_registrations * 100, 2) if total_registrations else 0
-    
-    # Top 10 schools
-    schools = [r.get("The name of your school", "").strip() for r in records if r.get("The name of your school", "").strip()]
-    school_counter = Counter(schools)
-    top_schools = [
-        {"name": school, "count": count}
-        for school, count in school_counter.most_common(10)
-    ]
-    
-    # Quarter breakdown - use precomputed year/quarter when available.
-    quarter_counter = Counter()
-    year_quarter_counter = Counter()
-    for row in records:
-        quarter = row.get("_application_quarter", "Unknown")
-        year = row.get("_application_year")
-
-        if quarter != "Unknown" and year is not None:
-            quarter_counter[quarter] += 1
-            year_quarter_counter[(year, quarter)] += 1
-
-    quarter_order = ["Q1 (Jul-Sep)", "Q2 (Oct-Dec)", "Q3 (Jan-Mar)", "Q4 (Apr-Jun)"]
-    quarter_total = sum(quarter_counter.values())
-    quarter_breakdown = [
-        {
-            "quarter": quarter,
-            "count": quarter_counter.get(quarter, 0),
-            "percentage": round((quarter_counter.get(quarter, 0) / quarter_total) * 100, 2) if quarter_total else 0
-        }
-        for quarter in quarter_order
-    ]
 
-    years = sorted({year for year, _ in year_quarter_counter.keys()})
-    quarter_breakdown_by_year = [
-        {
-            "year": year,
-            "quarters": [
-                {
-                    "quarter": quarter,
-                    "count": year_quarter_counter.get((year, quarter), 0)
-                }
-                for quarter in quarter_order
-            ]
-        }
-        for year in years
-    ]
+
+@app.get("/companies")
+async def get_companies(
+    request: Request,
+    limit: Optional[int] = Query(None, gt=0),
+    filters: RecordFilterParams = Depends()
+):
+    """
+    Get preferred companies ranked by how many times registrations name them
     
+    - **limit**: Maximum number of companies to return (optional)
+    - **county**, **level**, **school**, **gender**, **year**, **quarter**, **from**, **to**: Same filters as /stats (optional)
+    """
+    try:
+        client = await get_sheets_client_async()
+        records = await client.get_records()
+        return cached_json_response(
+            request, response_cache, (records.version, "companies", limit) + filters.key, records.modified_at,
+            lambda: build_companies_payload(records, filters, limit),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def build_companies_payload(records: RecordStore, filters: RecordFilterParams, limit: Optional[int]) -> Dict[str, Any]:
+    """/companies body, ranked from the same aggregate as /stats."""
+    cell = filtered_aggregate(records, filters.values, filters.date_range)
+    companies = cell.companies if cell is not None else Counter()
+
     return {
-        "total_registrations": total_registrations,
-        "placement_rate": placement_rate,
-        "gender_ratio": gender_ratio,
-        "education_breakdown": education_breakdown,
-        "top_courses": top_courses,
-        "geographic_distribution": geographic_distribution,
-        "preferred_companies": preferred_companies,
-        "top_schools": top_schools,
-        "quarter_breakdown": quarter_breakdown,
-        "quarter_breakdown_by_year": quarter_breakdown_by_year
+        "companies": [{"name": company, "count": count} for company, count in companies.most_common(limit)],
+        "total": len(companies),
+        "filtered": filters.active,
+        "timestamp": snapshot_timestamp(records)
     }
 
 
+@app.get("/companies/{company}")
+async def get_company_stats(request: Request, company: str):
+    """
+    Get /stats for the registrations that list a company among their preferred companies
+    
+    - **company**: Company name (normalized the same way as the sheet, so aliases work)
+    """
+    try:
+        client = await get_sheets_client_async()
+        records = await client.get_records()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    company_name = normalize_company_name(company)
+    row_ids = records.index("companies").rows(company_name)
+    if not row_ids:
+        raise HTTPException(status_code=404, detail=f"No registrations prefer company: {company}")
+
+    try:
+        return cached_json_response(
+            request, response_cache, (records.version, "company", company_name), records.modified_at,
+            lambda: build_company_payload(records, company_name, row_ids),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def build_company_payload(records: RecordStore, company: str, row_ids: Sequence[int]) -> Dict[str, Any]:
+    """/companies/{company} body: statistics over the company's posting list."""
+    stats = calculate_statistics(records, row_ids)
+    stats["company"] = company
+    stats["timestamp"] = snapshot_timestamp(records)
+    return stats
+
+
+def normalize_filters(**values: Optional[str]) -> tuple:
+    """Normalized filter values in FILTER_DIMENSIONS order, None for filters not given."""
+    return tuple(
+        normalizer(values[name]) if values.get(name) else None
+        for name, (_, normalizer) in FILTER_DIMENSIONS.items()
+    )
+
+
+def filter_row_ids(records: RecordStore, filters: tuple, date_range: Optional[tuple] = None) -> Optional[Sequence[int]]:
+    """
+    Ascending row ids matching normalize_filters() output and an optional
+    (from, to) application date range, or None when unfiltered.
+    """
+    criteria = [
+        (field, value)
+        for (field, _), value in zip(FILTER_DIMENSIONS.values(), filters)
+        if value is not None
+    ]
+    dated_rows = records.index("dates").select(*date_range) if date_range else None
+    if not criteria:
+        return dated_rows
+
+    row_ids = records.index("postings").select(criteria, len(records))
+    if dated_rows is not None:
+        row_ids = intersect_row_ids(*sorted((row_ids, dated_rows), key=len))
+    return row_ids
+
+
+def filtered_aggregate(
+    records: RecordStore, filters: tuple, date_range: Optional[tuple] = None
+) -> Optional[StatsAggregate]:
+    """
+    StatsAggregate for normalize_filters() output and an optional date range, or
+    None when no row matches. Filters on the cube's dimensions alone are answered
+    from a precomputed cell; anything else aggregates the selected rows.
+    """
+    values = {field: value for (field, _), value in zip(FILTER_DIMENSIONS.values(), filters) if value is not None}
+    if date_range is None and set(values) <= set(StatsCube.DIMENSIONS):
+        return records.index("stats").cell(*(values.get(field) for field in StatsCube.DIMENSIONS))
+
+    row_ids = filter_row_ids(records, filters, date_range)
+    return StatsAggregate().add_rows(records, row_ids) if len(row_ids) else None
+
+
+def data_row_key(records: RecordStore, index: int) -> str:
+    """Short fingerprint of one stored row, used to check /data cursors."""
+    values = "\x1f".join(str(records.value(field, index)) for field in records.headers)
+    return hashlib.sha1(values.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_data_cursor(records: RecordStore, row_ids: Sequence[int], position: int) -> str:
+    """
+    Opaque /data cursor for the page starting at `position` in row_ids (the
+    rows matching the request's filters). It carries the position and a
+    fingerprint of the row before it. Rows are only ever appended, so the
+    cursor stays valid across refreshes unless matching rows before it were
+    inserted or removed (the fingerprint then differs).
+    """
+    token = f"{position}:{data_row_key(records, row_ids[position - 1])}"
+    return base64.urlsafe_b64encode(token.encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_data_cursor(records: RecordStore, row_ids: Sequence[int], cursor: str) -> int:
+    """Position in row_ids a /data cursor points at; ValueError if it is malformed or no longer valid."""
+    try:
+        token = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        position_text, row_key = token.split(":", 1)
+        position = int(position_text)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Malformed cursor") from None
+    if not 0 < position <= len(row_ids) or data_row_key(records, row_ids[position - 1]) != row_key:
+        raise ValueError("Cursor is no longer valid for the current data; restart from the first page")
+    return position
+
+
+def iter_export_chunks(records: RecordStore, row_ids: Sequence[int], export_format: str) -> Iterator[Any]:
+    """
+    Serialize rows of a snapshot for /export, EXPORT_BATCH_ROWS at a time.
+    Only one batch of row dicts exists at any moment.
+    """
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(records.fields)
+    elif export_format == "json":
+        yield "["
+
+    for start in range(0, len(row_ids), EXPORT_BATCH_ROWS):
+        batch = records.rows(row_ids[start:start + EXPORT_BATCH_ROWS])
+        if export_format == "csv":
+            writer.writerows([row[field] for field in records.fields] for row in batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        elif export_format == "json":
+            chunk = b",".join(dump_json(row) for row in batch)
+            yield chunk if start == 0 else b"," + chunk
+        else:
+            yield b"".join(dump_json(row) + b"\n" for row in batch)
+
+    if export_format == "csv" and buffer.tell():
+        yield buffer.getvalue()
+    elif export_format == "json":
+        yield "]"
+
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "json": "application/json",
+}
+
+
+def calculate_statistics(records: RecordStore, row_ids: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+    """
+    Calculate all statistics from records with a full pass over the columns.
+    Restricted to row_ids when given.
+    """
+    return StatsAggregate().add_rows(records, row_ids).to_stats()
+
+
 @app.get("/search")
 async def search(
     query: str = Query(..., min_length=1),
@@ -1114,27 +4037,91 @@ async def search(
     - **field**: Specific field to search in (optional)
     """
     try:
-        client = get_sheets_client()
-        records = client.fetch_all_records()
-        
-        query_lower = query.lower()
+        client = await get_sheets_client_async()
+        records = await client.get_records()
         
-        if field:
-            results = [r for r in records if query_lower in str(r.get(field, "")).lower()]
-        else:
-            results = [
-                r for r in records
-                if any(query_lower in str(v).lower() for v in r.values())
-            ]
+        total, row_ids = records.index("search").search(query, field, limit=50)
         
-        return {
+        return FastJSONResponse({
             "query": query,
-            "count": len(results),
-            "data": results[:50]  # Limit to 50 results
-        }
+            "count": total,
+            "data": records.rows(row_ids)  # Limit to 50 results
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/export")
+async def export_data(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|json)$"),
+    filters: RecordFilterParams = Depends()
+):
+    """
+    Stream all (or filtered) records without building the response in memory
+    
+    - **format**: ndjson (one record per line), csv or json (a single array)
+    - **county**, **level**, **school**, **gender**, **year**, **quarter**, **from**, **to**: Same filters as /stats (optional)
+    """
+    try:
+        client = await get_sheets_client_async()
+        records = await client.get_records()
+        row_ids = filter_row_ids(records, filters.values, filters.date_range)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # The snapshot is never mutated, so it is safe to stream while refreshes swap in new ones
+    if row_ids is None:
+        row_ids = range(len(records))
+    return StreamingResponse(
+        iter_export_chunks(records, row_ids, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="registrations.{format}"',
+            "X-Total-Count": str(len(row_ids)),
+        },
+    )
+
+
+@app.get("/events")
+async def stream_events(request: Request):
+    """
+    Live dashboard updates as server-sent events
+    
+    - **snapshot**: full unfiltered stats, sent on connect
+    - **stats**: only the top-level stats fields that changed, sent after each refresh that changes the data
+    
+    Event ids are snapshot versions; a reconnect with a current Last-Event-ID skips the snapshot.
+    """
+    try:
+        client = await get_sheets_client_async()
+        await client.get_records()
+        stats_broadcaster.attach(client)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    queue = stats_broadcaster.subscribe()
+
+    async def events():
+        try:
+            if stats_broadcaster.snapshot_message and request.headers.get("last-event-id") != stats_broadcaster.version:
+                yield stats_broadcaster.snapshot_message
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    message = b": keepalive\n\n"
+                yield message
+        finally:
+            stats_broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 if __name__ == "__main__":
     import uvicorn
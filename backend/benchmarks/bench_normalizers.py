@@ -0,0 +1,254 @@
+"""
+Normalizer micro-benchmark
+
+Compares the compiled lookup tables used by normalize_county,
+normalize_company_name and normalize_school_name with the previous
+implementations, which rebuilt their mapping dicts and scanned them on
+every call. The legacy copies keep only the code that affects results
+(duplicate mapping keys are collapsed to the value that won). Memoization
+is bypassed so every call does the full work.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_normalizers [--calls 200000]
+"""
+
+import argparse
+import random
+import time
+
+from app import main
+
+
+def legacy_normalize_county(county_input: str) -> str:
+    """
+    Normalize county name to match official 47 counties of Kenya
+    Handles variations in spelling, case, and common typos
+    Default: Returns NAIROBI for any invalid or unrecognized county
+    """
+    if not county_input or not isinstance(county_input, str):
+        return "NAIROBI"
+    
+    # Clean the input
+    cleaned = county_input.strip().upper()
+    
+    # Filter out invalid entries and default to NAIROBI
+    invalid_entries = ["KENYA", "N/A", "NA", "NONE", "NULL", "-", ".", "NIL", "NOT APPLICABLE", ""]
+    if cleaned in invalid_entries or cleaned.isdigit():
+        return "NAIROBI"
+    
+    # Remove common prefixes/suffixes
+    cleaned = cleaned.replace(" COUNTY", "").replace("COUNTY", "")
+    cleaned = cleaned.strip()
+    
+    # Direct match
+    if cleaned in main.OFFICIAL_COUNTIES:
+        return cleaned
+    
+    # Handle common variations and typos
+    county_mapping = {
+        "NRBI": "NAIROBI",
+        "NRB": "NAIROBI",
+        "NAIROBY": "NAIROBI",
+        "NAIIROBI": "NAIROBI",
+        "MURANGA": "MURANGA",
+        "MURANG'A": "MURANGA",
+        "MURANG": "MURANGA",
+        "TAITA": "TAITA TAVETA",
+        "TAVETA": "TAITA TAVETA",
+        "ELGEIYO MARAKWET": "ELGEYO MARAKWET",
+        "ELGEYO-MARAKWET": "ELGEYO MARAKWET",
+        "ELGEYO": "ELGEYO MARAKWET",
+        "MARAKWET": "ELGEYO MARAKWET",
+        "HOMABAY": "HOMA BAY",
+        "HOMA-BAY": "HOMA BAY",
+        "TRANSNZOIA": "TRANS NZOIA",
+        "TRANS-NZOIA": "TRANS NZOIA",
+        "THARAKA-NITHI": "THARAKA NITHI",
+        "UASIN-GISHU": "UASIN GISHU",
+        "UASINGISHU": "UASIN GISHU",
+        "WEST-POKOT": "WEST POKOT",
+        "WESTPOKOT": "WEST POKOT",
+        "TANA-RIVER": "TANA RIVER",
+        "TANARIVER": "TANA RIVER",
+    }
+    
+    if cleaned in county_mapping:
+        return county_mapping[cleaned]
+    
+    # Fuzzy matching for partial matches
+    for official_county in main.OFFICIAL_COUNTIES:
+        # Check if cleaned input is contained in or contains the official name
+        if cleaned in official_county or official_county in cleaned:
+            # Additional check: should be at least 60% of the length
+            if len(cleaned) >= len(official_county) * 0.6:
+                return official_county
+    
+    # If no match found, default to NAIROBI (capital city)
+    return "NAIROBI"
+
+
+def legacy_normalize_company_name(company_input: str) -> str:
+    """
+    Normalize company names for consistency
+    """
+    if not company_input or not isinstance(company_input, str):
+        return ""
+    
+    # Clean the input
+    cleaned = company_input.strip()
+    
+    # Convert to uppercase for consistency
+    cleaned_upper = cleaned.upper()
+    
+    # Common abbreviations and full names mapping
+    company_mappings = {
+        "KEBS": "KENYA BUREAU OF STANDARDS",
+        "KBS": "KENYA BUREAU OF STANDARDS",
+        "KENYA BUREAU OF STANDARD": "KENYA BUREAU OF STANDARDS",
+        "KRA": "KENYA REVENUE AUTHORITY",
+        "KPLC": "KENYA POWER",
+        "KENYA POWER & LIGHTING": "KENYA POWER",
+        "SAFARICOM PLC": "SAFARICOM",
+        "SAFARICOM LIMITED": "SAFARICOM",
+        "CO-OPERATIVE BANK": "COOPERATIVE BANK",
+        "COOP BANK": "COOPERATIVE BANK",
+        "KCB": "KENYA COMMERCIAL BANK",
+        "EQUITY BANK": "EQUITY BANK",
+        "NHIF": "NATIONAL HOSPITAL INSURANCE FUND",
+        "NSSF": "NATIONAL SOCIAL SECURITY FUND",
+        "KWS": "KENYA WILDLIFE SERVICE",
+        "KFS": "KENYA FOREST SERVICE",
+        "KEMRI": "KENYA MEDICAL RESEARCH INSTITUTE",
+        "KALRO": "KENYA AGRICULTURAL AND LIVESTOCK RESEARCH ORGANIZATION",
+        "KENYATTA NATIONAL HOSPITAL": "KENYATTA NATIONAL HOSPITAL",
+        "KNH": "KENYATTA NATIONAL HOSPITAL",
+        "MOH": "MINISTRY OF HEALTH",
+    }
+    
+    # Check for exact mapping
+    if cleaned_upper in company_mappings:
+        return company_mappings[cleaned_upper]
+    
+    # Check for partial matches
+    for abbr, full_name in company_mappings.items():
+        if abbr in cleaned_upper or cleaned_upper in abbr:
+            return full_name
+    
+    # Title case for professional appearance
+    return cleaned.title() if cleaned else ""
+
+
+def legacy_normalize_school_name(school_input: str) -> str:
+    """
+    Normalize school names for consistency
+    """
+    if not school_input or not isinstance(school_input, str):
+        return ""
+    
+    # Clean the input
+    cleaned = school_input.strip()
+    
+    # Convert to uppercase for consistency
+    cleaned_upper = cleaned.upper()
+    
+    # Common school abbreviations and variations
+    school_mappings = {
+        "UON": "UNIVERSITY OF NAIROBI",
+        "U.O.N": "UNIVERSITY OF NAIROBI",
+        "NAIROBI UNIVERSITY": "UNIVERSITY OF NAIROBI",
+        "KU": "KENYATTA UNIVERSITY",
+        "K.U": "KENYATTA UNIVERSITY",
+        "MOI UNIVERSITY": "MOI UNIVERSITY",
+        "JKUAT": "JOMO KENYATTA UNIVERSITY OF AGRICULTURE AND TECHNOLOGY",
+        "J.K.U.A.T": "JOMO KENYATTA UNIVERSITY OF AGRICULTURE AND TECHNOLOGY",
+        "EGERTON": "EGERTON UNIVERSITY",
+        "EGERTON UNIVERSITY": "EGERTON UNIVERSITY",
+        "STRATHMORE": "STRATHMORE UNIVERSITY",
+        "STRATHMORE UNIVERSITY": "STRATHMORE UNIVERSITY",
+        "USIU": "UNITED STATES INTERNATIONAL UNIVERSITY",
+        "USIU-AFRICA": "UNITED STATES INTERNATIONAL UNIVERSITY",
+        "KCA": "KCA UNIVERSITY",
+        "KCA UNIVERSITY": "KCA UNIVERSITY",
+        "MULTIMEDIA UNIVERSITY": "MULTIMEDIA UNIVERSITY OF KENYA",
+        "MMU": "MULTIMEDIA UNIVERSITY OF KENYA",
+        "MOUNT KENYA UNIVERSITY": "MOUNT KENYA UNIVERSITY",
+        "MKU": "MOUNT KENYA UNIVERSITY",
+        "TECHNICAL UNIVERSITY OF KENYA": "TECHNICAL UNIVERSITY OF KENYA",
+        "TUK": "TECHNICAL UNIVERSITY OF KENYA",
+        "KENYA POLYTECHNIC": "TECHNICAL UNIVERSITY OF KENYA",
+        "KABETE NATIONAL POLYTECHNIC": "KABETE NATIONAL POLYTECHNIC",
+        "KABETE POLY": "KABETE NATIONAL POLYTECHNIC",
+        "MOMBASA POLYTECHNIC": "MOMBASA POLYTECHNIC UNIVERSITY COLLEGE",
+        "MPC": "MOMBASA POLYTECHNIC UNIVERSITY COLLEGE",
+    }
+    
+    # Check for exact mapping
+    if cleaned_upper in school_mappings:
+        return school_mappings[cleaned_upper]
+    
+    # Check for partial matches for universities
+    for abbr, full_name in school_mappings.items():
+        if abbr in cleaned_upper:
+            return full_name
+    
+    # Title case for professional appearance
+    return cleaned.title() if cleaned else ""
+
+
+def build_inputs(count: int, seed: int = 7) -> list:
+    """Messy inputs drawn from the alias tables, with noise, casing and partial names."""
+    rng = random.Random(seed)
+    pieces = (
+        list(main.OFFICIAL_COUNTIES)
+        + list(main.COUNTY_ALIASES)
+        + list(main.COMPANY_ALIASES)
+        + list(main.SCHOOL_ALIASES)
+        + ["county", "Ltd", "Campus", "Main", "Technical Training Institute", "N/A", "Kenya"]
+    )
+    inputs = []
+    for _ in range(count):
+        value = " ".join(rng.choice(pieces) for _ in range(rng.randint(1, 3)))
+        if rng.random() < 0.3:
+            start = rng.randint(0, len(value) // 2)
+            value = value[start:start + rng.randint(2, 12)]
+        inputs.append(value.lower() if rng.random() < 0.5 else value)
+    return inputs
+
+
+def time_calls(func, inputs: list) -> float:
+    started = time.perf_counter()
+    for value in inputs:
+        func(value)
+    return time.perf_counter() - started
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200000, help="Calls per normalizer")
+    args = parser.parse_args()
+
+    inputs = build_inputs(args.calls)
+    pairs = [
+        ("normalize_county", legacy_normalize_county, main.normalize_county.__wrapped__),
+        ("normalize_company_name", legacy_normalize_company_name, main.normalize_company_name.__wrapped__),
+        ("normalize_school_name", legacy_normalize_school_name, main.normalize_school_name.__wrapped__),
+    ]
+
+    print(f"{'normalizer':<26}{'legacy us/call':>16}{'compiled us/call':>18}{'speedup':>10}")
+    for name, legacy, compiled in pairs:
+        mismatches = [value for value in inputs if legacy(value) != compiled(value)]
+        if mismatches:
+            raise SystemExit(f"{name}: results differ for {len(mismatches)} inputs, e.g. {mismatches[:3]}")
+
+        legacy_seconds = time_calls(legacy, inputs)
+        compiled_seconds = time_calls(compiled, inputs)
+        print(
+            f"{name:<26}"
+            f"{legacy_seconds / len(inputs) * 1e6:>16.2f}"
+            f"{compiled_seconds / len(inputs) * 1e6:>18.2f}"
+            f"{legacy_seconds / compiled_seconds:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main_cli()
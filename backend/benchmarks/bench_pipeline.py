@@ -0,0 +1,273 @@
+"""
+Ingest, normalization and stats benchmark suite
+
+Runs the hot paths against synthetic registrations (see
+SyntheticRecordSource) at several dataset sizes:
+
+- normalize_county, normalize_education_level and parse_datetime_value,
+  both uncached (every call does the full work) and through their caches
+- a full sync: fetching, normalizing and indexing every row
+- calculate_statistics over all rows and over one county's rows, once per
+  stats backend (Counter passes, and NumPy when installed)
+- every read endpoint, through an in-process TestClient
+
+Each result records throughput and the process memory after the step.
+Results are written as JSON. Pass --baseline with an earlier results file
+to print the change for every benchmark.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_pipeline [--sizes 10000,100000,1000000]
+        [--output results.json] [--baseline previous.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+# Offline, single-process setup: no sheet, snapshot file or background refresh
+os.environ.update({
+    "DATA_SOURCE": "synthetic",
+    "SYNTHETIC_ROWS": "0",
+    "RECORDS_SNAPSHOT_PATH": "",
+    "RECORDS_BACKGROUND_REFRESH": "false",
+    "RECORDS_INCREMENTAL_SYNC": "false",
+})
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import main  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ENDPOINTS = [
+    "/stats",
+    "/stats?county=Nairobi",
+    "/stats?county=Kisumu&level=Degree",
+    "/stats?from=2025-01-01&to=2025-06-30",
+    "/stats/timeseries?interval=week",
+    "/counties",
+    "/levels",
+    "/schools",
+    "/data?limit=100",
+    "/data?limit=100&offset=5000",
+    "/search?query=kenyatta",
+    "/search?query=ict&field=Your course of study",
+    "/export?county=Kisumu",
+    "/health",
+]
+
+
+def memory_mb() -> dict:
+    """Current and peak resident set size of this process, in MB (None where unavailable)."""
+    current = None
+    try:
+        with open("/proc/self/statm") as statm:
+            current = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    peak = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS bytes
+        peak = peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+    return {
+        "rss_mb": round(current, 1) if current is not None else None,
+        "peak_rss_mb": round(peak, 1) if peak is not None else None,
+    }
+
+
+def result(size: int, name: str, operations: int, seconds: float, **extra) -> dict:
+    """One benchmark measurement."""
+    entry = {
+        "size": size,
+        "benchmark": name,
+        "operations": operations,
+        "seconds": round(seconds, 6),
+        "ops_per_second": round(operations / seconds, 1) if seconds else None,
+    }
+    entry.update(extra)
+    entry.update(memory_mb())
+    return entry
+
+
+def bench_normalizers(size: int, rows: list, headers: list, max_calls: int) -> list:
+    """Throughput of the normalizers on the dataset's raw values."""
+    sample = rows[:max_calls]
+    columns = {
+        "normalize_county": (main.normalize_county, headers.index(main.COUNTY_FIELD)),
+        "normalize_education_level": (main.normalize_education_level, headers.index(main.LEVEL_FIELD)),
+        "parse_datetime_value": (main.parse_datetime_value, headers.index("Timestamp")),
+    }
+
+    results = []
+    for name, (function, column) in columns.items():
+        values = [row[column] for row in sample]
+
+        start = time.perf_counter()
+        for value in values:
+            function.__wrapped__(value)
+        results.append(result(size, f"{name}.uncached", len(values), time.perf_counter() - start))
+
+        function.cache_clear()
+        for value in values:
+            function(value)
+        start = time.perf_counter()
+        for value in values:
+            function(value)
+        results.append(result(size, f"{name}.cached", len(values), time.perf_counter() - start))
+    return results
+
+
+def bench_ingest(size: int, client: main.GoogleSheetsClient, trace_memory: bool) -> list:
+    """Full sync of the dataset: fetch, normalize and index every row."""
+    # Start cold, as a freshly started worker would
+    for normalizer in (main.normalize_county, main.normalize_education_level, main.normalize_company_name,
+                       main.normalize_school_name, main.parse_datetime_value):
+        normalizer.cache_clear()
+    client._records_cache = main.RecordStore([])
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    records = client.fetch_all_records(force_refresh=True)
+    seconds = time.perf_counter() - start
+
+    extra = {}
+    if trace_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        extra = {"traced_mb": round(current / 2 ** 20, 1), "traced_peak_mb": round(peak / 2 ** 20, 1)}
+    return [result(size, "ingest.full_sync", len(records), seconds, **extra)]
+
+
+def bench_statistics(size: int, records: main.RecordStore, repeat: int) -> list:
+    """calculate_statistics over the whole store and over one county, with every stats backend."""
+    county_rows = main.filter_row_ids(records, main.normalize_filters(county="Nairobi"))
+    cases = [("calculate_statistics.all", None), ("calculate_statistics.county", county_rows)]
+    backends = ["python"] + (["numpy"] if main.numpy is not None else [])
+
+    results = []
+    configured_backend = main.RECORDS_STATS_BACKEND
+    try:
+        for name, row_ids in cases:
+            outputs = {}
+            for backend in backends:
+                main.RECORDS_STATS_BACKEND = backend
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    outputs[backend] = main.calculate_statistics(records, row_ids)
+                    timings.append(time.perf_counter() - start)
+                rows = len(records) if row_ids is None else len(row_ids)
+                best = min(timings)
+                results.append(result(size, f"{name}.{backend}", rows, best, rows_per_call=rows, calls=repeat))
+            if len({main.dump_json(output) for output in outputs.values()}) > 1:
+                raise AssertionError(f"{name}: stats backends disagree at {size:,} rows")
+    finally:
+        main.RECORDS_STATS_BACKEND = configured_backend
+    return results
+
+
+def bench_endpoints(size: int, requests: int) -> list:
+    """Latency of every read endpoint through the ASGI app (no network)."""
+    results = []
+    with TestClient(main.app) as http:
+        for path in ENDPOINTS:
+            response = http.get(path)
+            response.raise_for_status()
+            latencies = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                http.get(path)
+                latencies.append(time.perf_counter() - start)
+            latencies.sort()
+            results.append(result(
+                size, f"GET {path}", requests, sum(latencies),
+                p50_ms=round(statistics.median(latencies) * 1000, 3),
+                p95_ms=round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 3),
+                response_bytes=len(response.content),
+            ))
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def print_results(results: list, baseline: list) -> None:
+    previous = {(entry["size"], entry["benchmark"]): entry for entry in baseline}
+    print(f"{'size':>9}  {'benchmark':<48}{'ops/s':>14}{'rss MB':>9}{'vs baseline':>13}")
+    for entry in results:
+        change = ""
+        before = previous.get((entry["size"], entry["benchmark"]))
+        if before and before.get("ops_per_second") and entry["ops_per_second"]:
+            change = f"{entry['ops_per_second'] / before['ops_per_second'] - 1:+.1%}"
+        rss = entry["rss_mb"] if entry["rss_mb"] is not None else ""
+        print(f"{entry['size']:>9}  {entry['benchmark']:<48}{entry['ops_per_second']:>14,.1f}{rss:>9}{change:>13}")
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated dataset sizes")
+    parser.add_argument("--seed", type=int, default=42, help="Synthetic data seed")
+    parser.add_argument("--max-calls", type=int, default=200000, help="Values per normalizer benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per calculate_statistics case (best is kept)")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint")
+    parser.add_argument("--trace-memory", action="store_true", help="Trace Python allocations during ingest (slow)")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results file")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    client = main.get_sheets_client()
+    results = []
+
+    for size in sizes:
+        print(f"Generating {size:,} rows...", file=sys.stderr)
+        client.source = main.SyntheticRecordSource(size, seed=args.seed, growth_rows=0)
+        values = client.source.get_all_values()
+
+        results += bench_normalizers(size, values[1:], values[0], args.max_calls)
+        del values
+        results += bench_ingest(size, client, args.trace_memory)
+        results += bench_statistics(size, client.fetch_all_records(), args.repeat)
+        results += bench_endpoints(size, args.requests)
+
+    baseline = []
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+    print_results(results, baseline)
+
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": vars(args),
+        "results": results,
+    }
+    with open(args.output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main_cli()
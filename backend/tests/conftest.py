@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Offline, single-process setup: no sheet, snapshot file or background refresh
+os.environ.update({
+    "DATA_SOURCE": "synthetic",
+    "SYNTHETIC_ROWS": "0",
+    "RECORDS_SNAPSHOT_PATH": "",
+    "RECORDS_BACKGROUND_REFRESH": "false",
+    "RECORDS_INCREMENTAL_SYNC": "true",
+    "RECORDS_INGEST_WORKERS": "0",
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import main  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    """A fresh records client (the app's singleton) for each test."""
+    main.GoogleSheetsClient._instance = None
+    client = main.get_sheets_client()
+    yield client
+    client.shutdown_ingest_pool()
+    main.GoogleSheetsClient._instance = None
+
+
+@pytest.fixture
+def api(client):
+    """HTTP client for the app, serving 3000 synthetic rows (grow them with client.source.growth_rows)."""
+    client.source = main.SyntheticRecordSource(3000, seed=9, growth_rows=0)
+    client.fetch_all_records(force_refresh=True)
+    return TestClient(main.app)
@@ -0,0 +1,53 @@
+from app import main
+
+
+def read_pages(api, limit, **params):
+    """Every row of /data, following next_cursor from the first page."""
+    rows, cursor = [], None
+    while True:
+        page = api.get("/data", params={**params, "limit": limit, **({"cursor": cursor} if cursor else {})}).json()
+        rows += page["data"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return rows
+
+
+def test_cursor_pages_cover_every_row_with_true_totals(api, client):
+    records = client.fetch_all_records()
+    everything = api.get("/data").json()
+    assert everything["total"] == everything["count"] == len(records) == 3000
+    assert everything["next_cursor"] is None
+
+    first = api.get("/data", params={"limit": 7, "offset": 10}).json()
+    assert (first["total"], first["count"], first["offset"]) == (3000, 7, 10)
+    assert first["data"] == everything["data"][10:17]
+    assert read_pages(api, 7) == everything["data"]
+
+    county = everything["data"][0][main.COUNTY_FIELD]
+    matching = [row for row in everything["data"] if row[main.COUNTY_FIELD] == county]
+    assert api.get("/data", params={"county": county, "limit": 5}).json()["total"] == len(matching)
+    assert read_pages(api, 5, county=county) == matching
+
+    fields = [main.COUNTY_FIELD, main.GENDER_FIELD]
+    projected = api.get("/data", params={"limit": 3, "fields": ", ".join(fields)}).json()["data"]
+    assert projected == [{field: row[field] for field in fields} for row in everything["data"][:3]]
+    assert api.get("/data", params={"fields": "No such field"}).status_code == 400
+
+
+def test_cursor_survives_appends_but_not_edits(api, client):
+    page = api.get("/data", params={"limit": 100}).json()
+
+    # Rows appended by a refresh don't move the cursor
+    client.source.growth_rows = 20
+    client.fetch_all_records(force_refresh=True)
+    client.source.growth_rows = 0
+    rest = api.get("/data", params={"limit": 5000, "cursor": page["next_cursor"]}).json()
+    assert rest["total"] == 3020 and rest["offset"] == 100
+    assert page["data"] + rest["data"] == api.get("/data").json()["data"]
+
+    # Different rows before the cursor position invalidate it
+    client.source = main.SyntheticRecordSource(3000, seed=10, growth_rows=0)
+    client.fetch_all_records(force_refresh=True)
+    response = api.get("/data", params={"limit": 10, "cursor": page["next_cursor"]})
+    assert response.status_code == 400 and "no longer valid" in response.json()["detail"]
+    assert api.get("/data", params={"cursor": "not a cursor"}).status_code == 400
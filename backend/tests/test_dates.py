@@ -0,0 +1,57 @@
+import pytest
+
+from app import main
+
+# Look-alike layouts, two-digit years, invalid days/times and noise around dates
+AMBIGUOUS_VALUES = [
+    "03/04/2024", "13/04/2024", "04/13/2024", "3/4/2024", "02/30/2024", "31/02/2024", "00/01/2024",
+    "03/04/24", "3/4/24 10:00", "03-04-2024", "13-04-2024", "3-4-24", "2024-03-04", "2024/3/4",
+    "2024-13-01", "2024-3-4 7:05", "2024-03-04 07:05:09", "04.03.2024", "31.12.2024 10:15", "12.31.2024",
+    "12/31/2024 23:59:59", "12/31/2024 24:00", "12/31/2024 9:5", "12/31/2024 10:00:60",
+    "12/31/2024 11:59:59 PM", "  03/04/2024   10:00 EAT", "06/30/2024 23:59", "07/01/2024 00:00",
+    "30/06/2024", "01/07/2024", "45567.52", "Jan 5, 2024", "2024-03-04T10:00:00Z", "N/A", "-",
+    "1/2/0999", "0999-01-02", "submitted 2024-05-06 via form", "05/06/2024 10:00:00 extra", "2024-03-04/",
+]
+
+COLUMNS = {
+    "month first": ["03/04/2024", "12/31/2024 10:00", "1/2/2024", "06/30/2024 23:59"] * 5,
+    "day first": ["13/04/2024", "31/12/2024", "02/01/2024 08:00", "30/06/2024"] * 5,
+    "dotted": ["04.03.2024", "31.12.2024 10:15"] * 10,
+    "iso": ["2024-03-04", "2024/3/4", "2024-07-01 00:00:00"] * 5,
+    "mixed": ["03/04/2024", "2024-03-04", "04.03.2024", "3-4-2024", "03/04/24", "45567.52", "Jan 5, 2024"],
+}
+
+# Every day/month pairing (valid or not) in each separator and field order
+GRID_VALUES = [
+    value
+    for first in range(0, 33, 4)
+    for second in range(0, 14)
+    for year in ("2024", "24")
+    for value in (
+        f"{first}/{second}/{year}", f"{first:02}/{second:02}/{year} 10:30", f"{first}-{second}-{year}",
+        f"{first}.{second}.{year}", f"20{year[-2:]}-{second}-{first}", f"20{year[-2:]}/{second:02}/{first:02} 8:05:01",
+    )
+]
+
+
+@pytest.mark.parametrize("layout", main.DATE_LAYOUTS, ids=lambda layout: layout.name)
+def test_every_layout_parses_like_the_generic_parser(layout):
+    parser = main.DateColumnParser.for_layout(layout.name)
+    for value in AMBIGUOUS_VALUES + GRID_VALUES:
+        assert main.parse_application_date(value, parser) == main.parse_application_date(value), value
+
+
+@pytest.mark.parametrize("column", COLUMNS, ids=str)
+def test_detected_layout_parses_like_the_generic_parser(column):
+    values = COLUMNS[column]
+    parser = main.DateColumnParser(values)
+    for value in values + AMBIGUOUS_VALUES:
+        assert main.parse_application_date(value, parser) == main.parse_application_date(value), value
+
+
+def test_detected_layouts():
+    assert main.DateColumnParser(COLUMNS["month first"]).layout.name == "month/day/year"
+    assert main.DateColumnParser(COLUMNS["dotted"]).layout.name == "day.month.year"
+    assert main.DateColumnParser(COLUMNS["iso"]).layout.name == "year-month-day"
+    # No dominant layout: everything goes through the generic chain
+    assert main.DateColumnParser(COLUMNS["mixed"]).layout is None
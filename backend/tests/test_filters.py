@@ -0,0 +1,62 @@
+from itertools import combinations
+
+import pytest
+
+from app import main
+
+FILTER_NAMES = list(main.FILTER_DIMENSIONS)
+
+
+def build(rows):
+    records = main.RecordStore(rows[0])
+    records.extend(main.normalize_record(row, rows[0], main.get_date_candidate_fields(rows[0])) for row in rows[1:])
+    return records
+
+
+def scanned_row_ids(rows, criteria):
+    """The linear scan the posting lists replace: r.get(field, "") == value for every filter."""
+    return [
+        index for index, row in enumerate(rows)
+        if all(row.get(main.FILTER_DIMENSIONS[name][0], "") == value for name, value in criteria.items())
+    ]
+
+
+def filter_queries(rows):
+    """Single, pair and triple filters over stored, empty and unknown values."""
+    choices = {}
+    for name in FILTER_NAMES:
+        field = main.FILTER_DIMENSIONS[name][0]
+        values = sorted({row.get(field, "") for row in rows} - {None}, key=str)
+        choices[name] = values[:2] + values[-1:] + (["", "NOWHERE"] if field != main.YEAR_FIELD else [1999])
+    for size in (1, 2, 3):
+        for names in combinations(FILTER_NAMES, size):
+            for offset in range(2):
+                yield {name: choices[name][(offset + position) % len(choices[name])] for position, name in enumerate(names)}
+
+
+@pytest.mark.parametrize("with_numpy", [True, False], ids=["numpy", "python"])
+def test_posting_lists_match_a_linear_scan(monkeypatch, with_numpy):
+    if not with_numpy:
+        monkeypatch.setattr(main, "numpy", None)
+    rows = main.SyntheticRecordSource(1500, seed=4, growth_rows=0).get_all_values()
+    first = build(rows[:1001])
+    extended = first.copy()
+    extended.extend(main.normalize_record(row, rows[0], main.get_date_candidate_fields(rows[0])) for row in rows[1001:])
+
+    for records in (first, extended):
+        scanned_rows = list(records)
+        for criteria in filter_queries(scanned_rows):
+            filters = tuple(criteria.get(name) for name in FILTER_NAMES)
+            assert list(main.filter_row_ids(records, filters)) == scanned_row_ids(scanned_rows, criteria), criteria
+    assert len(extended) == 1500 and len(first) == 1000
+
+
+def test_filters_on_missing_columns_read_as_empty():
+    records = build([["Name", main.COUNTY_FIELD], ["Ann", "Nairobi"], ["Bob", "Kisumu"]])
+
+    def gender_filter(value):
+        return tuple(value if name == "gender" else None for name in FILTER_NAMES)
+
+    assert list(main.filter_row_ids(records, gender_filter("Female"))) == []
+    assert list(main.filter_row_ids(records, gender_filter(""))) == [0, 1]
+    assert main.filter_row_ids(records, main.normalize_filters()) is None
@@ -0,0 +1,43 @@
+from app import main
+
+CACHED_PATHS = ["/stats", "/stats?county=Nairobi", "/counties", "/levels", "/schools", "/metadata"]
+
+
+def test_conditional_get_answers_304(api):
+    for path in CACHED_PATHS:
+        response = api.get(path)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert "must-revalidate" in response.headers["cache-control"] and response.headers["last-modified"]
+        # The body is serialized once per snapshot: repeats are byte-identical
+        assert api.get(path).content == response.content
+
+        for validators in (
+            {"If-None-Match": etag},
+            {"If-None-Match": f'"other", W/{etag}'},
+            {"If-Modified-Since": response.headers["last-modified"]},
+        ):
+            revalidated = api.get(path, headers=validators)
+            assert revalidated.status_code == 304, (path, validators)
+            assert revalidated.content == b"" and revalidated.headers["etag"] == etag
+        assert api.get(path, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_new_snapshot_version_invalidates_cached_responses(api, client):
+    main.response_cache.attach(client)
+    before = api.get("/stats")
+    etag = before.headers["etag"]
+
+    client.source.growth_rows = 25
+    records = client.fetch_all_records(force_refresh=True)
+    client.source.growth_rows = 0
+    assert all(key[0] == records.version for key in main.response_cache._entries)
+
+    after = api.get("/stats", headers={"If-None-Match": etag})
+    assert after.status_code == 200 and after.headers["etag"] != etag
+    assert after.json()["total_registrations"] == before.json()["total_registrations"] + 25
+
+    # A full resync of the same rows keeps the version, so clients keep getting 304s
+    client._last_full_sync_at = 0
+    assert client.fetch_all_records(force_refresh=True) is records
+    assert api.get("/stats", headers={"If-None-Match": after.headers["etag"]}).status_code == 304
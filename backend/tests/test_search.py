@@ -0,0 +1,32 @@
+from app import main
+
+QUERIES = ["nairobi", "a", "07", "applicant 12", "@example", "2024", "kenyatta", "zzzq"]
+
+
+def build(rows):
+    records = main.RecordStore(rows[0])
+    records.extend(main.normalize_record(row, rows[0], main.get_date_candidate_fields(rows[0])) for row in rows[1:])
+    return records
+
+
+def test_incremental_search_matches_full_build():
+    rows = main.SyntheticRecordSource(600, seed=11, growth_rows=0).get_all_values()
+    first = build(rows[:401])
+    before = {query: first.index("search").search(query) for query in QUERIES}
+
+    extended = first.copy()
+    extended.extend(
+        main.normalize_record(row, rows[0], main.get_date_candidate_fields(rows[0])) for row in rows[401:]
+    )
+    full = build(rows)
+    for query in QUERIES:
+        assert extended.index("search").search(query) == full.index("search").search(query)
+        # The snapshot it was copied from is unaffected
+        assert first.index("search").search(query) == before[query]
+
+
+def test_search_counts_each_row_once():
+    records = build([["Name", "Email"], ["Ann Anna", "ann@example.com"], ["Bob", "bob@example.com"]])
+    assert records.index("search").search("ann") == (1, [0])
+    assert records.index("search").search("b", field="Name") == (1, [1])
+    assert records.index("search").search("\x00") == (0, [])
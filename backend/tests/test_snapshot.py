@@ -0,0 +1,121 @@
+import os
+import pickle
+import time
+
+import pytest
+
+from app import main
+
+
+def test_snapshot_round_trip_rebuilds_search_index(tmp_path):
+    source = main.SyntheticRecordSource(300, seed=5, growth_rows=0)
+    rows = source.get_all_values()
+    records = main.RecordStore(rows[0])
+    records.extend(main.normalize_record(row, rows[0], main.get_date_candidate_fields(rows[0])) for row in rows[1:])
+
+    path = str(tmp_path / "records_snapshot.bin")
+    assert main.write_records_snapshot(path, records, {"synced_row_count": len(records)})
+    with open(path, "rb") as snapshot_file:
+        assert pickle.dumps(records.index("search"), protocol=pickle.HIGHEST_PROTOCOL) not in snapshot_file.read()
+
+    loaded, sync_state = main.read_records_snapshot(path)
+    assert sync_state == {"synced_row_count": len(records)}
+    assert list(loaded) == list(records)
+    for query in ["nairobi", "07", "applicant 1", "@example"]:
+        assert loaded.index("search").search(query) == records.index("search").search(query)
+    assert loaded.index("stats").cell().to_stats() == records.index("stats").cell().to_stats()
+
+
+def test_mapped_text_columns_decode_non_ascii(tmp_path):
+    headers = ["Name", "School"]
+    rows = [["Zoë Wanjirũ", "Égerton"], ["", "KU"], ["Ōmondi 🙂", ""]]
+    records = main.RecordStore(headers)
+    records.extend(main.normalize_record(row, headers, []) for row in rows)
+
+    path = str(tmp_path / "records_snapshot.bin")
+    assert main.write_records_snapshot(path, records, {})
+    loaded, _ = main.read_records_snapshot(path)
+    assert isinstance(loaded.column("Name"), main.MappedStrings)
+    assert [loaded.value("Name", index) for index in range(3)] == ["Zoë Wanjirũ", "", "Ōmondi 🙂"]
+    assert loaded.column("Name")[1:] == ["", "Ōmondi 🙂"]
+    assert list(loaded.copy()) == list(records)
+
+
+def test_attached_worker_stops_serving_an_abandoned_snapshot(client, tmp_path, monkeypatch):
+    path = str(tmp_path / "records_snapshot.bin")
+    monkeypatch.setattr(main, "RECORDS_SNAPSHOT_PATH", path)
+    monkeypatch.setattr(main, "RECORDS_SHARED_SNAPSHOT", True)
+
+    class UnavailableSource(main.RecordSource):
+        name = "unavailable"
+
+        def get_all_values(self):
+            raise ConnectionError("source is down")
+
+    leader = object.__new__(main.GoogleSheetsClient)
+    leader._initialize()
+    try:
+        assert leader.is_refresh_leader and not client.is_refresh_leader
+        leader.source = main.SyntheticRecordSource(200, seed=3, growth_rows=0)
+        records = leader.fetch_all_records(force_refresh=True)
+        synced_at = leader._records_cache_at
+        assert list(client.fetch_all_records(force_refresh=True)) == list(records)
+        assert client._records_cache_at == pytest.approx(synced_at, abs=1e-3)
+
+        # The leader's refreshes start failing: polling the file doesn't make it fresh
+        leader.source = UnavailableSource()
+        assert leader.fetch_all_records(force_refresh=True) is records
+        time.sleep(0.01)
+        assert client.fetch_all_records(force_refresh=True) is client._records_cache
+        assert client._records_cache_at == pytest.approx(synced_at, abs=1e-3)
+
+        # Past the stale limit the attached worker refreshes on its own, and fails like the leader
+        abandoned_at = time.time() - main.RECORDS_CACHE_TTL_SECONDS - main.RECORDS_STALE_MAX_SECONDS - 1
+        client._records_cache_at = abandoned_at
+        os.utime(f"{path}.synced", (abandoned_at, abandoned_at))
+        client.source = UnavailableSource()
+        with pytest.raises(RuntimeError, match="from the unavailable source"):
+            client.fetch_all_records(force_refresh=True)
+        client.source = main.SyntheticRecordSource(220, seed=3, growth_rows=0)
+        signature = main.snapshot_signature(path)
+        assert len(client.fetch_all_records(force_refresh=True)) == 220
+        assert main.snapshot_signature(path) == signature
+    finally:
+        leader._leader_lock_file.close()
+        leader._refresh_executor.shutdown()
+
+
+def test_unusable_snapshot_directory_falls_back_to_refreshing(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "RECORDS_SHARED_SNAPSHOT", True)
+    client.source = main.SyntheticRecordSource(50, seed=3, growth_rows=0)
+
+    # A missing directory is created for the lock file
+    monkeypatch.setattr(main, "RECORDS_SNAPSHOT_PATH", str(tmp_path / "missing" / "records_snapshot.bin"))
+    assert len(client.fetch_all_records(force_refresh=True)) == 50
+    assert client._leader_lock_file is not None
+    client._leader_lock_file.close()
+    client._leader_lock_file = None
+
+    # One that can't be created leaves the worker refreshing on its own
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    monkeypatch.setattr(main, "RECORDS_SNAPSHOT_PATH", str(blocker / "records_snapshot.bin"))
+    assert len(client.fetch_all_records(force_refresh=True)) == 50
+    assert client.is_refresh_leader and client.refresh_failures == 0
+
+
+def test_snapshot_indexes_are_plain_data(tmp_path, monkeypatch):
+    source = main.SyntheticRecordSource(200, seed=8, growth_rows=0)
+    rows = source.get_all_values()
+    records = main.RecordStore(rows[0])
+    records.extend(main.normalize_record(row, rows[0], main.get_date_candidate_fields(rows[0])) for row in rows[1:])
+    path = str(tmp_path / "records_snapshot.bin")
+    assert main.write_records_snapshot(path, records, {})
+
+    # Loading must not unpickle anything
+    monkeypatch.setattr(pickle, "loads", None)
+    monkeypatch.setattr(pickle, "load", None)
+    loaded, _ = main.read_records_snapshot(path)
+    for name in ("companies", "postings", "dates", "stats"):
+        assert loaded.index(name).__getstate__() == records.index(name).__getstate__(), name
+    assert main.calculate_statistics(loaded) == main.calculate_statistics(records)
@@ -0,0 +1,76 @@
+from collections import Counter
+
+import pytest
+
+from app import main
+
+
+def most_common(records, field, count):
+    return [value for value, _ in Counter(row[field] for row in records).most_common(count)]
+
+
+def scanned_stats(records, **query):
+    """/stats body computed by scanning every row, without the cube or posting lists."""
+    filters = dict(zip(main.FILTER_DIMENSIONS, main.normalize_filters(**query)))
+    criteria = [(main.FILTER_DIMENSIONS[name][0], value) for name, value in filters.items() if value is not None]
+    row_ids = [index for index, row in enumerate(records) if all(row.get(field, "") == value for field, value in criteria)]
+    stats = main.StatsAggregate().add_rows(records, row_ids).to_stats() if row_ids else {"total_registrations": 0}
+    stats.pop("timestamp", None)
+    return stats
+
+
+def served_stats(api, **query):
+    response = api.get("/stats", params=query)
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats.pop("filtered") is bool(query)
+    stats.pop("timestamp")
+    if not stats["total_registrations"]:
+        return {"total_registrations": 0}
+    return stats
+
+
+def test_cube_and_posting_list_stats_match_a_full_scan(api, client):
+    for grow in (False, True):
+        if grow:
+            # Incremental refresh: cube cells are copied and extended
+            client.source.growth_rows = 500
+            client.fetch_all_records(force_refresh=True)
+        records = client.fetch_all_records()
+        counties = most_common(records, main.COUNTY_FIELD, 3)
+        levels = most_common(records, main.LEVEL_FIELD, 2)
+        schools = most_common(records, main.SCHOOL_FIELD, 2)
+
+        queries = [{}, {"county": "Nowhere"}]
+        queries += [{"county": county} for county in counties] + [{"level": level} for level in levels]
+        queries += [{"county": county, "level": level} for county in counties for level in levels]
+        queries += [{"school": school} for school in schools]
+        queries += [{"county": counties[0], "school": school} for school in schools]
+        queries += [{"county": counties[0], "level": levels[0], "school": schools[0], "gender": "Female"}]
+        for query in queries:
+            assert served_stats(api, **query) == scanned_stats(records, **query), query
+
+
+
+def test_numpy_and_counter_backends_agree(client, tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    client.source = main.SyntheticRecordSource(5000, seed=21, growth_rows=0)
+    records = client.fetch_all_records(force_refresh=True)
+    path = str(tmp_path / "records_snapshot.bin")
+    assert main.write_records_snapshot(path, records, {})
+    mapped, _ = main.read_records_snapshot(path)
+
+    county_rows = main.filter_row_ids(records, main.normalize_filters(county=records.value(main.COUNTY_FIELD, 0)))
+    selections = [
+        None, range(5000), range(100, 2600), range(0, 5000, 3), county_rows, list(county_rows[:9]),
+        [4999, 17, 3, 2500], [42], [],
+    ]
+
+    def statistics(backend, store, row_ids):
+        monkeypatch.setattr(main, "RECORDS_STATS_BACKEND", backend)
+        return main.calculate_statistics(store, row_ids)
+
+    for row_ids in selections:
+        expected = statistics("python", records, row_ids)
+        assert statistics("numpy", records, row_ids) == expected
+        assert statistics("numpy", mapped, row_ids) == expected
@@ -0,0 +1,94 @@
+import asyncio
+import base64
+
+import pytest
+
+from app import main
+
+
+def test_incremental_then_full_sync_keeps_version(client):
+    source = main.SyntheticRecordSource(300, seed=7, growth_rows=0)
+    client.source = source
+    client.fetch_all_records(force_refresh=True)
+    full_sync_at = client._last_full_sync_at
+
+    source.growth_rows = 40
+    records = client.fetch_all_records(force_refresh=True)
+    assert len(records) == 340
+    assert client._last_full_sync_at == full_sync_at, "expected an incremental sync"
+
+    # The periodic full resync of unchanged rows keeps the snapshot and its version
+    source.growth_rows = 0
+    client._last_full_sync_at = 0
+    assert client.fetch_all_records(force_refresh=True) is records
+    assert client._last_full_sync_at > full_sync_at
+    assert records.version == main.digest_rows(source.get_all_values())
+
+
+def test_requests_back_off_after_failed_refresh(client):
+    client.source = main.SyntheticRecordSource(50, seed=7, growth_rows=0)
+    records = client.fetch_all_records(force_refresh=True)
+
+    calls = []
+
+    class UnavailableSource(main.RecordSource):
+        name = "unavailable"
+
+        def get_all_values(self):
+            calls.append(1)
+            raise ConnectionError("source is down")
+
+    client.source = UnavailableSource()
+    client._records_cache_at -= main.RECORDS_CACHE_TTL_SECONDS
+
+    async def burst(count):
+        for _ in range(count):
+            assert await client.get_records() is records
+
+    # The first request past the TTL starts one refresh, which fails
+    asyncio.run(burst(1))
+    client._refresh_future.result()
+    assert calls == [1] and client.refresh_failures == 1
+
+    # Until the backoff has passed, requests keep serving the stale snapshot
+    asyncio.run(burst(200))
+    assert calls == [1]
+
+    client._refresh_retry_at = 0.0
+    asyncio.run(burst(1))
+    client._refresh_future.result()
+    assert calls == [1, 1] and client.refresh_failures == 2
+
+
+def test_fetch_error_names_the_source(client):
+    class BrokenCsvSource(main.CsvRecordSource):
+        def __init__(self):
+            pass
+
+        def get_all_values(self):
+            raise OSError("registrations.csv: no such file")
+
+    client.source = BrokenCsvSource()
+    with pytest.raises(RuntimeError, match="Failed to fetch records from the csv source: registrations.csv"):
+        client.fetch_all_records(force_refresh=True, allow_stale=False)
+
+
+def test_parallel_ingest_workers_skip_the_app_setup(client, monkeypatch, tmp_path):
+    client.source = main.SyntheticRecordSource(400, seed=3, growth_rows=0)
+    serial = list(client.fetch_all_records(force_refresh=True))
+
+    # Workers start from this environment; as ingest workers they must not write credentials
+    monkeypatch.setenv("SERVICE_ACCOUNT_JSON", base64.b64encode(b"{}").decode())
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, "RECORDS_INGEST_WORKERS", 2)
+    monkeypatch.setattr(main, "RECORDS_INGEST_PARALLEL_MIN_ROWS", 100)
+    monkeypatch.setattr(main, "RECORDS_INGEST_CHUNK_ROWS", 150)
+    main.GoogleSheetsClient._instance = None
+    parallel = main.get_sheets_client()
+    parallel.source = client.source
+    try:
+        assert list(parallel.fetch_all_records(force_refresh=True)) == serial
+        assert parallel._ingest_pool is not None
+    finally:
+        parallel.shutdown_ingest_pool()
+    assert not (tmp_path / "service_account.json").exists()
@@ -0,0 +1,59 @@
+import pytest
+
+from app import main
+
+DATES = ["2024-12-30", "2025-01-05", "2025-01-06", "2025-01-31", "2025-02-01", "2025-02-28", "2025-03-01", "2025-03-15"]
+
+
+class DatedSource(main.RecordSource):
+    name = "dated"
+
+    def get_all_values(self):
+        return [["Timestamp", main.COUNTY_FIELD]] + [[day, "Nairobi"] for day in DATES + ["N/A"]]
+
+
+@pytest.fixture
+def dated_api(api, client):
+    client.source = DatedSource()
+    client.fetch_all_records(force_refresh=True)
+    return api
+
+
+def series(api, **params):
+    body = api.get("/stats/timeseries", params=params).json()
+    return body["from"], body["to"], [(bucket["period"], bucket["count"], bucket["partial"]) for bucket in body["series"]]
+
+
+def test_default_range_covers_whole_periods(dated_api):
+    assert series(dated_api) == ("2024-12-01", "2025-03-31", [
+        ("2024-12-01", 1, False), ("2025-01-01", 3, False), ("2025-02-01", 2, False), ("2025-03-01", 2, False),
+    ])
+    assert series(dated_api, interval="week")[:2] == ("2024-12-30", "2025-03-16")
+
+
+def test_buckets_cut_by_the_range_are_partial(dated_api):
+    assert series(dated_api, **{"from": "2025-01-31", "to": "2025-03-01"})[2] == [
+        ("2025-01-31", 1, True), ("2025-02-01", 2, False), ("2025-03-01", 1, True),
+    ]
+    # 2025-01-05 is a Sunday: its week started on 2024-12-30, which is outside the range
+    assert series(dated_api, interval="week", **{"from": "2025-01-05", "to": "2025-01-06"})[2] == [
+        ("2025-01-05", 1, True), ("2025-01-06", 1, True),
+    ]
+    assert series(dated_api, interval="day", **{"from": "2025-02-28", "to": "2025-03-01"})[2] == [
+        ("2025-02-28", 1, False), ("2025-03-01", 1, False),
+    ]
+
+    for interval in ("day", "week", "month"):
+        query = {"interval": interval, "from": "2025-01-05", "to": "2025-02-28"}
+        total = dated_api.get("/stats/timeseries", params=query).json()["total"]
+        assert total == dated_api.get("/stats", params=query).json()["total_registrations"] == 5
+
+
+def test_year_is_calendar_and_quarter_is_financial(dated_api):
+    def total(**query):
+        return dated_api.get("/stats", params=query).json()["total_registrations"]
+
+    assert total(year=2025, quarter="Q3") == 7
+    assert total(year=2024, quarter="Q2") == 1
+    assert total(year=2025, quarter="Q1") == 0
+    assert dated_api.get("/stats/timeseries", params={"year": 2025, "quarter": "Q3"}).json()["total"] == 7
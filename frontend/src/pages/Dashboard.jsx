@@ -65,6 +65,24 @@ export const Dashboard = () => {
     fetchStats();
   }, [fetchStats]);
 
+  // Live updates pushed by the API when new registrations arrive
+  useEffect(() => {
+    const hasFilters = Boolean(selectedCounty || selectedLevel);
+    let connected = false;
+    const unsubscribe = apiService.subscribeToStats((liveStats) => {
+      if (!hasFilters) {
+        setStats(liveStats);
+        setLastUpdated(new Date().toISOString());
+        return;
+      }
+      // Pushed stats are unfiltered; refetch the filtered view after a change
+      // (the first message only repeats the data fetchStats just loaded)
+      if (connected) fetchStats();
+      connected = true;
+    });
+    return unsubscribe;
+  }, [fetchStats, selectedCounty, selectedLevel]);
+
   const handleCountyChange = (county) => {
     setSelectedCounty(county);
   };
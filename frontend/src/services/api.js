@@ -49,21 +49,40 @@ export const apiService = {
   healthCheck: () => api.get('/health'),
 
   // Data endpoints
-  getData: (limit = null, offset = 0) => {
+  // Pass the previous page's next_cursor to continue paging; fields limits the returned columns
+  getData: (limit = null, offset = 0, { cursor = null, fields = null } = {}) => {
     const params = new URLSearchParams();
     if (limit) params.append('limit', limit);
-    params.append('offset', offset);
+    if (cursor) {
+      params.append('cursor', cursor);
+    } else {
+      params.append('offset', offset);
+    }
+    if (fields) params.append('fields', Array.isArray(fields) ? fields.join(',') : fields);
     return api.get(`/data?${params}`);
   },
 
   // Statistics
-  getStats: (county = null, level = null) => {
+  // filters may hold school, gender, year, quarter, from and to (YYYY-MM-DD)
+  getStats: (county = null, level = null, filters = {}) => {
     const params = new URLSearchParams();
     if (county) params.append('county', county);
     if (level) params.append('level', level);
+    Object.entries(filters).forEach(([name, value]) => {
+      if (value) params.append(name, value);
+    });
     return api.get(`/stats?${params}`);
   },
 
+  // Registrations per day, week or month; takes the same filters as getStats
+  getTimeSeries: (interval = 'month', filters = {}) => {
+    const params = new URLSearchParams({ interval });
+    Object.entries(filters).forEach(([name, value]) => {
+      if (value) params.append(name, value);
+    });
+    return api.get(`/stats/timeseries?${params}`);
+  },
+
   // Filter options
   getCounties: () => api.get('/counties'),
   getLevels: () => api.get('/levels'),
@@ -75,6 +94,30 @@ export const apiService = {
     if (field) params.append('field', field);
     return api.get(`/search?${params}`);
   },
+
+  // Live updates: onStats receives the full unfiltered stats on connect and after every data change.
+  // Returns a function that closes the stream. EventSource reconnects on its own.
+  subscribeToStats: (onStats, onError = null) => {
+    if (typeof EventSource === 'undefined') {
+      return () => {};
+    }
+
+    const source = new EventSource(`${API_BASE_URL}/events`);
+    let stats = null;
+
+    source.addEventListener('snapshot', (event) => {
+      stats = JSON.parse(event.data).stats;
+      onStats(stats);
+    });
+    source.addEventListener('stats', (event) => {
+      if (!stats) return;
+      stats = { ...stats, ...JSON.parse(event.data).changes };
+      onStats(stats);
+    });
+    if (onError) source.onerror = onError;
+
+    return () => source.close();
+  },
 };
 
 export default api;